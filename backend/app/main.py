@@ -1,15 +1,92 @@
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+import logging
+from typing import AsyncIterator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from .utils.database import connect_to_mongo, close_mongo_connection
+from fastapi.responses import JSONResponse
+from jose import JWTError
+from .utils.database import connect_to_mongo, close_mongo_connection, prewarm_pool
+from .utils.archive import ArchiveJob
+from .utils.compression import CompressionMiddleware
+from .utils.events import get_event_hub
+from .utils.leaderboard import get_leaderboard
+from .utils.profiling import ProfilingMiddleware, profiling_enabled
+from .utils.rate_limit import RateLimitMiddleware
+from .utils.revocation import get_revocation_list
+from .utils.serialization import MongoJSONResponse
+from .migrations import MigrationRunner
+from .models.comparison import ComparisonModel
+from .models.label import LabelModel
+from .models.showdown_event import ShowdownEventModel
+from .models.task import TaskModel
+from .models.user import UserModel
 from .routes import auth as auth_routes
 from .routes import tasks as task_routes
 from .routes import labels as label_routes
 from .routes import showdown as showdown_routes
+from .routes import events as event_routes
+from .routes import batch as batch_routes
+from .routes import admin as admin_routes
+from .schemas import label as label_schemas
+from .schemas import task as task_schemas
+from .schemas import user as user_schemas
 
 
-app = FastAPI(title="PeachyTask API")
+def _warm_validators() -> None:
+    # Finish any schema builds pydantic deferred (forward refs from
+    # `from __future__ import annotations`) so the first request doesn't pay.
+    for module in (task_schemas, label_schemas, user_schemas):
+        for obj in vars(module).values():
+            if isinstance(obj, type) and hasattr(obj, "model_rebuild") and obj.__module__ == module.__name__:
+                obj.model_rebuild()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    db = await connect_to_mongo()
+    await prewarm_pool()
+    await TaskModel(db).ensure_indexes()
+    await LabelModel(db).ensure_indexes()
+    await ComparisonModel(db).ensure_indexes()
+    await ShowdownEventModel(db).ensure_indexes()
+    await UserModel(db).ensure_indexes()
+    pending = await MigrationRunner(db).pending()
+    if pending:
+        logging.getLogger("peachytask.migrations").warning(
+            "pending migrations %s; run `python -m app.migrations run`", [m.version for m in pending]
+        )
+    _warm_validators()
+    # build once now; FastAPI caches it on app.openapi_schema
+    app.openapi()
+    await get_event_hub().start(db)
+    await get_revocation_list().start(db)
+    await get_leaderboard().start(db)
+    archive_job = ArchiveJob(db) if ArchiveJob.enabled() else None
+    if archive_job is not None:
+        archive_job.start()
+    yield
+    if archive_job is not None:
+        await archive_job.stop()
+    await get_event_hub().stop()
+    await get_revocation_list().stop()
+    await get_leaderboard().stop()
+    await close_mongo_connection()
+
+
+app = FastAPI(title="PeachyTask API", default_response_class=MongoJSONResponse, lifespan=lifespan)
+
+# Innermost: compresses what the routes return; rejected requests never reach it
+app.add_middleware(CompressionMiddleware)
+
+# Only installed when enabled, so it costs nothing otherwise; sits outside
+# compression so profiles include it, inside rate limiting so rejects are skipped
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
+# Added before CORS so CORS stays outermost and 429/503 responses carry its headers
+app.add_middleware(RateLimitMiddleware)
 
 # CORS configuration for local development; adjust origins as needed for deployment
 app.add_middleware(
@@ -26,6 +103,12 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(JWTError)
+async def jwt_error_handler(request: Request, exc: JWTError) -> JSONResponse:
+    # expired, malformed or revoked access_token cookie
+    return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid token"})
+
+
 @app.get("/health")
 def health() -> dict:
     """Basic health check endpoint used by tests and uptime checks."""
@@ -36,19 +119,12 @@ def health() -> dict:
     }
 
 
-@app.on_event("startup")
-async def on_startup() -> None:
-    # establish database connection
-    await connect_to_mongo()
-    # include routers after DB is ready
-    app.include_router(auth_routes.router, prefix="/auth", tags=["auth"])
-    app.include_router(task_routes.router, tags=["tasks"])
-    app.include_router(label_routes.router, tags=["labels"])
-    app.include_router(showdown_routes.router, tags=["showdown"])
-
-
-@app.on_event("shutdown")
-async def on_shutdown() -> None:
-    await close_mongo_connection()
-
-
+# Routers are registered at import time so the route table and OpenAPI
+# schema exist before (and independently of) the database connection.
+app.include_router(auth_routes.router, prefix="/auth", tags=["auth"])
+app.include_router(task_routes.router, tags=["tasks"])
+app.include_router(label_routes.router, tags=["labels"])
+app.include_router(showdown_routes.router, tags=["showdown"])
+app.include_router(event_routes.router, tags=["events"])
+app.include_router(batch_routes.router, tags=["batch"])
+app.include_router(admin_routes.router, tags=["admin"])
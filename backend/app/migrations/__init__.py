@@ -0,0 +1,203 @@
+"""Versioned, resumable data migrations.
+
+Each migration in `MIGRATIONS` brings documents up to its `version`,
+recorded per document in a `schema_version` field (new documents are
+written at the current version by the models). `MigrationRunner` walks the
+pending documents of each collection in `_id` order, in batches, at most
+`max_docs_per_second`, and checkpoints the last `_id` after every batch in
+the `migrations` collection, so an interrupted run resumes where it
+stopped. Updates are conditional on the document still being below the
+version and still holding the values the migration read, so re-running a
+batch is harmless and a document written concurrently is skipped and
+picked up by the next pass instead of being overwritten.
+
+Run with `python -m app.migrations status|run`.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+
+logger = logging.getLogger("peachytask.migrations")
+
+
+class MigrationLeaseLost(RuntimeError):
+    """Another process holds the migrations lease."""
+
+
+class Migration:
+    """One schema step. Subclasses set `version`/`name` and implement `update`."""
+
+    version: int = 0
+    name: str = ""
+    collections: Tuple[str, ...] = ()
+    projection: Optional[Dict[str, int]] = None
+
+    def pending_filter(self) -> Dict[str, Any]:
+        # matches documents without a schema_version as well
+        return {"schema_version": {"$not": {"$gte": self.version}}}
+
+    def unchanged_filter(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Matches `doc` only while the fields this migration read are as read."""
+        fields = [f for f, on in self.projection.items() if on] if self.projection else [f for f in doc if f != "_id"]
+        # a missing field reads as None, and {field: None} also matches missing
+        return {"_id": doc["_id"], **self.pending_filter(), **{f: doc.get(f) for f in fields if f != "_id"}}
+
+    def update(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields to `$set` on `doc` (schema_version is added by the runner)."""
+        raise NotImplementedError
+
+    async def prepare(self, db: AsyncIOMotorDatabase, docs: List[Dict[str, Any]]) -> None:
+        """Writes elsewhere that must land before a batch is updated; must be idempotent."""
+
+
+from app.migrations.v0001_task_phase2_fields import TaskPhase2Fields  # noqa: E402
+from app.migrations.v0002_task_title_normalized import TaskTitleNormalized  # noqa: E402
+from app.migrations.v0003_task_bodies import TaskBodies  # noqa: E402
+
+MIGRATIONS: List[Migration] = [TaskPhase2Fields(), TaskTitleNormalized(), TaskBodies()]
+
+
+class MigrationRunner:
+    collection = "migrations"
+    lease_collection = "job_leases"
+    lease_id = "migrations"
+    lease_seconds = 300
+    # catch-up passes per collection before giving up on documents under constant write
+    max_passes = 5
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        migrations: Optional[List[Migration]] = None,
+        batch_size: int = 500,
+        max_docs_per_second: float = 2000.0,
+    ):
+        self.db = db
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+        self.batch_size = batch_size
+        self.max_docs_per_second = max_docs_per_second
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def _acquire_lease(self) -> None:
+        now = datetime.now(timezone.utc)
+        try:
+            await self.db[self.lease_collection].update_one(
+                {"_id": self.lease_id, "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            raise MigrationLeaseLost("migrations are already running elsewhere")
+
+    async def _release_lease(self) -> None:
+        await self.db[self.lease_collection].delete_one({"_id": self.lease_id, "owner": self.owner})
+
+    async def status(self) -> List[Dict[str, Any]]:
+        records = {r["_id"]: r async for r in self.db[self.collection].find({})}
+        out = []
+        for m in self.migrations:
+            rec = records.get(m.version, {})
+            out.append({
+                "version": m.version,
+                "name": m.name,
+                "state": rec.get("state", "pending"),
+                "processed": rec.get("processed", 0),
+                "cursors": rec.get("cursors", {}),
+            })
+        return out
+
+    async def pending(self) -> List[Migration]:
+        done = {r["_id"] async for r in self.db[self.collection].find({"state": "done"}, {"_id": 1})}
+        return [m for m in self.migrations if m.version not in done]
+
+    async def _run_collection(
+        self, m: Migration, coll: str, last_id: Optional[ObjectId], budget: Optional[List[int]]
+    ) -> bool:
+        """Migrate one collection from `last_id`; False if the batch budget ran out first."""
+        while True:
+            if budget is not None:
+                if budget[0] <= 0:
+                    return False
+                budget[0] -= 1
+            await self._acquire_lease()
+            started = time.monotonic()
+            query = m.pending_filter()
+            if last_id is not None:
+                query = {**query, "_id": {"$gt": last_id}}
+            cursor = self.db[coll].find(query, m.projection).sort("_id", ASCENDING).limit(self.batch_size)
+            docs = [doc async for doc in cursor]
+            if not docs:
+                return True
+            await m.prepare(self.db, docs)
+            ops = [
+                UpdateOne(
+                    m.unchanged_filter(doc),
+                    {"$set": {**m.update(doc), "schema_version": m.version}},
+                )
+                for doc in docs
+            ]
+            await self.db[coll].bulk_write(ops, ordered=False)
+            last_id = docs[-1]["_id"]
+            await self.db[self.collection].update_one(
+                {"_id": m.version},
+                {"$set": {f"cursors.{coll}": last_id}, "$inc": {"processed": len(docs)}},
+            )
+            if len(docs) < self.batch_size:
+                return True
+            if self.max_docs_per_second > 0:
+                await asyncio.sleep(max(0.0, len(docs) / self.max_docs_per_second - (time.monotonic() - started)))
+
+    async def run(self, target: Optional[int] = None, max_batches: Optional[int] = None) -> List[int]:
+        """Apply pending migrations up to `target`; returns the versions completed.
+
+        `max_batches` stops early (the checkpoint is kept), mostly for tests
+        and for running a large backfill in slices.
+        """
+        budget = [max_batches] if max_batches is not None else None
+        completed: List[int] = []
+        try:
+            for m in await self.pending():
+                if target is not None and m.version > target:
+                    break
+                now = datetime.now(timezone.utc)
+                rec = await self.db[self.collection].find_one_and_update(
+                    {"_id": m.version},
+                    {"$set": {"name": m.name, "state": "running"}, "$setOnInsert": {"started_at": now, "processed": 0}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                cursors = rec.get("cursors", {})
+                for coll in m.collections:
+                    if not await self._run_collection(m, coll, cursors.get(coll), budget):
+                        logger.info("migration %d paused; rerun to resume", m.version)
+                        return completed
+                for coll in m.collections:
+                    # documents can move between collections (archival) behind the
+                    # cursor, and ones written during their batch were skipped
+                    for attempt in range(self.max_passes + 1):
+                        if await self.db[coll].find_one(m.pending_filter(), {"_id": 1}) is None:
+                            break
+                        if attempt == self.max_passes:
+                            logger.warning("migration %d: %s still has pending documents; rerun later", m.version, coll)
+                            return completed
+                        if not await self._run_collection(m, coll, None, budget):
+                            return completed
+                await self.db[self.collection].update_one(
+                    {"_id": m.version}, {"$set": {"state": "done", "finished_at": datetime.now(timezone.utc)}}
+                )
+                logger.info("migration %d (%s) done", m.version, m.name)
+                completed.append(m.version)
+        finally:
+            await self._release_lease()
+        return completed
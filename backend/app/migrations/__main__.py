@@ -0,0 +1,36 @@
+"""CLI: `python -m app.migrations status` / `python -m app.migrations run [--to N]`."""
+
+import argparse
+import asyncio
+import logging
+
+from app.migrations import MigrationRunner
+from app.utils.database import close_mongo_connection, connect_to_mongo
+
+
+async def _main(args: argparse.Namespace) -> None:
+    db = await connect_to_mongo()
+    try:
+        runner = MigrationRunner(db, batch_size=args.batch_size, max_docs_per_second=args.rate)
+        if args.command == "run":
+            done = await runner.run(target=args.to, max_batches=args.max_batches)
+            print(f"completed: {done or 'nothing'}")
+        for row in await runner.status():
+            print(f"{row['version']:>4}  {row['name']:<28} {row['state']:<8} {row['processed']} docs")
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument("command", choices=["status", "run"])
+    parser.add_argument("--to", type=int, default=None, help="stop after this version")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=2000.0, help="max documents per second (0: unlimited)")
+    parser.add_argument("--max-batches", type=int, default=None, help="pause after this many batches")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
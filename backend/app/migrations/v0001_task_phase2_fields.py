@@ -0,0 +1,31 @@
+"""Give every task the Phase 2 fields, with their schema types.
+
+Tasks created before Phase 2 lack `dislike_rank`, `showdown_timer_seconds`
+and `completed_via_showdown`; a few early writes stored the rank as a
+string.
+"""
+
+from typing import Any, Dict, Optional
+
+from app.migrations import Migration
+
+
+def _int_or(value: Any, default: Optional[int]) -> Optional[int]:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class TaskPhase2Fields(Migration):
+    version = 1
+    name = "task_phase2_fields"
+    collections = ("tasks", "tasks_archive")
+    projection = {"dislike_rank": 1, "showdown_timer_seconds": 1, "completed_via_showdown": 1}
+
+    def update(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "dislike_rank": _int_or(doc.get("dislike_rank"), 0),
+            "showdown_timer_seconds": _int_or(doc.get("showdown_timer_seconds"), None),
+            "completed_via_showdown": bool(doc.get("completed_via_showdown", False)),
+        }
@@ -0,0 +1,17 @@
+"""Backfill `title_normalized` (used by prefix search) on older tasks."""
+
+from typing import Any, Dict
+
+from app.migrations import Migration
+from app.models.task import normalize_title
+
+
+class TaskTitleNormalized(Migration):
+    version = 2
+    name = "task_title_normalized"
+    collections = ("tasks", "tasks_archive")
+    projection = {"title": 1}
+
+    def update(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        title = doc.get("title")
+        return {"title_normalized": normalize_title(title)} if isinstance(title, str) else {}
@@ -0,0 +1,59 @@
+"""Move long task descriptions into `task_bodies`, leaving a preview on the task.
+
+Short descriptions stay inline and only gain `description_length` and
+`description_truncated`. Bodies are written before the batch's tasks are
+rewritten, so an interrupted run never leaves a preview without its text.
+Tasks the app has already split (they carry `description_truncated`) are
+left as they are, and a body the app wrote is never replaced: migration
+bodies are marked `source: "migration"` and only those are overwritten.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.migrations import Migration
+from app.models.task import TaskModel, split_description
+
+
+class TaskBodies(Migration):
+    version = 3
+    name = "task_bodies"
+    collections = ("tasks", "tasks_archive")
+    projection = {"description": 1, "description_truncated": 1, "user_id": 1}
+
+    @staticmethod
+    def _description(doc: Dict[str, Any]) -> Any:
+        value = doc.get("description")
+        return value if isinstance(value, str) else None
+
+    async def prepare(self, db: AsyncIOMotorDatabase, docs: List[Dict[str, Any]]) -> None:
+        now = datetime.now(timezone.utc)
+        ops = []
+        for doc in docs:
+            if "description_truncated" in doc:
+                continue
+            _, body = split_description(self._description(doc))
+            if body is not None:
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"], "user_id": doc.get("user_id"), "source": "migration"},
+                    {"$set": {"text": body, "updated_at": now}},
+                    upsert=True,
+                ))
+        if not ops:
+            return
+        try:
+            await db[TaskModel.bodies_collection_name].bulk_write(ops, ordered=False)
+        except BulkWriteError as exc:
+            # duplicate key: the app already wrote that body, which stays
+            if any(err.get("code") != 11000 for err in exc.details.get("writeErrors", [])):
+                raise
+
+    def update(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        if "description_truncated" in doc:
+            return {}
+        fields, _ = split_description(self._description(doc))
+        return fields
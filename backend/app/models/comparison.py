@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+
+
+class ComparisonModel:
+    """Append-only log of "which task do you dread more" answers."""
+
+    collection_name = "showdown_comparisons"
+    # see docs/showdown-architecture.md (Sharding)
+    shard_key = [("user_id", ASCENDING), ("_id", ASCENDING)]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[self.collection_name]
+
+    async def ensure_indexes(self) -> None:
+        # also serves "everything after _id X" reads for incremental refits
+        await self.collection.create_index(self.shard_key, name="user_id_id")
+
+    async def record(self, user_id: str, pairs: List[Tuple[str, str]]) -> int:
+        """Store (winner_id, loser_id) pairs; the winner is the more dreaded task."""
+        now = datetime.now(timezone.utc)
+        uid = ObjectId(user_id)
+        docs = [
+            {"user_id": uid, "winner_id": ObjectId(w), "loser_id": ObjectId(l), "created_at": now}
+            for w, l in pairs
+        ]
+        result = await self.collection.insert_many(docs, ordered=True)
+        return len(result.inserted_ids)
+
+    async def since(self, user_id: str, after_id: Optional[ObjectId]) -> List[Dict[str, Any]]:
+        """The user's comparisons with `_id > after_id` (all if None), oldest first."""
+        query: Dict[str, Any] = {"user_id": ObjectId(user_id)}
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        cursor = self.collection.find(query, {"winner_id": 1, "loser_id": 1}).sort("_id", ASCENDING)
+        return [doc async for doc in cursor]
@@ -2,15 +2,27 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
 
 
 class LabelModel:
     collection_name = "labels"
+    # see docs/showdown-architecture.md (Sharding)
+    shard_key = [("user_id", ASCENDING), ("_id", ASCENDING)]
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection = db[self.collection_name]
+        # read-only view that leaves documents as undecoded BSON bytes
+        self.raw_collection = self.collection.with_options(
+            codec_options=CodecOptions(document_class=RawBSONDocument)
+        )
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index(self.shard_key, name="user_id_id")
 
     async def create(self, user_id: str, name: str, color: Optional[str] = None) -> Dict[str, Any]:
         now = datetime.now(timezone.utc)
@@ -26,7 +38,10 @@ class LabelModel:
         doc["user_id"] = str(doc["user_id"])
         return doc
 
-    async def list_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+    async def list_by_user(self, user_id: str, raw: bool = False) -> List[Any]:
+        if raw:
+            cursor = self.raw_collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1)
+            return [d async for d in cursor]
         cursor = self.collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1)
         out: List[Dict[str, Any]] = []
         async for d in cursor:
@@ -35,18 +50,31 @@ class LabelModel:
             out.append(d)
         return out
 
-    async def get_by_id_str(self, id_str: str) -> Optional[Dict[str, Any]]:
+    async def get_by_id_str(self, id_str: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """One of the user's labels; another user's label reads as missing."""
         try:
             oid = ObjectId(id_str)
         except Exception:
             return None
-        d = await self.collection.find_one({"_id": oid})
+        d = await self.collection.find_one({"_id": oid, "user_id": ObjectId(user_id)})
         if not d:
             return None
         d["_id"] = str(d["_id"])
         d["user_id"] = str(d["user_id"])
         return d
 
+    async def exists(self, id_str: str) -> bool:
+        """Whether any user has a label with this id.
+
+        Not scoped by user (so it reaches every shard): only for telling
+        "not yours" from "missing" after `get_by_id_str` came back empty.
+        """
+        try:
+            oid = ObjectId(id_str)
+        except Exception:
+            return False
+        return await self.collection.count_documents({"_id": oid}, limit=1) > 0
+
     async def update(self, id_str: str, user_id: str, fields: Dict[str, Any]) -> bool:
         if "name" in fields and fields["name"] is not None:
             fields["name_normalized"] = fields["name"].strip().lower()
@@ -0,0 +1,126 @@
+from datetime import date, datetime, time, timedelta, timezone
+import os
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+
+
+EVENT_COMPLETE = "complete"
+EVENT_UNDO = "undo"
+
+
+def _bucket_max_events() -> int:
+    try:
+        return max(1, int(os.getenv("SHOWDOWN_EVENTS_BUCKET_MAX", "200")))
+    except ValueError:
+        return 200
+
+
+def day_start(at: datetime) -> datetime:
+    """UTC midnight of the day `at` falls on."""
+    d = at.astimezone(timezone.utc).date()
+    return datetime.combine(d, time.min, tzinfo=timezone.utc)
+
+
+class ShowdownEventModel:
+    """Append-only showdown history, one document per user-day (bucket pattern).
+
+    A bucket holds the day's events in `events` and running `totals`, both
+    updated by one upsert per event, so history survives later edits of the
+    task and rollups read a handful of small totals instead of every task.
+    A day with more than SHOWDOWN_EVENTS_BUCKET_MAX events spills into
+    another bucket for the same day; readers sum buckets per day.
+    """
+
+    collection_name = "showdown_events"
+    # see docs/showdown-architecture.md (Sharding)
+    shard_key = [("user_id", ASCENDING), ("day", ASCENDING)]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[self.collection_name]
+
+    async def ensure_indexes(self) -> None:
+        # not unique: a full bucket is followed by a second one for the same day
+        await self.collection.create_index(self.shard_key, name="user_id_day")
+
+    async def append(
+        self,
+        user_id: str,
+        kind: str,
+        task_id: str,
+        at: Optional[datetime] = None,
+        timer_seconds: int = 0,
+        peaches: int = 0,
+        counts: bool = True,
+    ) -> None:
+        """Record one event; `counts=False` logs it without moving the completion totals."""
+        at = at or datetime.now(timezone.utc)
+        event: Dict[str, Any] = {"at": at, "type": kind, "task_id": ObjectId(task_id)}
+        if timer_seconds:
+            event["timer_seconds"] = timer_seconds
+        if peaches:
+            event["peaches"] = peaches
+        inc: Dict[str, Any] = {"count": 1}
+        if counts and kind == EVENT_COMPLETE:
+            inc["totals.completions"] = 1
+            inc["totals.timer_seconds"] = timer_seconds
+        elif counts and kind == EVENT_UNDO:
+            inc["totals.undos"] = 1
+            # an undone completion's time no longer counts either
+            inc["totals.timer_seconds"] = -timer_seconds
+        if peaches:
+            inc["totals.peaches"] = peaches
+        uid = ObjectId(user_id)
+        day = day_start(at)
+        # the count bound makes a full bucket miss, so the upsert starts a new one;
+        # an inserted bucket takes user_id and day from the filter
+        await self.collection.update_one(
+            {"user_id": uid, "day": day, "count": {"$lt": _bucket_max_events()}},
+            {"$push": {"events": event}, "$inc": inc},
+            upsert=True,
+        )
+
+    async def rollup(self, user_id: str, start: datetime, end: datetime, unit: str = "day") -> List[Dict[str, Any]]:
+        """Per-day or per-week (Monday start) totals for buckets in [start, end)."""
+        pipeline = [
+            {"$match": {"user_id": ObjectId(user_id), "day": {"$gte": day_start(start), "$lt": end}}},
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": "$day", "unit": unit, "startOfWeek": "monday"}},
+                "completions": {"$sum": "$totals.completions"},
+                "undos": {"$sum": "$totals.undos"},
+                "timer_seconds": {"$sum": "$totals.timer_seconds"},
+                "peaches": {"$sum": "$totals.peaches"},
+            }},
+            {"$sort": {"_id": 1}},
+        ]
+        return [doc async for doc in self.collection.aggregate(pipeline)]
+
+    async def streak_days(self, user_id: str, today: Optional[date] = None) -> int:
+        """Consecutive UTC days up to `today` with more completions than undos."""
+        today = today or datetime.now(timezone.utc).date()
+        cursor = self.collection.find(
+            {"user_id": ObjectId(user_id), "day": {"$lte": datetime.combine(today, time.min, tzinfo=timezone.utc)}},
+            {"_id": 0, "day": 1, "totals": 1},
+        ).sort([("day", DESCENDING)])
+        streak = 0
+        expected = today
+        net = 0
+        current: Optional[date] = None
+        # buckets arrive newest day first; stop at the first day that breaks the run
+        async for doc in cursor:
+            d = doc["day"].date() if doc["day"].tzinfo is None else doc["day"].astimezone(timezone.utc).date()
+            if d != current:
+                if current is not None:
+                    if current != expected or net <= 0:
+                        return streak
+                    streak += 1
+                    expected = current - timedelta(days=1)
+                current, net = d, 0
+            totals = doc.get("totals") or {}
+            net += int(totals.get("completions", 0)) - int(totals.get("undos", 0))
+        if current is not None and current == expected and net > 0:
+            streak += 1
+        return streak
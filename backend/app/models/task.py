@@ -1,53 +1,398 @@
+import asyncio
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import re
 
 from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import DuplicateKeyError
+
+
+# bump together with a new entry in app.migrations.MIGRATIONS
+TASK_SCHEMA_VERSION = 3
+
+
+def normalize_title(title: str) -> str:
+    return title.strip().lower()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def split_description(text: Optional[str]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Task fields for `text`, and the text itself when it belongs in `task_bodies`.
+
+    Descriptions longer than TASK_DESCRIPTION_INLINE_MAX characters keep only
+    their first TASK_DESCRIPTION_PREVIEW_CHARS on the task, with
+    `description_truncated` set and the full length in `description_length`.
+    """
+    length = len(text) if text is not None else 0
+    if text is None or length <= _env_int("TASK_DESCRIPTION_INLINE_MAX", 2048):
+        return {"description": text, "description_length": length, "description_truncated": False}, None
+    preview = text[: _env_int("TASK_DESCRIPTION_PREVIEW_CHARS", 280)].rstrip()
+    return {"description": preview, "description_length": length, "description_truncated": True}, text
+
+
+def _owned(id_str: str, user_id_str: str) -> Optional[Dict[str, ObjectId]]:
+    """Filter for one document of one user, or None for malformed ids.
+
+    Every per-document query carries `user_id` so it targets a single shard
+    when the collection is sharded on `{user_id: 1, _id: 1}`.
+    """
+    try:
+        return {"_id": ObjectId(id_str), "user_id": ObjectId(user_id_str)}
+    except Exception:
+        return None
 
 
 class TaskModel:
     collection_name = "tasks"
+    archive_collection_name = "tasks_archive"
+    # full text of long descriptions, `_id` = the task's `_id`
+    bodies_collection_name = "task_bodies"
+    # see docs/showdown-architecture.md (Sharding)
+    shard_key = [("user_id", ASCENDING), ("_id", ASCENDING)]
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection = db[self.collection_name]
+        # long-completed tasks moved out of the hot collection (see app.utils.archive)
+        self.archive_collection = db[self.archive_collection_name]
+        self.bodies_collection = db[self.bodies_collection_name]
+        # read-only view that leaves documents as undecoded BSON bytes
+        self.raw_collection = self.collection.with_options(
+            codec_options=CodecOptions(document_class=RawBSONDocument)
+        )
+
+    async def ensure_indexes(self) -> None:
+        # shard key index; also serves the user-scoped point lookups
+        await self.collection.create_index(self.shard_key, name="user_id_id")
+        # Serves /tasks/due and /tasks/calendar range scans. `_id` is the keyset
+        # tie-breaker so paging by (deadline, _id) never needs an in-memory sort.
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("completed", ASCENDING), ("deadline", ASCENDING), ("_id", ASCENDING)],
+            name="user_completed_deadline",
+        )
+        # /tasks/search: full-text (user_id equality prefix scopes the text
+        # index per user) and anchored prefix matches for type-ahead.
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("title", TEXT), ("description", TEXT)],
+            name="user_title_description_text",
+        )
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("title_normalized", ASCENDING)],
+            name="user_title_normalized",
+        )
+        # archival sweep: completed tasks by completion (last update) time
+        await self.collection.create_index(
+            [("completed", ASCENDING), ("updated_at", ASCENDING)],
+            name="completed_updated_at",
+        )
+        # shard key index; walked backwards for newest-first archive pages
+        await self.archive_collection.create_index(self.shard_key, name="user_id_id")
+        await self.archive_collection.create_index(
+            [("user_id", ASCENDING), ("completed_via_showdown", ASCENDING)],
+            name="user_completed_via_showdown",
+        )
+        await self.bodies_collection.create_index(self.shard_key, name="user_id_id")
+        # /tasks/search: the inline description of a long task is only a preview
+        await self.bodies_collection.create_index(
+            [("user_id", ASCENDING), ("text", TEXT)],
+            name="user_text",
+        )
 
     async def create(self, doc: Dict[str, Any]) -> Dict[str, Any]:
         now = datetime.now(timezone.utc)
-        doc = {**doc, "created_at": now, "updated_at": now}
-        result = await self.collection.insert_one(doc)
+        doc = {**doc, "created_at": now, "updated_at": now, "schema_version": TASK_SCHEMA_VERSION}
+        if doc.get("title") is not None:
+            doc["title_normalized"] = normalize_title(doc["title"])
+        fields, body = split_description(doc.get("description"))
+        doc.update(fields)
+        if body is None:
+            result = await self.collection.insert_one(doc)
+        else:
+            # body first, so a task is never visible without its body
+            doc["_id"] = ObjectId()
+            await self._save_body(doc["_id"], doc["user_id"], body, now)
+            try:
+                result = await self.collection.insert_one(doc)
+            except BaseException:
+                await self.bodies_collection.delete_one({"_id": doc["_id"], "user_id": doc["user_id"]})
+                raise
         doc["_id"] = str(result.inserted_id)
         return doc
 
-    async def get_by_id_str(self, id_str: str) -> Optional[Dict[str, Any]]:
-        try:
-            oid = ObjectId(id_str)
-        except Exception:
+    async def _save_body(self, task_id: ObjectId, user_id: ObjectId, text: str, now: datetime) -> None:
+        await self.bodies_collection.update_one(
+            {"_id": task_id, "user_id": user_id},
+            # the app's body supersedes one written by migration 3
+            {"$set": {"text": text, "updated_at": now}, "$unset": {"source": ""}},
+            upsert=True,
+        )
+
+    async def get_body(self, id_str: str, user_id_str: str) -> Optional[str]:
+        query = _owned(id_str, user_id_str)
+        if query is None:
             return None
-        return await self.collection.find_one({"_id": oid})
+        doc = await self.bodies_collection.find_one(query, {"text": 1})
+        return doc["text"] if doc else None
 
-    async def list_by_user(self, user_id_str: str) -> List[Dict[str, Any]]:
+    async def with_body(self, doc: Dict[str, Any], user_id_str: str) -> Dict[str, Any]:
+        """`doc` with its full description in place of the preview."""
+        if doc.get("description_truncated"):
+            text = await self.get_body(str(doc["_id"]), user_id_str)
+            if text is not None:
+                doc["description"] = text
+                doc["description_truncated"] = False
+        return doc
+
+    async def get_by_id_str(
+        self, id_str: str, user_id_str: str, include_archive: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch one of the user's tasks; with `include_archive`, fall back to `tasks_archive`.
+
+        Another user's task is indistinguishable from a missing one. Archived
+        documents come back with `archived: True`.
+        """
+        query = _owned(id_str, user_id_str)
+        if query is None:
+            return None
+        doc = await self.collection.find_one(query)
+        if doc is None and include_archive:
+            doc = await self.archive_collection.find_one(query)
+            if doc is not None:
+                doc["archived"] = True
+        return doc
+
+    async def list_by_user(self, user_id_str: str, raw: bool = False) -> List[Any]:
+        """List a user's tasks, newest first.
+
+        With `raw=True` the documents are returned as `RawBSONDocument` for
+        callers that only re-encode them (see `app.utils.raw_bson`).
+        """
         try:
             uid = ObjectId(user_id_str)
         except Exception:
             return []
-        cursor = self.collection.find({"user_id": uid}).sort("created_at", -1)
+        coll = self.raw_collection if raw else self.collection
+        cursor = coll.find({"user_id": uid}).sort("created_at", -1)
         return [doc async for doc in cursor]
 
-    async def update_fields(self, id_str: str, fields: Dict[str, Any]) -> bool:
-        try:
-            oid = ObjectId(id_str)
-        except Exception:
+    async def update_fields(self, id_str: str, user_id_str: str, fields: Dict[str, Any]) -> bool:
+        if "title" in fields and fields["title"] is not None:
+            fields["title_normalized"] = normalize_title(fields["title"])
+        if "dislike_rank" in fields:
+            # pins the rank: the comparison fit leaves it alone until the task is compared again
+            fields["dislike_rank_manual"] = True
+        query = _owned(id_str, user_id_str)
+        if query is None:
             return False
-        result = await self.collection.update_one({"_id": oid}, {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}})
+        now = datetime.now(timezone.utc)
+        body: Optional[str] = None
+        if "description" in fields:
+            description_fields, body = split_description(fields["description"])
+            fields.update(description_fields)
+            if body is not None:
+                await self._save_body(query["_id"], query["user_id"], body, now)
+        result = await self.collection.update_one(query, {"$set": {**fields, "updated_at": now}})
+        if result.matched_count == 1 and "description" in fields and body is None:
+            # now short enough to live inline
+            await self.bodies_collection.delete_one(query)
         return result.matched_count == 1
 
-    async def delete(self, id_str: str) -> bool:
+    async def restore(self, id_str: str, user_id_str: str) -> bool:
+        """Move an archived task back into the hot collection; False if it is not archived."""
+        query = _owned(id_str, user_id_str)
+        if query is None:
+            return False
+        doc = await self.archive_collection.find_one(query)
+        if doc is None:
+            return False
         try:
-            oid = ObjectId(id_str)
-        except Exception:
+            await self.collection.insert_one(doc)
+        except DuplicateKeyError:
+            # restored concurrently
+            pass
+        await self.archive_collection.delete_one(query)
+        return True
+
+    async def delete(self, id_str: str, user_id_str: str) -> bool:
+        query = _owned(id_str, user_id_str)
+        if query is None:
             return False
-        result = await self.collection.delete_one({"_id": oid})
+        result = await self.collection.delete_one(query)
+        if result.deleted_count != 1:
+            result = await self.archive_collection.delete_one(query)
+        if result.deleted_count == 1:
+            await self.bodies_collection.delete_one(query)
         return result.deleted_count == 1
 
+    async def list_archived(
+        self, user_id_str: str, before_id: Optional[ObjectId] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Archived tasks, most recently created first, keyset-paged by `_id`."""
+        query: Dict[str, Any] = {"user_id": ObjectId(user_id_str)}
+        if before_id is not None:
+            query["_id"] = {"$lt": before_id}
+        cursor = self.archive_collection.find(query).sort("_id", DESCENDING).limit(limit)
+        return [doc async for doc in cursor]
+
+    async def count_archived(self, user_id_str: str) -> int:
+        return await self.archive_collection.count_documents({"user_id": ObjectId(user_id_str)})
+
+    async def list_due(
+        self,
+        user_id_str: str,
+        after: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        completed: Optional[bool] = False,
+        start_after: Optional[Tuple[datetime, ObjectId]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Tasks with `after <= deadline < before`, ordered by (deadline, _id).
+
+        `start_after` is the (deadline, _id) of the last item of the previous
+        page; paging resumes strictly after it.
+        """
+        uid = ObjectId(user_id_str)
+        query: Dict[str, Any] = {"user_id": uid}
+        # An explicit $in keeps `completed` an equality prefix of the index.
+        query["completed"] = completed if completed is not None else {"$in": [False, True]}
+        # tasks without a deadline are not due; a null would also break the (deadline, _id) cursor
+        deadline_range: Dict[str, Any] = {"$type": "date"}
+        if after is not None:
+            deadline_range["$gte"] = after
+        if before is not None:
+            deadline_range["$lt"] = before
+        query["deadline"] = deadline_range
+        if start_after is not None:
+            last_deadline, last_id = start_after
+            query["$or"] = [
+                {"deadline": {"$gt": last_deadline}},
+                {"deadline": last_deadline, "_id": {"$gt": last_id}},
+            ]
+        cursor = (
+            self.collection.find(query)
+            .sort([("deadline", ASCENDING), ("_id", ASCENDING)])
+            .limit(limit)
+        )
+        return [doc async for doc in cursor]
+
+    async def deadline_buckets(
+        self, user_id_str: str, start: datetime, end: datetime, unit: str = "day"
+    ) -> List[Dict[str, Any]]:
+        """Per-day or per-week task counts by deadline in [start, end)."""
+        pipeline = [
+            {"$match": {
+                "user_id": ObjectId(user_id_str),
+                "completed": {"$in": [False, True]},
+                "deadline": {"$gte": start, "$lt": end},
+            }},
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": "$deadline", "unit": unit, "startOfWeek": "monday"}},
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": ["$completed", 1, 0]}},
+            }},
+            {"$sort": {"_id": 1}},
+        ]
+        return [doc async for doc in self.collection.aggregate(pipeline)]
+
+    async def search_text(self, user_id_str: str, q: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over title/description, best match first.
+
+        Long descriptions are only a preview inline, so `task_bodies` is
+        searched as well; a task matching in both keeps its better score.
+        """
+        uid = ObjectId(user_id_str)
+        score = {"$meta": "textScore"}
+        query = {"user_id": uid, "$text": {"$search": q}}
+
+        async def top(collection, projection: Dict[str, Any]) -> List[Dict[str, Any]]:
+            cursor = collection.find(query, projection).sort([("score", score)]).limit(skip + limit)
+            return [doc async for doc in cursor]
+
+        tasks, bodies = await asyncio.gather(
+            top(self.collection, {"score": score}), top(self.bodies_collection, {"score": score})
+        )
+        by_id = {doc["_id"]: doc for doc in tasks}
+        scores = {doc["_id"]: doc["score"] for doc in tasks}
+        for doc in bodies:
+            scores[doc["_id"]] = max(scores.get(doc["_id"], 0.0), doc["score"])
+        page = sorted(scores, key=lambda i: (-scores[i], i))[skip : skip + limit]
+        missing = [i for i in page if i not in by_id]
+        if missing:
+            async for doc in self.collection.find({"_id": {"$in": missing}, "user_id": uid}):
+                by_id[doc["_id"]] = doc
+        out = []
+        for i in page:
+            doc = by_id.get(i)
+            if doc is not None:  # a body can outlive its task for a moment on delete
+                doc["score"] = scores[i]
+                out.append(doc)
+        return out
+
+    async def search_prefix(self, user_id_str: str, q: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Type-ahead: titles starting with `q` (case-insensitive), alphabetical."""
+        # An anchored, case-sensitive regex on the lowercased field is an index
+        # range scan; a case-insensitive regex would scan every key.
+        pattern = "^" + re.escape(normalize_title(q))
+        cursor = (
+            self.collection.find(
+                {"user_id": ObjectId(user_id_str), "title_normalized": {"$regex": pattern}},
+                {"title": 1, "priority": 1, "deadline": 1, "completed": 1, "label_ids": 1},
+            )
+            .sort([("title_normalized", ASCENDING)])
+            .skip(skip)
+            .limit(limit)
+        )
+        return [doc async for doc in cursor]
 
+    async def summary(self, user_id_str: str, now: datetime) -> Dict[str, Any]:
+        """Dashboard counts for one user from a single $facet aggregation."""
+        pipeline = [
+            # user_id equality is the prefix of the task indexes
+            {"$match": {"user_id": ObjectId(user_id_str)}},
+            {"$project": {"priority": 1, "completed": 1, "deadline": 1, "label_ids": 1}},
+            {"$facet": {
+                "by_status": [{"$group": {"_id": "$completed", "count": {"$sum": 1}}}],
+                "by_priority": [{"$group": {"_id": "$priority", "count": {"$sum": 1}}}],
+                "overdue": [
+                    {"$match": {"completed": False, "deadline": {"$lt": now}}},
+                    {"$count": "count"},
+                ],
+                "by_label": [
+                    {"$unwind": "$label_ids"},
+                    {"$group": {
+                        "_id": "$label_ids",
+                        "total": {"$sum": 1},
+                        "open": {"$sum": {"$cond": ["$completed", 0, 1]}},
+                    }},
+                ],
+            }},
+        ]
+        rows = [doc async for doc in self.collection.aggregate(pipeline)]
+        facets = rows[0] if rows else {}
+        status_counts = {r["_id"]: r["count"] for r in facets.get("by_status", [])}
+        completed = status_counts.get(True, 0)
+        open_count = status_counts.get(False, 0)
+        overdue = facets.get("overdue") or [{"count": 0}]
+        return {
+            "total": completed + open_count,
+            "completed": completed,
+            "open": open_count,
+            "overdue": overdue[0]["count"],
+            "by_priority": {r["_id"]: r["count"] for r in facets.get("by_priority", []) if r["_id"] is not None},
+            "by_label": [
+                {"label_id": str(r["_id"]), "total": r["total"], "open": r["open"]}
+                for r in facets.get("by_label", [])
+            ],
+        }
@@ -1,8 +1,9 @@
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 
 
 class UserModel:
@@ -14,6 +15,12 @@ class UserModel:
         self.db = db
         self.collection = db[self.collection_name]
 
+    async def ensure_indexes(self) -> None:
+        # leaderboard: top slice walks it forwards, the rank snapshot reads it covered
+        await self.collection.create_index(
+            [("peaches_peached_total", DESCENDING), ("_id", ASCENDING)], name="peaches_desc"
+        )
+
     async def create_user(self, email: str, password_hash: str) -> Dict[str, Any]:
         now = datetime.now(timezone.utc)
         doc = {
@@ -35,5 +42,58 @@ class UserModel:
             return None
         return await self.collection.find_one({"_id": oid})
 
+    async def add_showdown_completion(self, id_str: str, peaches: int, completed: int = 1) -> Optional[Dict[str, Any]]:
+        """Atomically bump the showdown counters and return their new values.
+
+        A user who predates `showdown_completed_total` gets an exact recount
+        instead, so the first completion does not report a total of 1.
+        """
+        before = await self.collection.find_one_and_update(
+            {"_id": ObjectId(id_str)},
+            {"$inc": {"peaches_peached_total": peaches, "showdown_completed_total": completed}},
+            projection={"peaches_peached_total": 1, "showdown_completed_total": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before is None:
+            return None
+        if "showdown_completed_total" in before:
+            total = int(before["showdown_completed_total"] or 0) + completed
+        else:
+            total = await self.reconcile_showdown_completed(id_str)
+        return {
+            "peaches_peached_total": int(before.get("peaches_peached_total") or 0) + peaches,
+            "showdown_completed_total": total,
+        }
+
+    async def reconcile_showdown_completed(self, id_str: str) -> int:
+        """Reset `showdown_completed_total` from the tasks it summarizes.
+
+        The counter is maintained incrementally on the hot path; this exact
+        recount runs only where it can drift: a user who predates the counter
+        (inline, from `add_showdown_completion`) and an undone or deleted
+        showdown completion (in the background).
+        """
+        uid = ObjectId(id_str)
+        query = {"user_id": uid, "completed": True, "completed_via_showdown": True}
+        # archived tasks still count
+        total = await self.db["tasks"].count_documents(query)
+        total += await self.db["tasks_archive"].count_documents(query)
+        await self.collection.update_one({"_id": uid}, {"$set": {"showdown_completed_total": total}})
+        return total
 
+    async def top_by_peaches(self, limit: int) -> List[Dict[str, Any]]:
+        cursor = (
+            self.collection.find({"peaches_peached_total": {"$gt": 0}}, {"peaches_peached_total": 1})
+            .sort([("peaches_peached_total", DESCENDING), ("_id", ASCENDING)])
+            .limit(limit)
+        )
+        return [doc async for doc in cursor]
 
+    async def all_peaches(self) -> List[int]:
+        """Every positive peaches total, ascending (index-only read)."""
+        cursor = (
+            self.collection.find({"peaches_peached_total": {"$gt": 0}}, {"_id": 0, "peaches_peached_total": 1})
+            .sort([("peaches_peached_total", ASCENDING)])
+            .hint("peaches_desc")
+        )
+        return [doc["peaches_peached_total"] async for doc in cursor]
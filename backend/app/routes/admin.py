@@ -0,0 +1,36 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.utils.admin import require_admin
+from app.utils.database import slow_query_monitor
+from app.utils.profiling import get_profile_store
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict[str, Any]]:
+    """Stored request profiles, newest first."""
+    return get_profile_store().list()
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str) -> FileResponse:
+    path = get_profile_store().path_for(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    media_type = "application/json" if name.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+
+@router.get("/slow-queries")
+async def slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total", pattern="^(total|p95|max|slow)$"),
+) -> List[Dict[str, Any]]:
+    """Mongo query shapes with their latency stats and, once a shape has
+    been slow, the explain("executionStats") summary of its plan."""
+    return slow_query_monitor.top(limit=limit, order_by=order_by)
@@ -1,9 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from jose import JWTError
 
 from app.schemas.user import UserCreate, UserLogin
-from app.utils.auth import hash_password, create_access_token, verify_password, decode_access_token
+from app.utils.auth import (
+    hash_password,
+    create_access_token,
+    verify_password,
+    decode_access_token,
+    get_user_id_from_cookie,
+)
 from app.utils.database import get_database_or_none
 from app.models.user import UserModel
+from app.utils.revocation import get_revocation_list
 
 
 router = APIRouter()
@@ -60,24 +68,13 @@ async def login(payload: UserLogin, response: Response):
     return {"_id": user_id, "email": user_doc["email"]}
 
 
-def _get_user_id_from_cookie(request: Request) -> str:
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_access_token(token)
-    sub = payload.get("sub")
-    if not sub:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    return sub
-
-
 @router.get("/me")
 async def me(request: Request):
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
     users = UserModel(db)
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     user_doc = await users.get_by_id_str(user_id)
     if not user_doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -85,7 +82,17 @@ async def me(request: Request):
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    """Clear the cookie and revoke the token, so a copy of it stops working too."""
+    token = request.cookies.get("access_token")
+    db = get_database_or_none()
+    if token and db is not None:
+        try:
+            payload = decode_access_token(token)
+        except JWTError:
+            payload = {}
+        if payload.get("jti") and payload.get("exp"):
+            await get_revocation_list().revoke(db, payload["jti"], float(payload["exp"]), payload.get("sub"))
     response.delete_cookie("access_token", path="/")
     return {"ok": True}
 
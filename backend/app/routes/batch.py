@@ -0,0 +1,166 @@
+"""POST /batch: several API calls in one HTTP round trip.
+
+Sub-requests are dispatched in-process through the full ASGI app (so rate
+limits, validation and error handling are the same as for direct calls).
+The access-token cookie is checked once for the whole batch and the user is
+handed to every sub-request. Runs of consecutive GETs execute concurrently;
+every other method waits for what came before it and blocks what comes
+after, so writes keep their order and later reads see them.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+
+from app.schemas.batch import BatchItem, BatchRequest
+from app.utils.auth import get_user_id_from_cookie
+from app.utils.serialization import MongoJSONResponse
+
+
+router = APIRouter()
+logger = logging.getLogger("peachytask.batch")
+
+# need cookies set/cleared on the outer response, stream, or would recurse
+_NOT_BATCHABLE = {"/batch", "/events", "/auth/login", "/auth/signup", "/auth/logout"}
+_READ_METHODS = {"GET"}
+
+
+def max_requests() -> int:
+    try:
+        return int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+    except ValueError:
+        return 20
+
+
+def max_response_bytes() -> int:
+    try:
+        return int(os.getenv("BATCH_MAX_RESPONSE_BYTES", str(2 * 1024 * 1024)))
+    except ValueError:
+        return 2 * 1024 * 1024
+
+
+async def _dispatch(request: Request, user_id: str, item: BatchItem) -> Tuple[int, bytes, Any]:
+    """Run one sub-request through the app; returns (status, raw body, decoded body)."""
+    path, _, query = item.path.partition("?")
+    body = b"" if item.body is None else orjson.dumps(item.body)
+    headers: List[Tuple[bytes, bytes]] = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    for name, value in request.scope.get("headers", []):
+        if name in (b"cookie", b"user-agent", b"origin"):
+            headers.append((name, value))
+    scope: Dict[str, Any] = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": request.scope.get("root_path", ""),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": {"auth_sub": user_id},
+    }
+    sent_body = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status_code = 500
+    content_type = b""
+    chunks: List[bytes] = []
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                if name == b"content-type":
+                    content_type = value
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # one failing sub-request must not fail the batch: earlier writes are committed
+        logger.exception("batch sub-request %s %s failed", item.method, path)
+        raw = orjson.dumps({"detail": "Internal Server Error"})
+        return 500, raw, orjson.loads(raw)
+    raw = b"".join(chunks)
+    if not raw:
+        decoded = None
+    elif content_type.startswith(b"application/json"):
+        decoded = orjson.loads(raw)
+    else:
+        decoded = raw.decode("utf-8", errors="replace")
+    return status_code, raw, decoded
+
+
+def _groups(items: List[BatchItem]) -> List[List[int]]:
+    """Indexes grouped into runs of reads (concurrent) and single writes."""
+    groups: List[List[int]] = []
+    for i, item in enumerate(items):
+        if item.method in _READ_METHODS and groups and items[groups[-1][0]].method in _READ_METHODS:
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    return groups
+
+
+@router.post("/batch")
+async def batch(payload: BatchRequest, request: Request) -> MongoJSONResponse:
+    """Body `{requests: [{method, path, body?}]}`; returns `[{status, body}]` in the same order.
+
+    A sub-request that raises comes back with status 500 and the rest still
+    run. Sub-requests not executed because the response budget ran out come back
+    with status 413. One that ran but whose body no longer fits keeps its
+    real status, with `body: null` and `truncated: true`, so a write is
+    never reported as not done.
+    """
+    items = payload.requests
+    if len(items) > max_requests():
+        raise HTTPException(status_code=413, detail=f"At most {max_requests()} requests per batch")
+    for item in items:
+        if item.path.partition("?")[0].rstrip("/") in _NOT_BATCHABLE:
+            raise HTTPException(status_code=400, detail=f"{item.path} cannot be batched")
+    user_id = get_user_id_from_cookie(request)
+
+    budget = max_response_bytes()
+    used = 0
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    sizes = [0] * len(items)
+    for group in _groups(items):
+        if used > budget:
+            # later sub-requests are not run: their results could not be returned
+            break
+        responses = await asyncio.gather(*[_dispatch(request, user_id, items[i]) for i in group])
+        for i, (status_code, raw, decoded) in zip(group, responses):
+            used += len(raw)
+            sizes[i] = len(raw)
+            results[i] = {"status": status_code, "body": decoded}
+
+    skipped = {"status": 413, "body": {"detail": "Batch response limit reached"}}
+    out: List[Dict[str, Any]] = []
+    running = 0
+    for result, size in zip(results, sizes):
+        running += size
+        if result is None:
+            out.append(skipped)
+        elif running <= budget:
+            out.append(result)
+        else:
+            out.append({"status": result["status"], "body": None, "truncated": True})
+    return MongoJSONResponse(out)
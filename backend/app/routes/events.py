@@ -0,0 +1,65 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.utils.auth import get_user_id_from_cookie
+from app.utils.events import (
+    Subscription,
+    TooManyStreams,
+    get_event_hub,
+    heartbeat_frame,
+    heartbeat_seconds,
+    max_stream_seconds,
+)
+
+
+router = APIRouter()
+
+
+async def event_stream(sub: Subscription, heartbeat: float, max_seconds: float) -> AsyncIterator[bytes]:
+    """SSE body for one subscription: frames as they arrive, a heartbeat
+    when idle, and an orderly end after `max_seconds`."""
+    hub = get_event_hub()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        # reconnect delay hint for EventSource
+        yield b"retry: 3000\n\n"
+        while not sub.closed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            frame = await sub.next(timeout=min(heartbeat, remaining))
+            if frame is not None:
+                yield frame
+            elif not sub.closed and deadline - loop.time() > 0:
+                yield heartbeat_frame()
+        if not sub.closed and sub.drained:
+            # the reconnect after this planned end resumes from here
+            yield heartbeat_frame()
+    finally:
+        hub.bus.unsubscribe(sub)
+
+
+@router.get("/events")
+async def events(request: Request) -> StreamingResponse:
+    """Live change feed for the current user (text/event-stream).
+
+    Events: task.created, task.updated, task.deleted, label.changed,
+    showdown.completed, and resync (refetch everything; sent when this
+    stream fell too far behind, or after a reconnect whose missed events
+    this worker can no longer replay).
+    """
+    user_id = get_user_id_from_cookie(request)
+    try:
+        # a reconnecting EventSource sends Last-Event-ID; replay what it missed
+        sub = get_event_hub().bus.subscribe(user_id, request.headers.get("last-event-id"))
+    except TooManyStreams:
+        raise HTTPException(status_code=429, detail="Too many open event streams")
+    return StreamingResponse(
+        event_stream(sub, heartbeat_seconds(), max_stream_seconds()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,33 +3,30 @@ from typing import Any, Dict, List
 from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.schemas.label import LabelCreate, LabelUpdate
-from app.utils.auth import decode_access_token
+from app.utils.auth import get_user_id_from_cookie
 from app.utils.database import get_database_or_none
 from app.models.label import LabelModel
+from app.utils.cache import NS_LABELS, get_cache, labels_ttl
+from app.utils.events import EVENT_LABEL_CHANGED, get_event_hub
+from app.utils.raw_bson import raw_reads_enabled, raw_to_json
 
 
 router = APIRouter()
 
 
-def _get_user_id_from_cookie(request: Request) -> str:
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_access_token(token)
-    sub = payload.get("sub")
-    if not sub:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    return sub
-
-
 @router.get("/labels")
-async def list_labels(request: Request) -> List[Dict[str, Any]]:
+async def list_labels(request: Request) -> Any:
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     model = LabelModel(db)
-    return await model.list_by_user(user_id)
+    if raw_reads_enabled():
+        raw_docs = await model.list_by_user(user_id, raw=True)
+        return Response(content=raw_to_json(raw_docs), media_type="application/json")
+    return await get_cache().get_or_compute(
+        user_id, NS_LABELS, "list", lambda: model.list_by_user(user_id), ttl=labels_ttl()
+    )
 
 
 @router.post("/labels", status_code=status.HTTP_201_CREATED)
@@ -37,11 +34,14 @@ async def create_label(payload: LabelCreate, request: Request) -> Dict[str, Any]
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     model = LabelModel(db)
     if await model.exists_with_name(user_id, payload.name):
         raise HTTPException(status_code=409, detail="Label name already exists")
-    return await model.create(user_id, payload.name, payload.color)
+    created = await model.create(user_id, payload.name, payload.color)
+    await get_cache().invalidate(user_id, NS_LABELS)
+    get_event_hub().publish(user_id, {"type": EVENT_LABEL_CHANGED, "action": "created", "label": created})
+    return created
 
 
 @router.patch("/labels/{label_id}")
@@ -49,7 +49,7 @@ async def update_label(label_id: str, payload: LabelUpdate, request: Request) ->
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     model = LabelModel(db)
     fields = {k: v for k, v in payload.model_dump(exclude_unset=True).items()}
     if "name" in fields and fields["name"] is not None:
@@ -59,9 +59,11 @@ async def update_label(label_id: str, payload: LabelUpdate, request: Request) ->
     ok = await model.update(label_id, user_id, fields)
     if not ok:
         raise HTTPException(status_code=404, detail="Label not found")
-    doc = await model.get_by_id_str(label_id)
-    if not doc or doc["user_id"] != user_id:
+    await get_cache().invalidate(user_id, NS_LABELS)
+    doc = await model.get_by_id_str(label_id, user_id)
+    if not doc:
         raise HTTPException(status_code=404, detail="Label not found")
+    get_event_hub().publish(user_id, {"type": EVENT_LABEL_CHANGED, "action": "updated", "label": doc})
     return doc
 
 
@@ -70,11 +72,13 @@ async def delete_label(label_id: str, request: Request) -> Response:
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     model = LabelModel(db)
     ok = await model.delete(label_id, user_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Label not found")
+    await get_cache().invalidate(user_id, NS_LABELS)
+    get_event_hub().publish(user_id, {"type": EVENT_LABEL_CHANGED, "action": "deleted", "id": label_id})
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
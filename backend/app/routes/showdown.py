@@ -1,69 +1,64 @@
-from typing import Any, Dict, List, Optional, Set
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, HTTPException, Query, Request
+from pymongo import ReturnDocument
 import random
 import math
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from app.utils.database import get_database_or_none
-from app.utils.auth import decode_access_token
+from app.utils.auth import get_user_id_from_cookie
+from app.models.comparison import ComparisonModel
+from app.models.label import LabelModel
+from app.models.showdown_event import EVENT_COMPLETE, ShowdownEventModel, day_start
+from app.models.task import TaskModel
 from app.models.user import UserModel
+from app.utils.cache import (
+    NS_LABELS,
+    NS_SHOWDOWN,
+    NS_TASKS,
+    get_cache,
+    labels_ttl,
+    rank_candidates_ttl,
+    stats_ttl,
+)
+from app.utils.events import EVENT_SHOWDOWN_COMPLETED, get_event_hub
+from app.utils.leaderboard import get_leaderboard
+from app.utils.ranking import UserRanking, get_ranking_engine, select_pair
+from app.utils.serialization import serialize_task
+from app.schemas.showdown import CompareRequest
 
 
 router = APIRouter()
 
+# GET /showdown/history reads at most this many days of buckets per call
+_HISTORY_MAX_DAYS = 400
 
-def _get_user_id_from_cookie(request: Request) -> str:
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_access_token(token)
-    sub = payload.get("sub")
-    if not sub:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    return sub
-
-
-def _serialize_task(doc: Dict[str, Any]) -> Dict[str, Any]:
-    out = {**doc}
-    if isinstance(out.get("_id"), ObjectId):
-        out["_id"] = str(out["_id"])
-    if isinstance(out.get("user_id"), ObjectId):
-        out["user_id"] = str(out["user_id"])
-    if isinstance(out.get("label_ids"), list):
-        out["label_ids"] = [str(x) for x in out["label_ids"]]
-    return out
 
+def _rank_val(d: Dict[str, Any]) -> int:
+    # dislike_rank desc (missing -> 0); coerced because un-migrated
+    # documents can still hold strings
+    v = d.get("dislike_rank") or 0
+    try:
+        return int(v)
+    except Exception:
+        return 0
 
-@router.get("/showdown/pair")
-async def get_showdown_pair(request: Request) -> List[Dict[str, Any]]:
-    db = get_database_or_none()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
-    # Exclude immediate last pair if provided (unordered)
-    last_a: Optional[str] = request.query_params.get("last_a")
-    last_b: Optional[str] = request.query_params.get("last_b")
-    avoid_high: Optional[str] = request.query_params.get("avoid_high")
-    last_pair: Set[str] = set()
-    if last_a and last_b:
-        last_pair = {last_a, last_b}
-    coll = db["tasks"]
-    cursor = coll.find({"user_id": ObjectId(user_id), "completed": False})
-    docs = [doc async for doc in cursor]
-    if len(docs) < 2:
-        return [_serialize_task(d) for d in docs]
 
-    # Sort by dislike_rank desc (missing -> 0)
-    def rank_val(d: Dict[str, Any]) -> int:
-        v = d.get("dislike_rank", 0)
-        try:
-            return int(v)
-        except Exception:
-            return 0
+async def _active_tasks(db, user_id: str) -> List[Dict[str, Any]]:
+    cursor = db["tasks"].find({"user_id": ObjectId(user_id), "completed": False})
+    return [doc async for doc in cursor]
+
+
+def _pick_pair(docs: List[Dict[str, Any]], last_pair: Set[str], avoid_high: Optional[str]) -> List[Dict[str, Any]]:
+    """Choose a high-dread vs low-dread pair from the user's active tasks."""
+    if len(docs) < 2:
+        return list(docs)
 
-    docs.sort(key=rank_val, reverse=True)
+    docs = sorted(docs, key=_rank_val, reverse=True)
 
     n = len(docs)
     # Top bucket size scales with n; ensure at least 2 when n >= 4 to avoid sticky top pick
@@ -75,7 +70,7 @@ async def get_showdown_pair(request: Request) -> List[Dict[str, Any]]:
         low_pool = docs[-max(1, n // 2):]
 
     # If ranks are flat (all zero), fallback to random two distinct with retry
-    if rank_val(docs[0]) == rank_val(docs[-1]):
+    if _rank_val(docs[0]) == _rank_val(docs[-1]):
         choices = docs[:]
         random.shuffle(choices)
         a, b = choices[0], choices[1]
@@ -85,7 +80,7 @@ async def get_showdown_pair(request: Request) -> List[Dict[str, Any]]:
             random.shuffle(choices)
             a, b = choices[0], choices[1]
             tries -= 1
-        return [_serialize_task(a), _serialize_task(b)]
+        return [a, b]
 
     # Pick high + low with contrast and avoid repeating last_pair (unordered)
     random.shuffle(high_pool)
@@ -113,15 +108,82 @@ async def get_showdown_pair(request: Request) -> List[Dict[str, Any]]:
         # last resort: just pick the first different
         low = low_candidates[0]
 
-    return [_serialize_task(high), _serialize_task(low)]
+    return [high, low]
+
+
+def _last_pair(last_a: Optional[str], last_b: Optional[str]) -> Set[str]:
+    # Exclude immediate last pair if provided (unordered)
+    return {last_a, last_b} if last_a and last_b else set()
+
+
+@router.get("/showdown/pair")
+async def get_showdown_pair(request: Request) -> List[Dict[str, Any]]:
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    last_pair = _last_pair(request.query_params.get("last_a"), request.query_params.get("last_b"))
+    avoid_high: Optional[str] = request.query_params.get("avoid_high")
+    docs = await _active_tasks(db, user_id)
+    return [serialize_task(d) for d in _pick_pair(docs, last_pair, avoid_high)]
+
+
+@router.get("/showdown/bootstrap")
+async def showdown_bootstrap(
+    request: Request,
+    last_a: Optional[str] = None,
+    last_b: Optional[str] = None,
+    avoid_high: Optional[str] = None,
+    selected_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Everything the VS screen needs in one round trip.
+
+    Returns `{pair, active_count, ranked_count, selected, labels}`; `selected`
+    is the task for `selected_id` (resuming a showdown) or null. The reads
+    run concurrently.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+
+    async def load_selected() -> Optional[Dict[str, Any]]:
+        if not selected_id:
+            return None
+        return await TaskModel(db).get_by_id_str(selected_id, user_id)
+
+    label_model = LabelModel(db)
+    active, selected, labels = await asyncio.gather(
+        _active_tasks(db, user_id),
+        load_selected(),
+        # same cache entry as GET /labels
+        get_cache().get_or_compute(
+            user_id, NS_LABELS, "list", lambda: label_model.list_by_user(user_id), ttl=labels_ttl()
+        ),
+    )
+    pair = _pick_pair(active, _last_pair(last_a, last_b), avoid_high)
+    return {
+        "pair": [serialize_task(d) for d in pair],
+        "active_count": len(active),
+        "ranked_count": sum(1 for d in active if _rank_val(d) > 0),
+        "selected": serialize_task(selected) if selected else None,
+        "labels": labels,
+    }
 
 
 @router.post("/showdown/complete")
-async def showdown_complete(payload: Dict[str, Any], request: Request) -> Dict[str, Any]:
+async def showdown_complete(
+    payload: Dict[str, Any], request: Request, include: str = ""
+) -> Dict[str, Any]:
+    """Complete a task from the VS screen.
+
+    `?include=stats` adds the user's showdown stats (as from GET
+    /showdown/stats) under `stats`, read concurrently with the counter update.
+    """
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     task_id: str = payload.get("task_id")
     seconds: int = int(payload.get("timer_seconds") or 0)
     if not task_id:
@@ -131,53 +193,54 @@ async def showdown_complete(payload: Dict[str, Any], request: Request) -> Dict[s
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid task_id")
     coll = db["tasks"]
-    current = await coll.find_one({"_id": oid})
-    if not current:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if str(current.get("user_id")) != user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
     now = datetime.now(timezone.utc)
-    await coll.update_one(
-        {"_id": oid},
-        {"$set": {
-            "completed": True,
-            "completed_via_showdown": True,
-            "showdown_timer_seconds": seconds,
-            "updated_at": now,
-        }}
+    changes = {
+        "completed": True,
+        "completed_via_showdown": True,
+        "showdown_timer_seconds": seconds,
+        "updated_at": now,
+    }
+    # Ownership is part of the filter; the pre-image tells us whether this
+    # completion is new, and the post-image is the pre-image plus `changes`.
+    before = await coll.find_one_and_update(
+        {"_id": oid, "user_id": ObjectId(user_id)},
+        {"$set": changes},
+        return_document=ReturnDocument.BEFORE,
     )
+    if before is None:
+        # missing or another user's task: both look the same from a user-scoped filter
+        raise HTTPException(status_code=404, detail="Task not found")
+    await get_cache().invalidate(user_id, NS_TASKS, NS_SHOWDOWN)
+    already_counted = bool(before.get("completed")) and bool(before.get("completed_via_showdown"))
     # Increment user "peaches peached" with a fun random amount
-    try:
-        users = UserModel(db)
-        udoc = await users.get_by_id_str(user_id)
-        if udoc:
-            inc = random.randint(3, 9)
-            await db[users.collection_name].update_one({"_id": udoc["_id"]}, {"$inc": {"peaches_peached_total": inc}})
-    except Exception:
-        pass
-    # Load updated task and compute simple stats for convenience
-    updated = await coll.find_one({"_id": oid})
-    serialized = _serialize_task(updated)
-    peaches_total = 0
-    total_completed = 0
-    try:
-        users = UserModel(db)
-        udoc = await users.get_by_id_str(user_id)
-        if udoc:
-            peaches_total = int(udoc.get("peaches_peached_total") or 0)
-        total_completed = await coll.count_documents({
-            "user_id": ObjectId(user_id),
-            "completed": True,
-            "completed_via_showdown": True,
-        })
-    except Exception:
-        pass
-    # Return task fields plus convenience totals and the increment used (if set)
-    out: Dict[str, Any] = {**serialized}
-    if 'inc' in locals():
-        out["peaches_increment"] = inc
-    out["peaches_peached_total"] = peaches_total
-    out["total_completed"] = total_completed
+    inc = random.randint(3, 9)
+    users = UserModel(db)
+    add_completion = users.add_showdown_completion(user_id, peaches=inc, completed=0 if already_counted else 1)
+    log_event = ShowdownEventModel(db).append(
+        user_id, EVENT_COMPLETE, task_id, at=now, timer_seconds=seconds, peaches=inc, counts=not already_counted
+    )
+    stats: Optional[Dict[str, Any]] = None
+    if "stats" in include.split(","):
+        # the task write above is done, so the stats scan already sees it
+        counters, _, stats = await asyncio.gather(add_completion, log_event, _compute_showdown_stats(db, user_id))
+    else:
+        counters, _ = await asyncio.gather(add_completion, log_event)
+
+    task_doc = serialize_task({**before, **changes})
+    out: Dict[str, Any] = dict(task_doc)
+    out["peaches_increment"] = inc
+    out["peaches_peached_total"] = int((counters or {}).get("peaches_peached_total") or 0)
+    out["total_completed"] = int((counters or {}).get("showdown_completed_total") or 0)
+    if stats is not None:
+        # read concurrently with the $inc; the counter from the update is authoritative
+        stats["peaches_peached_total"] = out["peaches_peached_total"]
+        await get_cache().set(user_id, NS_SHOWDOWN, "stats", stats, ttl=stats_ttl())
+        out["stats"] = stats
+    get_event_hub().publish(user_id, {
+        "type": EVENT_SHOWDOWN_COMPLETED,
+        "task": task_doc,
+        "total_completed": out["total_completed"],
+    })
     return out
 
 
@@ -186,35 +249,147 @@ async def showdown_stats(request: Request) -> Dict[str, Any]:
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
-    coll = db["tasks"]
-    cursor = coll.find({
+    user_id = get_user_id_from_cookie(request)
+    # full scan of the user's showdown completions: computed once per cache
+    # version, with concurrent misses sharing one computation
+    return await get_cache().get_or_compute(
+        user_id, NS_SHOWDOWN, "stats", lambda: _compute_showdown_stats(db, user_id), ttl=stats_ttl()
+    )
+
+
+def _display_name(user_id: ObjectId) -> str:
+    # leaderboard is visible to everyone: a stable label that reveals nothing about the account
+    return "Peach " + hashlib.sha256(str(user_id).encode()).hexdigest()[:6]
+
+
+@router.get("/showdown/leaderboard")
+async def showdown_leaderboard(request: Request, limit: int = Query(10, ge=1, le=100)) -> Dict[str, Any]:
+    """Top `limit` users by peaches, plus the caller's own rank.
+
+    The top slice is read live off the `peaches_desc` index. The caller's
+    rank is their live total bisected into the worker's snapshot of all
+    totals, which is at most `LEADERBOARD_MAX_AGE_SECONDS` old
+    (`snapshot_age_seconds` says how old). Ties share a rank.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    users = UserModel(db)
+    top_docs, me, snapshot = await asyncio.gather(
+        users.top_by_peaches(limit),
+        users.collection.find_one({"_id": ObjectId(user_id)}, {"peaches_peached_total": 1}),
+        get_leaderboard().snapshot(db),
+    )
+    top: List[Dict[str, Any]] = []
+    for i, doc in enumerate(top_docs):
+        peaches = int(doc.get("peaches_peached_total", 0))
+        rank = top[-1]["rank"] if top and top[-1]["peaches"] == peaches else i + 1
+        top.append({
+            "rank": rank,
+            "name": _display_name(doc["_id"]),
+            "peaches": peaches,
+            "is_you": str(doc["_id"]) == user_id,
+        })
+    my_peaches = int((me or {}).get("peaches_peached_total", 0) or 0)
+    return {
+        "top": top,
+        "you": {
+            "rank": snapshot.rank_of(my_peaches) if my_peaches > 0 else None,
+            "peaches": my_peaches,
+        },
+        "ranked_users": len(snapshot),
+        "snapshot_age_seconds": round(snapshot.age, 1),
+    }
+
+
+def _parse_day(name: str, value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+@router.get("/showdown/history")
+async def showdown_history(
+    request: Request,
+    bucket: Literal["day", "week"] = "day",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Showdown activity per day or ISO week (Monday start) from the event log.
+
+    Defaults to the last 30 days (`bucket=day`) or 12 weeks (`bucket=week`).
+    Each entry is `{start, completions, undos, net, timer_seconds, peaches}`;
+    `streak_days` counts consecutive days up to today with a net completion.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    end_dt = _parse_day("end", end) or day_start(datetime.now(timezone.utc)) + timedelta(days=1)
+    start_dt = _parse_day("start", start) or end_dt - (timedelta(days=30) if bucket == "day" else timedelta(weeks=12))
+    if end_dt <= start_dt:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end_dt - start_dt > timedelta(days=_HISTORY_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Range is limited to {_HISTORY_MAX_DAYS} days")
+    events = ShowdownEventModel(db)
+    rows, streak = await asyncio.gather(
+        events.rollup(user_id, start_dt, end_dt, unit=bucket), events.streak_days(user_id)
+    )
+    return {
+        "bucket": bucket,
+        "buckets": [
+            {
+                "start": r["_id"],
+                "completions": r["completions"],
+                "undos": r["undos"],
+                "net": r["completions"] - r["undos"],
+                "timer_seconds": r["timer_seconds"],
+                "peaches": r["peaches"],
+            }
+            for r in rows
+        ],
+        "streak_days": streak,
+    }
+
+
+async def _iter_showdown_completions(db, user_id: str):
+    # archived tasks are completed tasks too; stats span both collections
+    query = {
         "user_id": ObjectId(user_id),
         "completed": True,
         "completed_via_showdown": True,
-    })
-    total_completed = 0
-    total_time_seconds = 0
-    last_dt: Optional[datetime] = None
-    day_buckets: Set[str] = set()
-    async for doc in cursor:
-        total_completed += 1
-        try:
-            total_time_seconds += int(doc.get("showdown_timer_seconds") or 0)
-        except Exception:
-            pass
-        dt: Optional[datetime] = doc.get("updated_at") or None
-        if isinstance(dt, datetime):
-            if last_dt is None or dt > last_dt:
-                last_dt = dt
-            day_buckets.add((dt.astimezone(timezone.utc)).date().isoformat())
-    # streak: consecutive days up to today (UTC) with at least one completion
-    streak_days = 0
-    today = datetime.now(timezone.utc).date()
-    d = today
-    while d.isoformat() in day_buckets:
-        streak_days += 1
-        d = d.fromordinal(d.toordinal() - 1)
+    }
+    projection = {"showdown_timer_seconds": 1, "updated_at": 1}
+    task_model = TaskModel(db)
+    for coll in (task_model.collection, task_model.archive_collection):
+        async for doc in coll.find(query, projection):
+            yield doc
+
+
+async def _compute_showdown_stats(db, user_id: str) -> Dict[str, Any]:
+    async def scan_completions() -> Tuple[int, int, Optional[datetime]]:
+        total, seconds = 0, 0
+        last: Optional[datetime] = None
+        async for doc in _iter_showdown_completions(db, user_id):
+            total += 1
+            try:
+                seconds += int(doc.get("showdown_timer_seconds") or 0)
+            except Exception:
+                pass
+            dt: Optional[datetime] = doc.get("updated_at") or None
+            if isinstance(dt, datetime) and (last is None or dt > last):
+                last = dt
+        return total, seconds, last
+
+    # streak: same day buckets as /showdown/history, so both screens agree
+    (total_completed, total_time_seconds, last_dt), streak_days = await asyncio.gather(
+        scan_completions(), ShowdownEventModel(db).streak_days(user_id)
+    )
     # Read user's fun counter
     peaches_total = 0
     try:
@@ -233,3 +408,98 @@ async def showdown_stats(request: Request) -> Dict[str, Any]:
     }
 
 
+async def _rank_candidates(db, user_id: str) -> List[List[Any]]:
+    """[task_id, dislike_rank] of the user's active tasks, cached until a task changes.
+
+    Lives in the showdown namespace: task writes invalidate it, rank
+    updates from /showdown/compare do not (the engine has fresher scores).
+    """
+    async def load() -> List[List[Any]]:
+        cursor = db["tasks"].find({"user_id": ObjectId(user_id), "completed": False}, {"dislike_rank": 1})
+        return [[str(d["_id"]), _rank_val(d)] async for d in cursor]
+
+    return await get_cache().get_or_compute(
+        user_id, NS_SHOWDOWN, "rank_candidates", load, ttl=rank_candidates_ttl()
+    )
+
+
+async def _next_comparison(
+    db, user_id: str, state: UserRanking, last_pair: Set[str]
+) -> Dict[str, Any]:
+    candidates = await _rank_candidates(db, user_id)
+    ids = [ObjectId(tid) for tid, _ in candidates]
+    theta, variance = state.candidates(ids)
+    exclude = None
+    if len(last_pair) == 2:
+        pos = [i for i, (tid, _) in enumerate(candidates) if tid in last_pair]
+        exclude = (pos[0], pos[1]) if len(pos) == 2 else None
+    picked = select_pair(theta, variance, exclude=exclude)
+    pair: List[Dict[str, Any]] = []
+    if picked is not None:
+        want = [ids[picked[0]], ids[picked[1]]]
+        cursor = db["tasks"].find({"_id": {"$in": want}, "user_id": ObjectId(user_id)})
+        docs = {d["_id"]: d async for d in cursor}
+        pair = [serialize_task(docs[oid]) for oid in want if oid in docs]
+    return {
+        "pair": pair,
+        "active_count": len(candidates),
+        "ranked_count": sum(1 for tid, rank in candidates if rank > 0 or ObjectId(tid) in state.index),
+        "comparisons": state.comparisons,
+    }
+
+
+@router.get("/showdown/rank/next")
+async def showdown_rank_next(
+    request: Request, last_a: Optional[str] = None, last_b: Optional[str] = None
+) -> Dict[str, Any]:
+    """The most informative comparison to ask next on the rank screen.
+
+    Picks the active-task pair whose answer is least predictable under the
+    current scores, weighted by how uncertain those scores are (see
+    `select_pair`). Returns `{pair, active_count, ranked_count, comparisons}`.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    state, _, _ = await get_ranking_engine().refresh(db, user_id, write=False)
+    return await _next_comparison(db, user_id, state, _last_pair(last_a, last_b))
+
+
+@router.post("/showdown/compare")
+async def showdown_compare(payload: CompareRequest, request: Request, include: str = "") -> Dict[str, Any]:
+    """Record "I dread `winner_id` more than `loser_id`" answers and rerank.
+
+    The comparisons are appended to the user's log, Bradley-Terry scores
+    are refitted (see `app.utils.ranking`) and the tasks whose
+    `dislike_rank` changed are returned under `updated`. `?include=next`
+    adds the next comparison (as from GET /showdown/rank/next) under `next`.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    pairs = [(c.winner_id, c.loser_id) for c in payload.comparisons]
+    task_ids = {ObjectId(t) for pair in pairs for t in pair}
+    owned = await db["tasks"].count_documents({"_id": {"$in": list(task_ids)}, "user_id": ObjectId(user_id)})
+    if owned != len(task_ids):
+        raise HTTPException(status_code=400, detail="Task does not exist")
+    await ComparisonModel(db).record(user_id, pairs)
+    # comparing a task again hands its rank back to the fit
+    await db["tasks"].update_many(
+        {"_id": {"$in": list(task_ids)}, "user_id": ObjectId(user_id), "dislike_rank_manual": True},
+        {"$unset": {"dislike_rank_manual": ""}},
+    )
+    state, iterations, updated = await get_ranking_engine().refresh(db, user_id)
+    if updated:
+        await get_cache().invalidate(user_id, NS_TASKS)
+    out: Dict[str, Any] = {
+        "recorded": len(pairs),
+        "total_comparisons": state.comparisons,
+        "iterations": iterations,
+        "updated": updated,
+    }
+    if "next" in include.split(","):
+        last = pairs[-1]
+        out["next"] = await _next_comparison(db, user_id, state, {last[0], last[1]})
+    return out
@@ -1,41 +1,66 @@
-from datetime import date
-from typing import Any, Dict, List
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response, status
 
-from app.schemas.task import TaskBase, TaskCreate
+from app.schemas.task import TaskBase, TaskCreate, coerce_datetime
 from app.utils.database import get_database_or_none
 from app.models.task import TaskModel
-from app.utils.auth import decode_access_token
+from app.utils.auth import get_user_id_from_cookie
 from app.models.label import LabelModel
+from app.models.user import UserModel
+from app.models.showdown_event import EVENT_UNDO, ShowdownEventModel
+from app.utils.background import run_with_retries
+from app.utils.cache import NS_SHOWDOWN, NS_TASKS, get_cache, summary_ttl
+from app.utils.events import EVENT_TASK_CREATED, EVENT_TASK_DELETED, EVENT_TASK_UPDATED, get_event_hub
+from app.utils.raw_bson import raw_reads_enabled, raw_to_json
+from app.utils.serialization import MongoJSONResponse, serialize_task
 
 
 router = APIRouter()
 
 
-def _get_user_id_from_cookie(request: Request) -> str:
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_access_token(token)
-    sub = payload.get("sub")
-    if not sub:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    return sub
+def _counts_as_showdown_completion(doc: Dict[str, Any]) -> bool:
+    return bool(doc.get("completed")) and bool(doc.get("completed_via_showdown"))
 
 
-def _serialize_task(doc: Dict[str, Any]) -> Dict[str, Any]:
-    # Convert ObjectId fields to strings for API responses
-    out = {**doc}
-    if isinstance(out.get("_id"), ObjectId):
-        out["_id"] = str(out["_id"])
-    if isinstance(out.get("user_id"), ObjectId):
-        out["user_id"] = str(out["user_id"])
-    # label_ids as strings
-    if isinstance(out.get("label_ids"), list):
-        out["label_ids"] = [str(x) for x in out["label_ids"]]
-    return out
+async def _validate_label_ids(db, label_ids: List[str], user_id: str) -> List[ObjectId]:
+    """The ids as ObjectIds; 400 for a missing label, 403 for another user's."""
+    label_model = LabelModel(db)
+    validated: List[ObjectId] = []
+    for label_id_str in label_ids:
+        if not await label_model.get_by_id_str(label_id_str, user_id):
+            # the unscoped lookup only runs on this error path
+            if await label_model.exists(label_id_str):
+                raise HTTPException(status_code=403, detail="Label does not belong to user")
+            raise HTTPException(status_code=400, detail="Label does not exist")
+        validated.append(ObjectId(label_id_str))
+    return validated
+
+
+def _parse_datetime_param(name: str, value: Optional[str]) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    try:
+        return coerce_datetime(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+
+
+def _encode_due_cursor(doc: Dict[str, Any]) -> str:
+    deadline: datetime = doc["deadline"]
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return f"{int(deadline.timestamp() * 1000)}_{doc['_id']}"
+
+
+def _decode_due_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        ms, oid = cursor.split("_", 1)
+        return datetime.fromtimestamp(int(ms) / 1000, tz=timezone.utc), ObjectId(oid)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.post("/tasks", status_code=status.HTTP_201_CREATED)
@@ -43,7 +68,7 @@ async def create_task(payload: TaskBase, request: Request):
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     # Build TaskCreate with server-side user_id
     tc = TaskCreate(
         title=payload.title,
@@ -59,62 +84,192 @@ async def create_task(payload: TaskBase, request: Request):
     doc["user_id"] = ObjectId(doc["user_id"])  # to ObjectId
     if doc.get("label_ids"):
         # Validate labels belong to the requesting user and exist
-        label_model = LabelModel(db)
-        validated_label_ids: List[ObjectId] = []
-        for label_id_str in doc["label_ids"]:
-            label_doc = await label_model.get_by_id_str(label_id_str)
-            if not label_doc:
-                raise HTTPException(status_code=400, detail="Label does not exist")
-            if label_doc.get("user_id") != user_id:
-                raise HTTPException(status_code=403, detail="Label does not belong to user")
-            validated_label_ids.append(ObjectId(label_id_str))
-        doc["label_ids"] = validated_label_ids
+        doc["label_ids"] = await _validate_label_ids(db, doc["label_ids"], user_id)
     # deadline is already coerced to timezone-aware datetime by schema
 
     task_model = TaskModel(db)
-    created = await task_model.create(doc)
-    return _serialize_task(created)
+    created = serialize_task(await task_model.create(doc))
+    await get_cache().invalidate(user_id, NS_TASKS, NS_SHOWDOWN)
+    get_event_hub().publish(user_id, {"type": EVENT_TASK_CREATED, "task": created})
+    return created
 
 
 @router.get("/tasks")
-async def list_tasks(request: Request) -> List[Dict[str, Any]]:
+async def list_tasks(request: Request) -> Response:
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     task_model = TaskModel(db)
+    if raw_reads_enabled():
+        raw_docs = await task_model.list_by_user(user_id, raw=True)
+        return Response(content=raw_to_json(raw_docs), media_type="application/json")
     docs = await task_model.list_by_user(user_id)
-    return [_serialize_task(d) for d in docs]
+    # ObjectIds are encoded by the response class; no per-doc conversion needed
+    return MongoJSONResponse(docs)
+
+
+@router.get("/tasks/due")
+async def list_due_tasks(
+    request: Request,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    completed: Literal["false", "true", "any"] = "false",
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+) -> Response:
+    """Tasks whose deadline falls in [after, before), soonest first.
+
+    "Due this week" is `?after=<now>&before=<now+7d>`; "overdue" is
+    `?before=<now>` (incomplete only by default; `completed=true` or
+    `completed=any` for the others). Pass the returned `next_cursor` back
+    as `cursor` to fetch the next page.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    task_model = TaskModel(db)
+    docs = await task_model.list_due(
+        user_id,
+        after=_parse_datetime_param("after", after),
+        before=_parse_datetime_param("before", before),
+        completed={"false": False, "true": True, "any": None}[completed],
+        start_after=_decode_due_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    next_cursor = _encode_due_cursor(docs[-1]) if len(docs) == limit else None
+    return MongoJSONResponse({"items": docs, "next_cursor": next_cursor})
+
+
+@router.get("/tasks/calendar")
+async def tasks_calendar(
+    request: Request,
+    start: str,
+    end: str,
+    bucket: Literal["day", "week"] = "day",
+) -> Dict[str, Any]:
+    """Task counts per day or ISO week (Monday start) of deadline in [start, end)."""
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    start_dt = _parse_datetime_param("start", start)
+    end_dt = _parse_datetime_param("end", end)
+    if start_dt is None or end_dt is None or end_dt <= start_dt:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    task_model = TaskModel(db)
+    rows = await task_model.deadline_buckets(user_id, start_dt, end_dt, unit=bucket)
+    return {
+        "bucket": bucket,
+        "buckets": [
+            {"start": r["_id"], "total": r["total"], "completed": r["completed"], "open": r["total"] - r["completed"]}
+            for r in rows
+        ],
+    }
+
+
+@router.get("/tasks/summary")
+async def tasks_summary(request: Request) -> Dict[str, Any]:
+    """Counts for the dashboard's first paint: status, priority, overdue and per-label."""
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    task_model = TaskModel(db)
+
+    async def compute() -> Dict[str, Any]:
+        return await task_model.summary(user_id, now=datetime.now(timezone.utc))
+
+    return await get_cache().get_or_compute(user_id, NS_TASKS, "summary", compute, ttl=summary_ttl())
+
+
+@router.get("/tasks/search")
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    mode: Literal["text", "prefix"] = "text",
+    skip: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=50),
+) -> Response:
+    """Search the caller's tasks.
+
+    `mode=text` ranks title/description matches by relevance; `mode=prefix`
+    is the type-ahead variant that matches the start of the title.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="q must be a non-empty string")
+    task_model = TaskModel(db)
+    search = task_model.search_prefix if mode == "prefix" else task_model.search_text
+    # fetch one extra to know whether another page exists
+    docs = await search(user_id, query, skip=skip, limit=limit + 1)
+    return MongoJSONResponse({"items": docs[:limit], "has_more": len(docs) > limit})
+
+
+@router.get("/tasks/archive")
+async def list_archived_tasks(
+    request: Request,
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+) -> Response:
+    """Page through archived (long-completed) tasks, newest first.
+
+    Pass the returned `next_before` as `before` to get the next page.
+    """
+    db = get_database_or_none()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    user_id = get_user_id_from_cookie(request)
+    before_id: Optional[ObjectId] = None
+    if before:
+        try:
+            before_id = ObjectId(before)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid before")
+    task_model = TaskModel(db)
+    docs = await task_model.list_archived(user_id, before_id=before_id, limit=limit)
+    next_before = str(docs[-1]["_id"]) if len(docs) == limit else None
+    return MongoJSONResponse({"items": docs, "next_before": next_before})
 
 
 @router.get("/tasks/{task_id}")
-async def get_task(task_id: str, request: Request) -> Dict[str, Any]:
+async def get_task(task_id: str, request: Request, include: str = "") -> Dict[str, Any]:
+    """One task. Long descriptions come back as a preview with
+    `description_truncated: true`; `?include=body` returns the full text."""
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     task_model = TaskModel(db)
-    doc = await task_model.get_by_id_str(task_id)
+    doc = await task_model.get_by_id_str(task_id, user_id, include_archive=True)
     if not doc:
         raise HTTPException(status_code=404, detail="Task not found")
-    # ownership check
-    if str(doc.get("user_id")) != user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-    return _serialize_task(doc)
+    if "body" in include.split(","):
+        doc = await task_model.with_body(doc, user_id)
+    return serialize_task(doc)
 
 
 @router.patch("/tasks/{task_id}")
-async def update_task(task_id: str, payload: Dict[str, Any], request: Request) -> Dict[str, Any]:
+async def update_task(
+    task_id: str, payload: Dict[str, Any], request: Request, background_tasks: BackgroundTasks
+) -> Dict[str, Any]:
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     task_model = TaskModel(db)
-    current = await task_model.get_by_id_str(task_id)
+    current = await task_model.get_by_id_str(task_id, user_id, include_archive=True)
     if not current:
         raise HTTPException(status_code=404, detail="Task not found")
-    if str(current.get("user_id")) != user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    if current.pop("archived", False):
+        # editing an archived task (e.g. reopening it) brings it back to the hot collection;
+        # the sweep archives it again once it is old and completed
+        await task_model.restore(task_id, user_id)
 
     # Accept partial updates validated by schema
     from app.schemas.task import TaskUpdate
@@ -123,37 +278,39 @@ async def update_task(task_id: str, payload: Dict[str, Any], request: Request) -
     fields = {k: v for k, v in upd.model_dump(exclude_unset=True).items()}
     if "label_ids" in fields and fields["label_ids"] is not None:
         # Validate labels belong to user
-        label_model = LabelModel(db)
-        input_label_ids: List[str] = fields["label_ids"]
-        validated_label_ids: List[ObjectId] = []
-        for label_id_str in input_label_ids:
-            label_doc = await label_model.get_by_id_str(label_id_str)
-            if not label_doc:
-                raise HTTPException(status_code=400, detail="Label does not exist")
-            if label_doc.get("user_id") != user_id:
-                raise HTTPException(status_code=403, detail="Label does not belong to user")
-            validated_label_ids.append(ObjectId(label_id_str))
-        fields["label_ids"] = validated_label_ids
-    ok = await task_model.update_fields(task_id, fields)
+        fields["label_ids"] = await _validate_label_ids(db, fields["label_ids"], user_id)
+    ok = await task_model.update_fields(task_id, user_id, fields)
     if not ok:
         raise HTTPException(status_code=404, detail="Task not found")
-    doc = await task_model.get_by_id_str(task_id)
-    return _serialize_task(doc)
+    await get_cache().invalidate(user_id, NS_TASKS, NS_SHOWDOWN)
+    if _counts_as_showdown_completion(current) and (
+        fields.get("completed") is False or fields.get("completed_via_showdown") is False
+    ):
+        # undo of a showdown completion: log it, and refresh the user's counter off the response path
+        await ShowdownEventModel(db).append(
+            user_id, EVENT_UNDO, task_id, timer_seconds=int(current.get("showdown_timer_seconds") or 0)
+        )
+        background_tasks.add_task(run_with_retries, UserModel(db).reconcile_showdown_completed, user_id)
+    doc = serialize_task(await task_model.get_by_id_str(task_id, user_id))
+    get_event_hub().publish(user_id, {"type": EVENT_TASK_UPDATED, "task": doc})
+    return doc
 
 
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_task(task_id: str, request: Request) -> Response:
+async def delete_task(task_id: str, request: Request, background_tasks: BackgroundTasks) -> Response:
     db = get_database_or_none()
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    user_id = _get_user_id_from_cookie(request)
+    user_id = get_user_id_from_cookie(request)
     task_model = TaskModel(db)
-    current = await task_model.get_by_id_str(task_id)
+    current = await task_model.get_by_id_str(task_id, user_id, include_archive=True)
     if not current:
         raise HTTPException(status_code=404, detail="Task not found")
-    if str(current.get("user_id")) != user_id:
-        raise HTTPException(status_code=403, detail="Forbidden")
-    await task_model.delete(task_id)
+    await task_model.delete(task_id, user_id)
+    await get_cache().invalidate(user_id, NS_TASKS, NS_SHOWDOWN)
+    get_event_hub().publish(user_id, {"type": EVENT_TASK_DELETED, "id": task_id})
+    if _counts_as_showdown_completion(current):
+        background_tasks.add_task(run_with_retries, UserModel(db).reconcile_showdown_completed, user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
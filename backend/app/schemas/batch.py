@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, List, Literal, Optional
+
+from pydantic import BaseModel, field_validator
+
+
+class BatchItem(BaseModel):
+    method: Literal["GET", "POST", "PATCH", "PUT", "DELETE"]
+    path: str
+    body: Optional[Any] = None
+
+    @field_validator("method", mode="before")
+    @classmethod
+    def upper_method(cls, v: Any) -> Any:
+        return v.upper() if isinstance(v, str) else v
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, v: str) -> str:
+        if not v.startswith("/"):
+            raise ValueError("path must start with '/'")
+        return v
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
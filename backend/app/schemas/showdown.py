@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.schemas.task import OBJECT_ID_REGEX
+
+
+class ComparisonIn(BaseModel):
+    # winner = the task the user dreads more
+    winner_id: str
+    loser_id: str
+
+    @field_validator("winner_id", "loser_id")
+    @classmethod
+    def validate_ids(cls, v: str) -> str:
+        if not OBJECT_ID_REGEX.fullmatch(v):
+            raise ValueError("task ids must be 24-char hex ObjectId strings")
+        return v
+
+    @model_validator(mode="after")
+    def distinct_tasks(self) -> "ComparisonIn":
+        if self.winner_id == self.loser_id:
+            raise ValueError("a task cannot be compared with itself")
+        return self
+
+
+class CompareRequest(BaseModel):
+    comparisons: List[ComparisonIn] = Field(min_length=1, max_length=100)
@@ -17,6 +17,29 @@ class TaskPriority(str, Enum):
 OBJECT_ID_REGEX = re.compile(r"^[0-9a-fA-F]{24}$")
 
 
+def coerce_datetime(v):
+    """Normalize a date, datetime or ISO string to an aware datetime (naive -> UTC)."""
+    if v is None:
+        return v
+    if isinstance(v, datetime):
+        dt = v
+    elif isinstance(v, date):
+        dt = datetime.combine(v, time.min)
+    elif isinstance(v, str):
+        try:
+            # Try full datetime first
+            dt = datetime.fromisoformat(v)
+        except ValueError:
+            # Fallback: date string YYYY-MM-DD
+            d = date.fromisoformat(v)
+            dt = datetime.combine(d, time.min)
+    else:
+        raise ValueError("deadline must be a date or datetime")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -65,25 +88,7 @@ class TaskBase(BaseModel):
     @field_validator("deadline", mode="before")
     @classmethod
     def coerce_deadline(cls, v):
-        if v is None:
-            return v
-        if isinstance(v, datetime):
-            dt = v
-        elif isinstance(v, date):
-            dt = datetime.combine(v, time.min)
-        elif isinstance(v, str):
-            try:
-                # Try full datetime first
-                dt = datetime.fromisoformat(v)
-            except ValueError:
-                # Fallback: date string YYYY-MM-DD
-                d = date.fromisoformat(v)
-                dt = datetime.combine(d, time.min)
-        else:
-            raise ValueError("deadline must be a date or datetime")
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+        return coerce_datetime(v)
 
 
 class TaskCreate(TaskBase):
@@ -130,8 +135,9 @@ class TaskUpdate(BaseModel):
     @field_validator("dislike_rank")
     @classmethod
     def validate_dislike_rank_optional(cls, v: Optional[int]) -> Optional[int]:
+        # omitted is fine, but an explicit null would store a non-int rank
         if v is None:
-            return v
+            raise ValueError("dislike_rank must be a non-negative integer")
         if not isinstance(v, int) or v < 0:
             raise ValueError("dislike_rank must be a non-negative integer")
         return v
@@ -148,24 +154,8 @@ class TaskUpdate(BaseModel):
     @field_validator("deadline", mode="before")
     @classmethod
     def coerce_deadline_optional(cls, v):
-        if v is None:
-            return v
         # Reuse TaskBase logic
-        if isinstance(v, datetime):
-            dt = v
-        elif isinstance(v, date):
-            dt = datetime.combine(v, time.min)
-        elif isinstance(v, str):
-            try:
-                dt = datetime.fromisoformat(v)
-            except ValueError:
-                d = date.fromisoformat(v)
-                dt = datetime.combine(d, time.min)
-        else:
-            raise ValueError("deadline must be a date or datetime")
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+        return coerce_datetime(v)
 
 
 class TaskPublic(TaskBase):
@@ -173,6 +163,9 @@ class TaskPublic(TaskBase):
     user_id: str
     created_at: datetime
     updated_at: datetime
+    # long descriptions are a preview here; GET /tasks/{id}?include=body has the full text
+    description_length: int = 0
+    description_truncated: bool = False
 
     class Config:
         populate_by_name = True
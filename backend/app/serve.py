@@ -0,0 +1,111 @@
+"""Production launcher: `python -m app.serve`.
+
+Every setting can come from the environment (see `.env.example`) or the
+matching command-line flag; flags win. Workers default to the CPU count.
+
+Before forking, the master imports the app so that configuration and import
+errors fail fast instead of in N workers, and optionally pings Mongo. Each
+worker then runs the app's lifespan startup (connect, prewarm the pool,
+ensure indexes, build OpenAPI) before it starts accepting on the shared
+socket, so no worker takes traffic cold.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+
+APP_IMPORT = "app.main:app"
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _default_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _default_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description="Run the PeachyTask API.")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_int("SERVER_PORT", 8000))
+    parser.add_argument("--workers", type=int, default=_env_int("SERVER_WORKERS", None),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default=os.getenv("SERVER_LOOP", "auto"))
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default=os.getenv("SERVER_HTTP", "auto"))
+    parser.add_argument("--keep-alive", type=int, default=_env_int("SERVER_KEEPALIVE_SECONDS", 5),
+                        help="seconds an idle keep-alive connection is held open")
+    parser.add_argument("--backlog", type=int, default=_env_int("SERVER_BACKLOG", 2048))
+    parser.add_argument("--limit-concurrency", type=int, default=_env_int("SERVER_LIMIT_CONCURRENCY", None),
+                        help="per-worker cap on concurrent connections/tasks before answering 503")
+    parser.add_argument("--graceful-timeout", type=int, default=_env_int("SERVER_GRACEFUL_TIMEOUT_SECONDS", 30),
+                        help="seconds to drain in-flight requests on shutdown")
+    parser.add_argument("--no-preflight-db", action="store_true",
+                        default=os.getenv("SERVER_PREFLIGHT_DB", "1") == "0",
+                        help="skip the Mongo ping in the master before forking")
+    return parser
+
+
+def uvicorn_options(args: argparse.Namespace) -> Dict[str, Any]:
+    workers = args.workers if args.workers and args.workers > 0 else _default_workers()
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": workers,
+        "loop": _default_loop() if args.loop == "auto" else args.loop,
+        "http": _default_http() if args.http == "auto" else args.http,
+        "timeout_keep_alive": args.keep_alive,
+        "backlog": args.backlog,
+        "limit_concurrency": args.limit_concurrency,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "proxy_headers": True,
+        "lifespan": "on",
+    }
+
+
+async def _preflight_db() -> None:
+    from app.utils.database import close_mongo_connection, connect_to_mongo
+
+    try:
+        await connect_to_mongo()
+    finally:
+        await close_mongo_connection()
+
+
+def preflight(check_db: bool = True) -> None:
+    """Import the app (routes, schemas, OpenAPI) once in the master."""
+    from app.main import app
+
+    app.openapi()
+    if check_db:
+        asyncio.run(_preflight_db())
+
+
+def main(argv: Optional[list] = None) -> None:
+    args = build_parser().parse_args(argv)
+    options = uvicorn_options(args)
+    preflight(check_db=not args.no_preflight_db)
+    uvicorn.run(APP_IMPORT, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Shared-secret access for operator endpoints (`/admin/*`).
+
+`ADMIN_TOKEN` unset disables them entirely (404, as if they did not exist).
+Callers send it as `X-Admin-Token`. The same secret signs the short-lived
+`X-Profile` trigger tokens (see `app.utils.profiling`).
+"""
+
+import hashlib
+import hmac
+import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+
+def admin_token() -> Optional[str]:
+    return os.getenv("ADMIN_TOKEN") or None
+
+
+def require_admin(request: Request) -> None:
+    token = admin_token()
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+def sign(expires_at: int, secret: str) -> str:
+    """`<expires_at>.<hmac>` token, valid until the unix time `expires_at`."""
+    mac = hmac.new(secret.encode(), str(expires_at).encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{mac}"
+
+
+def verify_signed(value: str, secret: str, now: Optional[float] = None) -> bool:
+    try:
+        expires_at = int(value.partition(".")[0])
+    except ValueError:
+        return False
+    if expires_at < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(sign(expires_at, secret), value)
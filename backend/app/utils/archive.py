@@ -0,0 +1,152 @@
+"""Hot/cold split for tasks: move long-completed tasks to `tasks_archive`.
+
+`archive_completed_tasks` copies a batch of tasks that were completed (last
+updated) more than `older_than_days` ago into the archive and then deletes
+them from `tasks`, pausing between batches so the sweep never competes with
+request traffic for long. Each batch is idempotent: re-inserting an already
+archived document is ignored, and the delete re-checks the archive criteria
+so a task reopened mid-batch stays hot (its stale archive copy is removed).
+
+`ArchiveJob` runs the sweep periodically inside the app process. A lease in
+`job_leases` ensures only one worker per deployment sweeps at a time.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.models.task import TaskModel
+
+
+logger = logging.getLogger("peachytask.archive")
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+async def archive_batch(db: AsyncIOMotorDatabase, cutoff: datetime, batch_size: int) -> int:
+    """Move up to `batch_size` eligible tasks; returns how many left the hot collection."""
+    model = TaskModel(db)
+    criteria: Dict[str, Any] = {"completed": True, "updated_at": {"$lt": cutoff}}
+    cursor = model.collection.find(criteria).sort("updated_at", ASCENDING).limit(batch_size)
+    docs: List[Dict[str, Any]] = [doc async for doc in cursor]
+    if not docs:
+        return 0
+    ids = [d["_id"] for d in docs]
+    try:
+        await model.archive_collection.insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        # duplicates are copies from an interrupted earlier run; anything else is real
+        if any(err.get("code") != 11000 for err in exc.details.get("writeErrors", [])):
+            raise
+    result = await model.collection.delete_many({"_id": {"$in": ids}, **criteria})
+    if result.deleted_count < len(ids):
+        # reopened or edited since we read it: keep it hot, drop the stale copy
+        still_hot = [d["_id"] async for d in model.collection.find({"_id": {"$in": ids}}, {"_id": 1})]
+        if still_hot:
+            await model.archive_collection.delete_many({"_id": {"$in": still_hot}})
+    return result.deleted_count
+
+
+async def archive_completed_tasks(
+    db: AsyncIOMotorDatabase,
+    older_than_days: float,
+    batch_size: int = 500,
+    pause_seconds: float = 0.5,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Run batches until nothing is eligible (or `max_batches`); returns tasks moved."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        n = await archive_batch(db, cutoff, batch_size)
+        moved += n
+        batches += 1
+        if n < batch_size:
+            break
+        await asyncio.sleep(pause_seconds)
+    return moved
+
+
+class ArchiveJob:
+    """Periodic archival sweep, started from the app lifespan when enabled."""
+
+    lease_collection = "job_leases"
+    lease_id = "archive_tasks"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.interval = _env_float("ARCHIVE_INTERVAL_SECONDS", 3600)
+        self.older_than_days = _env_float("ARCHIVE_AFTER_DAYS", 30)
+        self.batch_size = int(_env_float("ARCHIVE_BATCH_SIZE", 500))
+        self.pause_seconds = _env_float("ARCHIVE_BATCH_PAUSE_SECONDS", 0.5)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return os.getenv("ARCHIVE_ENABLED", "0").lower() in {"1", "true", "yes"}
+
+    async def _acquire_lease(self) -> bool:
+        now = datetime.now(timezone.utc)
+        expires = now + timedelta(seconds=max(self.interval, 60))
+        try:
+            # matches only a free (expired) lease or our own; otherwise the
+            # upsert collides with the existing lease document
+            await self.db[self.lease_collection].update_one(
+                {"_id": self.lease_id, "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": expires}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # lease is held by another live worker
+            return False
+        return True
+
+    async def run_once(self) -> int:
+        if not await self._acquire_lease():
+            return 0
+        moved = await archive_completed_tasks(
+            self.db, self.older_than_days, batch_size=self.batch_size, pause_seconds=self.pause_seconds
+        )
+        if moved:
+            logger.info("archived %d completed tasks", moved)
+        return moved
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("archive sweep failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,10 +1,18 @@
 from datetime import datetime, timedelta, timezone
 import os
+import secrets
 from typing import Any, Dict, Optional
 
+from fastapi import HTTPException, Request, status
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from app.utils.revocation import get_revocation_list
+
+
+class TokenRevoked(JWTError):
+    """The token's jti was revoked (the user logged out)."""
+
 
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -47,7 +55,13 @@ def create_access_token(
 
     now = datetime.now(timezone.utc)
     expire = now + timedelta(minutes=ttl)
-    to_encode: Dict[str, Any] = {"sub": subject, "iat": int(now.timestamp()), "exp": int(expire.timestamp())}
+    to_encode: Dict[str, Any] = {
+        "sub": subject,
+        "iat": int(now.timestamp()),
+        "exp": int(expire.timestamp()),
+        # lets logout revoke this token (see app.utils.revocation)
+        "jti": secrets.token_urlsafe(16),
+    }
     if additional_claims:
         to_encode.update(additional_claims)
     return jwt.encode(to_encode, secret, algorithm=algorithm)
@@ -60,7 +74,34 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         payload = jwt.decode(token, secret, algorithms=[algorithm])
     except JWTError as exc:
         raise exc
+    if get_revocation_list().is_revoked(payload.get("jti")):
+        raise TokenRevoked("Token has been revoked")
     return payload
 
 
+def get_unverified_subject(token: str) -> Optional[str]:
+    """`sub` claim of a token without checking its signature, expiry or revocation.
 
+    Only for keying (e.g. rate-limit buckets) before the route authenticates;
+    never for authorization.
+    """
+    try:
+        return jwt.get_unverified_claims(token).get("sub") or None
+    except JWTError:
+        return None
+
+
+def get_user_id_from_cookie(request: Request) -> str:
+    """`sub` of the request's access-token cookie; 401 without one."""
+    # sub-requests of POST /batch arrive already authenticated
+    batch_sub = request.scope.get("state", {}).get("auth_sub")
+    if batch_sub:
+        return batch_sub
+    token = request.cookies.get("access_token")
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    payload = decode_access_token(token)
+    sub = payload.get("sub")
+    if not sub:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return sub
@@ -0,0 +1,31 @@
+"""Helpers for side effects that run after the response is sent.
+
+Routes schedule these with FastAPI's `BackgroundTasks`; the client never
+waits for them, and a transient failure is retried with backoff instead of
+surfacing as a failed request.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+
+logger = logging.getLogger("peachytask.background")
+
+
+async def run_with_retries(
+    fn: Callable[..., Awaitable[Any]],
+    *args: Any,
+    attempts: int = 3,
+    base_delay: float = 0.2,
+    **kwargs: Any,
+) -> None:
+    for attempt in range(1, attempts + 1):
+        try:
+            await fn(*args, **kwargs)
+            return
+        except Exception:
+            if attempt == attempts:
+                logger.exception("background task %s failed after %d attempts", getattr(fn, "__name__", fn), attempts)
+                return
+            await asyncio.sleep(base_delay * 2 ** (attempt - 1))
@@ -0,0 +1,257 @@
+"""Per-user cache shared by the routes.
+
+`Cache` sits on top of a pluggable backend:
+
+- `MemoryBackend`: in-process LRU with per-entry TTL (single worker, tests).
+- `RedisBackend`: any client speaking the Redis protocol (`redis.asyncio`),
+  shared by every uvicorn worker.
+
+Keys are namespaced per user and per data family (`tasks`, `labels`,
+`showdown`). Each (user, namespace) pair has a version counter that is part
+of every key; mutation routes call `invalidate()` to bump it, which orphans
+all older entries at once on every worker. `get_or_compute()` collapses
+concurrent misses for the same key into one computation (single-flight).
+"""
+
+import asyncio
+from collections import OrderedDict
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.utils.serialization import json_default
+
+
+NS_TASKS = "tasks"
+NS_LABELS = "labels"
+NS_SHOWDOWN = "showdown"
+
+# version counters outlive any cached value they guard
+_VERSION_TTL_SECONDS = 7 * 24 * 3600
+
+
+class MemoryBackend:
+    """In-process LRU + TTL store."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _live(self, key: str) -> Optional[Tuple[float, Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._live(key)
+        return None if entry is None else entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Set only if absent; returns whether the value was stored."""
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        entry = self._live(key)
+        value = (int(entry[1]) if entry else 0) + 1
+        await self.set(key, value, ttl)
+        return value
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisBackend:
+    """Backend for a `redis.asyncio.Redis`-compatible client.
+
+    Values are stored as JSON, so whatever comes back is plain JSON types
+    (datetimes become ISO strings, which is what the API returns anyway).
+    """
+
+    def __init__(self, client: Any, prefix: str = "peachy"):
+        self.client = client
+        # `clear()` only touches keys under this prefix (the Cache's prefix)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(key)
+        return None if raw is None else orjson.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client.set(key, orjson.dumps(value, default=json_default), px=int(ttl * 1000))
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        ok = await self.client.set(key, orjson.dumps(value, default=json_default), px=int(ttl * 1000), nx=True)
+        return bool(ok)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        value = await self.client.incr(key)
+        await self.client.pexpire(key, int(ttl * 1000))
+        return int(value)
+
+    async def clear(self) -> None:
+        # shared store: never FLUSHDB, only our own keys, in SCAN-sized chunks
+        batch: List[Any] = []
+        async for key in self.client.scan_iter(match=f"{self.prefix}:*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            await self.client.unlink(*batch)
+
+
+class Cache:
+    def __init__(self, backend: Any, prefix: str = "peachy", lock_ttl: float = 10.0):
+        self.backend = backend
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    def _version_key(self, user_id: str, namespace: str) -> str:
+        return f"{self.prefix}:u:{user_id}:{namespace}:ver"
+
+    async def _key(self, user_id: str, namespace: str, key: str) -> str:
+        version = await self.backend.get(self._version_key(user_id, namespace)) or 0
+        return f"{self.prefix}:u:{user_id}:{namespace}:v{version}:{key}"
+
+    async def get(self, user_id: str, namespace: str, key: str) -> Optional[Any]:
+        return await self.backend.get(await self._key(user_id, namespace, key))
+
+    async def set(self, user_id: str, namespace: str, key: str, value: Any, ttl: float) -> None:
+        await self.backend.set(await self._key(user_id, namespace, key), value, ttl)
+
+    async def invalidate(self, user_id: str, *namespaces: str) -> None:
+        """Drop everything cached for `user_id` under the given namespaces."""
+        for namespace in namespaces:
+            await self.backend.incr(self._version_key(user_id, namespace), _VERSION_TTL_SECONDS)
+
+    async def get_or_compute(
+        self,
+        user_id: str,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+    ) -> Any:
+        """Return the cached value or compute it once, however many callers miss together."""
+        full_key = await self._key(user_id, namespace, key)
+        value = await self.backend.get(full_key)
+        if value is not None:
+            return value
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._compute_across_workers(full_key, compute, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+
+    async def _compute_across_workers(self, full_key: str, compute: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        # Other workers share the backend: whoever takes the lock computes,
+        # the rest poll briefly for its result before giving up and computing.
+        lock_key = f"{full_key}:lock"
+        owns_lock = await self.backend.add(lock_key, 1, self.lock_ttl)
+        if not owns_lock:
+            deadline = time.monotonic() + self.lock_ttl
+            delay = 0.01
+            while time.monotonic() < deadline:
+                await asyncio.sleep(delay)
+                value = await self.backend.get(full_key)
+                if value is not None:
+                    return value
+                delay = min(delay * 2, 0.2)
+        try:
+            value = await compute()
+            await self.backend.set(full_key, value, ttl)
+            return value
+        finally:
+            if owns_lock:
+                await self.backend.delete(lock_key)
+
+
+def _get_float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def _build_backend() -> Any:
+    kind = os.getenv("CACHE_BACKEND", "memory").lower()
+    if kind == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        return RedisBackend(redis_asyncio.from_url(url))
+    return MemoryBackend(max_entries=int(_get_float_env("CACHE_MAX_ENTRIES", 10000)))
+
+
+_cache: Optional[Cache] = None
+
+
+def get_cache() -> Cache:
+    global _cache
+    if _cache is None:
+        _cache = Cache(_build_backend())
+    return _cache
+
+
+def set_cache(cache: Optional[Cache]) -> None:
+    """Swap the process-wide cache (tests, or custom wiring at startup)."""
+    global _cache
+    _cache = cache
+
+
+def summary_ttl() -> float:
+    return _get_float_env("SUMMARY_CACHE_TTL_SECONDS", 30.0)
+
+
+def stats_ttl() -> float:
+    return _get_float_env("STATS_CACHE_TTL_SECONDS", 60.0)
+
+
+def labels_ttl() -> float:
+    return _get_float_env("LABELS_CACHE_TTL_SECONDS", 300.0)
+
+
+def rank_candidates_ttl() -> float:
+    return _get_float_env("RANK_CANDIDATES_CACHE_TTL_SECONDS", 300.0)
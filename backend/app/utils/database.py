@@ -1,13 +1,339 @@
+import asyncio
+from collections import deque
+import json
+import logging
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from bson import ObjectId
+from pymongo import monitoring
 
 
 # Load environment variables from .env if present
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+class PoolWaitMonitor(monitoring.ConnectionPoolListener):
+    """Tracks how long operations wait to check a connection out of the pool.
+
+    Exposes a time-decayed moving average (half-life `half_life` seconds) so
+    the value relaxes back to zero once the pool stops being contended,
+    instead of sticking at the last bad sample.
+    """
+
+    def __init__(self, half_life: float = 2.0, alpha: float = 0.2):
+        self.half_life = half_life
+        self.alpha = alpha
+        self._local = threading.local()
+        self._avg_ms = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait_ms(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return self._avg_ms * 0.5 ** (elapsed / self.half_life)
+
+    def _record(self, started: Optional[float]) -> None:
+        if started is None:
+            return
+        sample = (time.monotonic() - started) * 1000.0
+        with self._lock:
+            now = time.monotonic()
+            decayed = self._avg_ms * 0.5 ** ((now - self._updated) / self.half_life)
+            self._avg_ms = decayed + self.alpha * (sample - decayed)
+            self._updated = now
+
+    # checkout start/finish happen on the same driver thread
+    def connection_check_out_started(self, event) -> None:
+        self._local.started = time.monotonic()
+
+    def connection_checked_out(self, event) -> None:
+        self._record(getattr(self._local, "started", None))
+        self._local.started = None
+
+    def connection_check_out_failed(self, event) -> None:
+        self._record(getattr(self._local, "started", None))
+        self._local.started = None
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
+
+    def connection_checked_in(self, event) -> None:
+        pass
+
+
+pool_wait_monitor = PoolWaitMonitor()
+
+
+# command name -> (field holding the filter/pipeline, extra fields that belong to the shape)
+_SHAPED_COMMANDS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "find": ("filter", ("sort", "projection")),
+    "aggregate": ("pipeline", ()),
+    "count": ("query", ()),
+    "distinct": ("query", ("key",)),
+    "findAndModify": ("query", ("sort",)),
+    "update": ("updates", ()),
+    "delete": ("deletes", ()),
+}
+
+# session/transport fields that must not be sent inside an explain
+_EXPLAIN_STRIP = {"lsid", "txnNumber", "autocommit", "startTransaction", "writeConcern"}
+
+
+def _shape_value(value: Any) -> Any:
+    """Replace literals with placeholders, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {k: _shape_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return []
+        # $in lists and the like: one shape regardless of length
+        if all(not isinstance(v, (dict, list, tuple)) for v in value):
+            return ["?"]
+        return [_shape_value(v) for v in value]
+    if isinstance(value, ObjectId):
+        return "?oid"
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    """Stable text for a command's shape, or None for commands we don't track.
+
+    `{"find": "tasks", "filter": {"user_id": ObjectId(..), "completed": False}}`
+    -> `find tasks {"filter": {"user_id": "?oid", "completed": "?"}}`.
+    """
+    spec = _SHAPED_COMMANDS.get(command_name)
+    if spec is None:
+        return None
+    main, extras = spec
+    parts: Dict[str, Any] = {}
+    if command_name == "update":
+        parts["q"] = [_shape_value(u.get("q", {})) for u in command.get("updates", [])[:1]]
+        parts["multi"] = any(u.get("multi") for u in command.get("updates", []))
+    elif command_name == "delete":
+        parts["q"] = [_shape_value(d.get("q", {})) for d in command.get("deletes", [])[:1]]
+    elif main in command:
+        parts[main] = _shape_value(command[main])
+    for field in extras:
+        if field not in command:
+            continue
+        value = command[field]
+        if field == "sort":
+            parts[field] = dict(value)
+        elif field == "projection":
+            parts[field] = sorted(value)
+        else:
+            parts[field] = value
+    return f"{command_name} {command.get(command_name)} {json.dumps(parts, default=str)}"
+
+
+def _plan_summary(explain: Dict[str, Any]) -> Dict[str, Any]:
+    stats = explain.get("executionStats", {})
+    planner = explain.get("queryPlanner", {})
+    stages: List[str] = []
+    plan = planner.get("winningPlan", {})
+    # aggregate explains nest the find plan under the first $cursor stage
+    if not plan and explain.get("stages"):
+        cursor = explain["stages"][0].get("$cursor", {})
+        plan = cursor.get("queryPlanner", {}).get("winningPlan", {})
+        stats = cursor.get("executionStats", stats)
+    node = plan.get("queryPlan", plan)
+    while node:
+        stage = node.get("stage", "?")
+        if node.get("indexName"):
+            stage += f"({node['indexName']})"
+        stages.append(stage)
+        node = node.get("inputStage") or (node.get("inputStages") or [None])[0]
+    return {
+        "stages": stages,
+        "n_returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_ms": stats.get("executionTimeMillis"),
+        "winning_plan": plan,
+    }
+
+
+def _writes_output(command: Dict[str, Any]) -> bool:
+    """Aggregations ending in $out/$merge must not be re-run by explain."""
+    pipeline = command.get("pipeline") or []
+    return bool(pipeline) and isinstance(pipeline[-1], dict) and any(k in pipeline[-1] for k in ("$out", "$merge"))
+
+
+class _ShapeStats:
+    __slots__ = ("shape", "count", "total_ms", "max_ms", "slow_count", "samples", "plan", "explained")
+
+    def __init__(self, shape: str):
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_count = 0
+        self.samples: Deque[float] = deque(maxlen=128)
+        self.plan: Optional[Dict[str, Any]] = None
+        self.explained = False
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "shape": self.shape,
+            "count": self.count,
+            "slow_count": self.slow_count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+            "plan": self.plan,
+        }
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """Per-shape latency stats for Mongo commands, with one explain per slow shape.
+
+    The first time a shape takes longer than `threshold_ms` its command is
+    re-run as `explain` with executionStats verbosity (at most one explain
+    every `explain_interval` seconds across all shapes) and the plan summary
+    is kept next to the stats. Explains run on the event loop passed to
+    `start`; without one, only stats are recorded.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, explain_interval: float = 60.0, max_shapes: int = 500):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[Any, int], Tuple[str, str, Dict[str, Any]]] = {}
+        self._shapes: Dict[str, _ShapeStats] = {}
+        self._last_explain = float("-inf")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[AsyncIOMotorClient] = None
+
+    def start(self, client: AsyncIOMotorClient) -> None:
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self) -> None:
+        self._client = None
+        self._loop = None
+
+    def started(self, event) -> None:
+        shape = query_shape(event.command_name, event.command)
+        if shape is not None:
+            with self._lock:
+                self._inflight[(event.connection_id, event.request_id)] = (shape, event.database_name, event.command)
+
+    def succeeded(self, event) -> None:
+        self._finish(event, event.duration_micros / 1000.0)
+
+    def failed(self, event) -> None:
+        self._finish(event, event.duration_micros / 1000.0)
+
+    def _finish(self, event, ms: float) -> None:
+        with self._lock:
+            entry = self._inflight.pop((event.connection_id, event.request_id), None)
+            if entry is None:
+                return
+            shape, db_name, command = entry
+            stats = self._shapes.get(shape)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # make room by forgetting the shape that has cost the least
+                    del self._shapes[min(self._shapes.values(), key=lambda s: s.total_ms).shape]
+                stats = self._shapes[shape] = _ShapeStats(shape)
+            stats.count += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+            stats.samples.append(ms)
+            if ms < self.threshold_ms:
+                return
+            stats.slow_count += 1
+            now = time.monotonic()
+            if stats.explained or self._loop is None or now - self._last_explain < self.explain_interval:
+                return
+            stats.explained = True
+            self._last_explain = now
+            loop = self._loop
+        loop.call_soon_threadsafe(lambda: loop.create_task(self._explain(shape, db_name, command)))
+
+    async def _explain(self, shape: str, db_name: str, command: Dict[str, Any]) -> None:
+        if self._client is None:
+            return
+        if _writes_output(command):
+            return
+        inner = {k: v for k, v in command.items() if not k.startswith("$") and k not in _EXPLAIN_STRIP}
+        try:
+            result = await self._client[db_name].command({"explain": inner, "verbosity": "executionStats"})
+            plan: Dict[str, Any] = _plan_summary(result)
+        except Exception as exc:  # explain is best-effort diagnostics
+            logger.warning("explain failed for %s: %s", shape, exc)
+            plan = {"error": str(exc)}
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is not None:
+                stats.plan = plan
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[Dict[str, Any]]:
+        key = {
+            "total": lambda s: s.total_ms,
+            "p95": lambda s: s.percentile(0.95),
+            "max": lambda s: s.max_ms,
+            "slow": lambda s: s.slow_count,
+        }.get(order_by, lambda s: s.total_ms)
+        with self._lock:
+            ranked = sorted(self._shapes.values(), key=key, reverse=True)[:limit]
+            return [s.as_dict() for s in ranked]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._last_explain = float("-inf")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def slow_queries_enabled() -> bool:
+    return os.getenv("SLOW_QUERY_ENABLED", "1") != "0"
+
+
+slow_query_monitor = SlowQueryMonitor(
+    threshold_ms=_env_float("SLOW_QUERY_THRESHOLD_MS", 100.0),
+    explain_interval=_env_float("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", 60.0),
+    max_shapes=int(_env_float("SLOW_QUERY_MAX_SHAPES", 500)),
+)
+
 _mongo_client: Optional[AsyncIOMotorClient] = None
 _database: Optional[AsyncIOMotorDatabase] = None
 
@@ -29,6 +355,14 @@ def _resolve_database_name() -> str:
     return _get_env("MONGO_DB_NAME_DEV")
 
 
+def _get_min_pool_size() -> int:
+    raw = os.getenv("MONGO_MIN_POOL_SIZE", "5")
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 5
+
+
 async def connect_to_mongo() -> AsyncIOMotorDatabase:
     global _mongo_client, _database
 
@@ -38,16 +372,39 @@ async def connect_to_mongo() -> AsyncIOMotorDatabase:
     mongo_uri = _get_env("MONGO_URI")
     db_name = _resolve_database_name()
 
-    _mongo_client = AsyncIOMotorClient(mongo_uri)
+    listeners: List[Any] = [pool_wait_monitor]
+    if slow_queries_enabled():
+        listeners.append(slow_query_monitor)
+    _mongo_client = AsyncIOMotorClient(
+        mongo_uri,
+        minPoolSize=_get_min_pool_size(),
+        event_listeners=listeners,
+    )
     _database = _mongo_client[db_name]
+    if slow_queries_enabled():
+        slow_query_monitor.start(_mongo_client)
 
     # lightweight connectivity check
     await _database.command("ping")
     return _database
 
 
+async def prewarm_pool() -> None:
+    """Open `minPoolSize` connections now instead of on the first requests.
+
+    Concurrent pings each check out their own connection, so the pool is
+    filled (TCP + TLS + auth handshakes done) before traffic arrives.
+    """
+    if _database is None:
+        return
+    size = _get_min_pool_size()
+    if size > 1:
+        await asyncio.gather(*[_database.command("ping") for _ in range(size)])
+
+
 async def close_mongo_connection() -> None:
     global _mongo_client, _database
+    slow_query_monitor.stop()
     if _mongo_client is not None:
         _mongo_client.close()
     _mongo_client = None
@@ -0,0 +1,398 @@
+"""Per-user change events pushed to open tabs over Server-Sent Events.
+
+Mutation routes call `get_event_hub().publish(user_id, event)` with a small
+dict (`{"type": "task.updated", "task": {...}}`). The hub hands it to a
+fan-out, which gets it to every worker, and each worker's `EventBus` writes
+it to that user's open `GET /events` streams.
+
+Fan-outs:
+
+- `LocalFanout`: delivers in this process only (single worker, tests).
+- `ChangeStreamFanout`: inserts the event into the `events` collection and
+  every worker tails it with a MongoDB change stream, so any worker can
+  reach a tab connected to any other. Needs a replica set or sharded
+  cluster; `EVENTS_FANOUT=auto` (default) picks it when available.
+
+Each subscription buffers at most `EVENTS_QUEUE_MAX` frames /
+`EVENTS_QUEUE_MAX_BYTES` bytes. A consumer that falls behind has its
+buffer dropped and gets a single `resync` event telling it to refetch,
+so a slow tab never holds unbounded memory.
+
+Event ids are `<process>-<seq>`. Each worker also keeps every user's
+events of the last `EVENTS_REPLAY_SECONDS` (at most `EVENTS_REPLAY_MAX`
+per user), and heartbeats carry the current id, so a tab reconnecting
+with `Last-Event-ID` (every stream ends after `EVENTS_MAX_STREAM_SECONDS`)
+gets what it missed replayed. Only an id this worker did not issue, or one
+older than what it still holds, costs a `resync`.
+"""
+
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+import itertools
+import logging
+import os
+import secrets
+import time
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import orjson
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.utils.serialization import json_default
+
+
+logger = logging.getLogger("peachytask.events")
+
+EVENT_TASK_CREATED = "task.created"
+EVENT_TASK_UPDATED = "task.updated"
+EVENT_TASK_DELETED = "task.deleted"
+EVENT_LABEL_CHANGED = "label.changed"
+EVENT_SHOWDOWN_COMPLETED = "showdown.completed"
+EVENT_RESYNC = "resync"
+
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def heartbeat_seconds() -> float:
+    return _env_float("EVENTS_HEARTBEAT_SECONDS", 15.0)
+
+
+def max_stream_seconds() -> float:
+    """Streams are closed after this long; EventSource reconnects by itself."""
+    return _env_float("EVENTS_MAX_STREAM_SECONDS", 300.0)
+
+
+# event ids are only meaningful to the process that issued them
+_process_id = secrets.token_hex(4)
+_seq = itertools.count(1)
+_last_seq = 0
+
+
+def _encode(event: Dict[str, Any]) -> Tuple[int, bytes]:
+    global _last_seq
+    seq = _last_seq = next(_seq)
+    data = orjson.dumps(event, default=json_default)
+    return seq, b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (_process_id.encode(), seq, event["type"].encode(), data)
+
+
+def encode_frame(event: Dict[str, Any]) -> bytes:
+    """One SSE frame: `id`, `event` (the event type) and JSON `data`."""
+    return _encode(event)[1]
+
+
+def heartbeat_frame() -> bytes:
+    """Comment plus the current id: dispatches nothing, but moves the client's
+    Last-Event-ID past every event already handed to its (empty) stream."""
+    return b": ping\nid: %s-%d\n\n" % (_process_id.encode(), _last_seq)
+
+
+def parse_event_id(value: Optional[str]) -> Optional[int]:
+    """Sequence number of an id issued by this process, else None."""
+    process, _, seq = (value or "").partition("-")
+    if process != _process_id or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+class TooManyStreams(Exception):
+    pass
+
+
+class Subscription:
+    """Bounded buffer of encoded frames for one open stream."""
+
+    def __init__(self, user_id: str, max_events: int, max_bytes: int):
+        self.user_id = user_id
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.closed = False
+        self.overflowed = False
+        self._frames: Deque[bytes] = deque()
+        self._bytes = 0
+        self._wake = asyncio.Event()
+
+    def push(self, frame: bytes) -> None:
+        if self.closed or self.overflowed:
+            return
+        if len(self._frames) >= self.max_events or self._bytes + len(frame) > self.max_bytes:
+            # consumer is behind: drop what it has not read and tell it to refetch
+            self._frames.clear()
+            self._bytes = 0
+            self.overflowed = True
+        else:
+            self._frames.append(frame)
+            self._bytes += len(frame)
+        self._wake.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake.set()
+
+    @property
+    def drained(self) -> bool:
+        """Everything pushed so far has been read."""
+        return not self._frames and not self.overflowed
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """Next frame, or None if nothing arrived within `timeout` (or closed)."""
+        if not self._frames and not self.overflowed and not self.closed:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.closed:
+            return None
+        if self.overflowed:
+            self.overflowed = False
+            return encode_frame({"type": EVENT_RESYNC})
+        frame = self._frames.popleft()
+        self._bytes -= len(frame)
+        return frame
+
+
+class _Replay:
+    """One user's recent frames, and the newest seq already dropped."""
+
+    def __init__(self, evicted: int):
+        self.frames: Deque[Tuple[int, float, bytes]] = deque()
+        self.evicted = evicted
+
+
+class EventBus:
+    """Open streams of this worker, by user, and a short replay window."""
+
+    def __init__(
+        self,
+        max_streams_per_user: int = 5,
+        max_events: int = 100,
+        max_bytes: int = 256 * 1024,
+        replay_seconds: float = 120.0,
+        replay_max: int = 100,
+    ):
+        self.max_streams_per_user = max_streams_per_user
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.replay_seconds = replay_seconds
+        self.replay_max = replay_max
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._replay: Dict[str, _Replay] = {}
+        # newest seq dropped along with a whole user entry; covers users with no entry
+        self._floor = 0
+        self._next_sweep = 0.0
+
+    def subscribe(self, user_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        """Open a stream; with `last_event_id`, first replay what came after it
+        (or start with `resync` when that can no longer be done)."""
+        subs = self._subs.setdefault(user_id, set())
+        if len(subs) >= self.max_streams_per_user:
+            raise TooManyStreams(user_id)
+        sub = Subscription(user_id, self.max_events, self.max_bytes)
+        subs.add(sub)
+        if last_event_id is not None:
+            frames = self.replay_since(user_id, parse_event_id(last_event_id))
+            if frames is None:
+                sub.overflowed = True
+            for frame in frames or ():
+                sub.push(frame)
+        return sub
+
+    def replay_since(self, user_id: str, seq: Optional[int]) -> Optional[List[bytes]]:
+        """The user's frames after `seq`, or None if some may have been dropped."""
+        if seq is None:
+            return None
+        entry = self._replay.get(user_id)
+        if entry is not None:
+            self._prune(entry, time.monotonic())
+        if seq < (entry.evicted if entry is not None else self._floor):
+            return None
+        return [frame for s, _, frame in entry.frames if s > seq] if entry is not None else []
+
+    def _prune(self, entry: _Replay, now: float) -> None:
+        frames = entry.frames
+        while frames and (len(frames) > self.replay_max or now - frames[0][1] > self.replay_seconds):
+            entry.evicted = frames.popleft()[0]
+
+    def _remember(self, user_id: str, seq: int, frame: bytes) -> None:
+        now = time.monotonic()
+        entry = self._replay.get(user_id)
+        if entry is None:
+            entry = self._replay[user_id] = _Replay(self._floor)
+        entry.frames.append((seq, now, frame))
+        self._prune(entry, now)
+        if now >= self._next_sweep:
+            # drop users whose window has emptied, so idle users cost nothing
+            self._next_sweep = now + min(10.0, self.replay_seconds)
+            for uid, other in list(self._replay.items()):
+                self._prune(other, now)
+                if not other.frames:
+                    self._floor = max(self._floor, other.evicted)
+                    del self._replay[uid]
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        sub.close()
+        subs = self._subs.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.user_id]
+
+    def deliver(self, user_id: str, event: Dict[str, Any]) -> None:
+        seq, frame = _encode(event)
+        # kept even with no stream open: the user's tab may be reconnecting
+        self._remember(user_id, seq, frame)
+        for sub in self._subs.get(user_id, ()):
+            sub.push(frame)
+
+    def close_all(self) -> None:
+        for subs in list(self._subs.values()):
+            for sub in list(subs):
+                self.unsubscribe(sub)
+
+    def stream_count(self) -> int:
+        return sum(len(s) for s in self._subs.values())
+
+
+class LocalFanout:
+    def __init__(self, bus: EventBus):
+        self.bus = bus
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        self.bus.deliver(user_id, event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class ChangeStreamFanout:
+    """Cross-worker fan-out through a change stream on the `events` collection."""
+
+    collection_name = "events"
+    # events are only needed for as long as it takes workers to tail them
+    ttl_seconds = 300
+
+    def __init__(self, bus: EventBus, db: AsyncIOMotorDatabase):
+        self.bus = bus
+        self.collection = db[self.collection_name]
+        self._watcher: Optional[asyncio.Task] = None
+        self._writes: Set[asyncio.Task] = set()
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        # off the response path; delivery is best-effort like any SSE push
+        task = asyncio.create_task(self._insert(user_id, event))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _insert(self, user_id: str, event: Dict[str, Any]) -> None:
+        try:
+            await self.collection.insert_one({
+                "user_id": user_id,
+                "event": event,
+                "created_at": datetime.now(timezone.utc),
+            })
+        except Exception:
+            logger.exception("failed to publish %s event", event.get("type"))
+
+    async def start(self) -> None:
+        await self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds, name="created_at_ttl")
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        resume_token = None
+        delay = 0.5
+        while True:
+            try:
+                async with self.collection.watch(
+                    [{"$match": {"operationType": "insert"}}], resume_after=resume_token
+                ) as stream:
+                    delay = 0.5
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        doc = change["fullDocument"]
+                        self.bus.deliver(doc["user_id"], doc["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("events change stream failed; reconnecting in %.1fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+
+async def change_streams_available(db: AsyncIOMotorDatabase) -> bool:
+    """Change streams need a replica set member or a mongos."""
+    try:
+        hello = await db.command("hello")
+    except Exception:
+        return False
+    return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
+
+class EventHub:
+    def __init__(self, bus: Optional[EventBus] = None):
+        self.bus = bus or EventBus(
+            max_streams_per_user=int(_env_float("EVENTS_MAX_STREAMS_PER_USER", 5)),
+            max_events=int(_env_float("EVENTS_QUEUE_MAX", 100)),
+            max_bytes=int(_env_float("EVENTS_QUEUE_MAX_BYTES", 256 * 1024)),
+            replay_seconds=_env_float("EVENTS_REPLAY_SECONDS", 120.0),
+            replay_max=int(_env_float("EVENTS_REPLAY_MAX", 100)),
+        )
+        self.fanout: Any = LocalFanout(self.bus)
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        mode = os.getenv("EVENTS_FANOUT", "auto").lower()
+        if mode == "changestream" or (mode == "auto" and await change_streams_available(db)):
+            self.fanout = ChangeStreamFanout(self.bus, db)
+        else:
+            self.fanout = LocalFanout(self.bus)
+        await self.fanout.start()
+
+    async def stop(self) -> None:
+        await self.fanout.stop()
+        self.bus.close_all()
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        """Send `event` to all of the user's open streams; never raises."""
+        try:
+            self.fanout.publish(user_id, event)
+        except Exception:
+            logger.exception("failed to publish %s event", event.get("type"))
+
+
+_hub: Optional[EventHub] = None
+
+
+def get_event_hub() -> EventHub:
+    global _hub
+    if _hub is None:
+        _hub = EventHub()
+    return _hub
+
+
+def set_event_hub(hub: Optional[EventHub]) -> None:
+    """Swap the process-wide hub (tests)."""
+    global _hub
+    _hub = hub
@@ -0,0 +1,118 @@
+"""Peaches leaderboard ranks from an in-memory snapshot.
+
+Ranking one user exactly means counting everyone with more peaches, a
+query whose cost grows with the user base. Instead each worker holds a
+sorted array of every user's total, refreshed every
+`LEADERBOARD_REFRESH_SECONDS`, and a rank is one binary search. A snapshot
+older than `LEADERBOARD_MAX_AGE_SECONDS` is never used: the request that
+finds it too old refreshes it first, so ranks lag reality by at most that
+much.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import numpy as np
+
+from app.models.user import UserModel
+
+
+logger = logging.getLogger("peachytask.leaderboard")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class Snapshot:
+    def __init__(self, scores: np.ndarray, taken_at: float):
+        self.scores = scores  # ascending
+        self.taken_at = taken_at
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def rank_of(self, peaches: int) -> int:
+        """1 + number of users with strictly more peaches (ties share a rank)."""
+        return len(self.scores) - int(np.searchsorted(self.scores, peaches, side="right")) + 1
+
+
+class Leaderboard:
+    def __init__(self, refresh_seconds: Optional[float] = None, max_age_seconds: Optional[float] = None):
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None else _env_float("LEADERBOARD_REFRESH_SECONDS", 30.0)
+        )
+        self.max_age_seconds = (
+            max_age_seconds if max_age_seconds is not None else _env_float("LEADERBOARD_MAX_AGE_SECONDS", 120.0)
+        )
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self, db: AsyncIOMotorDatabase) -> Snapshot:
+        taken_at = time.monotonic()
+        scores = np.asarray(await UserModel(db).all_peaches(), dtype=np.int64)
+        self._snapshot = Snapshot(scores, taken_at)
+        return self._snapshot
+
+    async def snapshot(self, db: AsyncIOMotorDatabase) -> Snapshot:
+        """A snapshot no older than `max_age_seconds`."""
+        snap = self._snapshot
+        if snap is not None and snap.age <= self.max_age_seconds:
+            return snap
+        async with self._lock:
+            # concurrent callers wait for the one refresh
+            snap = self._snapshot
+            if snap is not None and snap.age <= self.max_age_seconds:
+                return snap
+            return await self.refresh(db)
+
+    async def _loop(self, db: AsyncIOMotorDatabase) -> None:
+        while True:
+            try:
+                async with self._lock:
+                    await self.refresh(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("leaderboard refresh failed")
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(db))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_leaderboard: Optional[Leaderboard] = None
+
+
+def get_leaderboard() -> Leaderboard:
+    global _leaderboard
+    if _leaderboard is None:
+        _leaderboard = Leaderboard()
+    return _leaderboard
+
+
+def set_leaderboard(leaderboard: Optional[Leaderboard]) -> None:
+    global _leaderboard
+    _leaderboard = leaderboard
@@ -0,0 +1,250 @@
+"""On-demand sampling profiles of single requests.
+
+When `PROFILING_ENABLED=1`, `ProfilingMiddleware` profiles a request if it
+carries a valid `X-Profile` header (a token from `python -m
+app.utils.profiling sign`, signed with `ADMIN_TOKEN`) or is picked by
+`PROFILE_SAMPLE_RATE`. With profiling disabled the middleware is not
+installed at all.
+
+The profiler is a sampling thread that records the event-loop thread's
+stack every `PROFILE_INTERVAL_MS`. Everything else running on the loop at
+the same time shows up too, and time spent waiting for Mongo (Motor runs
+pymongo in worker threads) appears as the loop idling in its selector.
+Profiles are written to `PROFILE_DIR` as speedscope JSON or collapsed
+stacks (`PROFILE_FORMAT`), keeping the newest `PROFILE_MAX_FILES`.
+"""
+
+from collections import Counter
+import os
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+import orjson
+
+from app.utils.admin import admin_token, sign, verify_signed
+
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+_NAME_RE = re.compile(r"^[0-9]+-[A-Z]+-[A-Za-z0-9_.-]*\.(speedscope\.json|collapsed\.txt)$")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("PROFILING_ENABLED", "0").lower() in {"1", "true", "yes"}
+
+
+class Sampler:
+    """Samples one thread's stack at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: "Counter[Tuple[Frame, ...]]" = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="peachytask-profiler", daemon=True)
+        self.started = 0.0
+        self.duration = 0.0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[Frame] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+
+def _short(path: str) -> str:
+    # keep profiles readable: app paths relative to the package, libraries by package
+    marker = f"{os.sep}site-packages{os.sep}"
+    if marker in path:
+        return path.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    return path[len(cwd):] if path.startswith(cwd) else path
+
+
+def to_collapsed(sampler: Sampler) -> bytes:
+    """Brendan Gregg collapsed stacks (`a;b;c count`), for flamegraph.pl and friends."""
+    lines = []
+    for stack, count in sampler.stacks.most_common():
+        lines.append(";".join(f"{_short(f)}:{name}" for name, f, _ in stack) + f" {count}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def to_speedscope(sampler: Sampler, title: str) -> bytes:
+    """speedscope "sampled" profile (open at https://www.speedscope.app)."""
+    index: Dict[Frame, int] = {}
+    frames: List[Dict[str, Any]] = []
+    samples: List[List[int]] = []
+    weights: List[float] = []
+    for stack, count in sampler.stacks.items():
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": _short(frame[1]), "line": frame[2]})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(count * sampler.interval)
+    doc = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": title,
+        "exporter": "peachytask",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": title,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+    return orjson.dumps(doc)
+
+
+class ProfileStore:
+    """Bounded directory of profile files, oldest dropped first."""
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, method: str, path: str, fmt: str, content: bytes) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", path.strip("/")) or "root"
+        ext = "speedscope.json" if fmt == "speedscope" else "collapsed.txt"
+        name = f"{time.time_ns()}-{method.upper()}-{slug[:80]}.{ext}"
+        tmp = os.path.join(self.directory, f".{name}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(content)
+        os.replace(tmp, os.path.join(self.directory, name))
+        self._prune()
+        return name
+
+    def _prune(self) -> None:
+        names = sorted(self._names())
+        for name in names[: max(0, len(names) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def _names(self) -> List[str]:
+        try:
+            return [n for n in os.listdir(self.directory) if _NAME_RE.match(n)]
+        except FileNotFoundError:
+            return []
+
+    def list(self) -> List[Dict[str, Any]]:
+        out = []
+        for name in sorted(self._names(), reverse=True):
+            ts, method, rest = name.split("-", 2)
+            st = os.stat(os.path.join(self.directory, name))
+            out.append({
+                "name": name,
+                "method": method,
+                "path": "/" + rest.split(".", 1)[0].replace("_", "/"),
+                "created_at_ms": int(ts) // 1_000_000,
+                "size": st.st_size,
+            })
+        return out
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Absolute path of a stored profile; None for unknown or unsafe names."""
+        if not _NAME_RE.match(name):
+            return None
+        full = os.path.join(self.directory, name)
+        return full if os.path.isfile(full) else None
+
+
+def get_profile_store() -> ProfileStore:
+    return ProfileStore(
+        os.getenv("PROFILE_DIR", "profiles"),
+        max_files=int(_env_float("PROFILE_MAX_FILES", 50)),
+    )
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: Any,
+        store: Optional[ProfileStore] = None,
+        secret: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        interval_ms: Optional[float] = None,
+        fmt: Optional[str] = None,
+    ):
+        self.app = app
+        self.store = store or get_profile_store()
+        self.secret = secret if secret is not None else admin_token()
+        self.sample_rate = sample_rate if sample_rate is not None else _env_float("PROFILE_SAMPLE_RATE", 0.0)
+        self.interval = (interval_ms if interval_ms is not None else _env_float("PROFILE_INTERVAL_MS", 1.0)) / 1000.0
+        self.fmt = fmt or os.getenv("PROFILE_FORMAT", "speedscope")
+
+    def _wanted(self, scope: Dict[str, Any]) -> bool:
+        if self.secret:
+            for name, value in scope.get("headers", []):
+                if name == b"x-profile":
+                    return verify_signed(value.decode("latin-1"), self.secret)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/admin/") or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        sampler = Sampler(threading.get_ident(), self.interval)
+        method, path = scope["method"], scope["path"]
+        status_code = 0
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            title = f"{method} {path} -> {status_code} in {sampler.duration * 1000:.1f} ms"
+            content = to_speedscope(sampler, title) if self.fmt == "speedscope" else to_collapsed(sampler)
+            await anyio.to_thread.run_sync(self.store.save, method, path, self.fmt, content)
+
+
+if __name__ == "__main__":
+    # python -m app.utils.profiling sign [ttl_seconds]
+    if len(sys.argv) >= 2 and sys.argv[1] == "sign":
+        secret = admin_token()
+        if not secret:
+            sys.exit("ADMIN_TOKEN is not set")
+        ttl = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        print(sign(int(time.time()) + ttl, secret))
+    else:
+        sys.exit("usage: python -m app.utils.profiling sign [ttl_seconds]")
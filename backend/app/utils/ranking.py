@@ -0,0 +1,302 @@
+"""Bradley-Terry dread scores fitted from pairwise showdown comparisons.
+
+Every answer to "which task do you dread more" is stored in
+`showdown_comparisons`. `fit_bradley_terry` turns a user's comparisons into
+log-strengths with Newman's fixed-point iteration (JMLR 2023), each one a
+handful of NumPy passes over the comparison arrays (`np.bincount` does the
+per-task sums). It reaches the maximum-likelihood scores in tens of
+iterations where the classic MM update can need thousands.
+A weak prior (one virtual win and one loss against an average task) keeps
+the fit finite for tasks that have only won or only lost, and for
+disconnected groups of tasks.
+
+`RankingEngine` keeps each recently active user's comparison arrays and
+scores in memory. After a batch of new comparisons it re-reads the
+comparisons from `_CURSOR_OVERLAP_SECONDS` before the newest one it has seen
+and drops the `_id`s it already has: ObjectIds are only ordered by their
+(whole-second, client-clock) timestamp across workers, so a plain `_id >
+last` cursor could skip a comparison another worker inserted just before it.
+It then refits starting from the previous scores, which usually converges in
+a few iterations, and writes the changed `dislike_rank` values with one
+`bulk_write`.
+
+Ranks are derived from the comparisons, except for tasks whose rank was set
+by hand (PATCH /tasks/{id} with `dislike_rank` marks them
+`dislike_rank_manual`); those keep that rank until the task is compared
+again.
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import timedelta
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import anyio
+from bson import ObjectId
+import numpy as np
+from pymongo import UpdateOne
+
+from app.models.comparison import ComparisonModel
+
+
+# fits over at least this many comparisons run in a worker thread
+_THREAD_MIN_COMPARISONS = 5000
+
+# how far back each read reaches before the newest comparison seen; covers
+# clock skew between the workers that generate comparison ObjectIds
+_CURSOR_OVERLAP_SECONDS = 60
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def fit_bradley_terry(
+    winners: np.ndarray,
+    losers: np.ndarray,
+    n: int,
+    theta0: Optional[np.ndarray] = None,
+    prior: float = 1.0,
+    tol: float = 1e-4,
+    max_iter: int = 1000,
+) -> Tuple[np.ndarray, int]:
+    """Log-strengths for `n` items from comparisons `winners[k]` beat `losers[k]`.
+
+    Returns `(theta, iterations)`. 0 is an average item; P(i beats j) is
+    `1 / (1 + exp(theta[j] - theta[i]))`. Iterates until no score moves by
+    more than `tol`.
+    """
+    p = np.exp(theta0) if theta0 is not None else np.ones(n)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        inv = 1.0 / (p[winners] + p[losers])
+        # the prior: one win and one loss against a strength-1 (average) task
+        vs_average = prior / (p + 1.0)
+        wins = np.bincount(winners, p[losers] * inv, n) + vs_average
+        losses = np.bincount(losers, inv, n) + vs_average
+        new = wins / losses
+        delta = np.max(np.abs(np.log(new) - np.log(p))) if n else 0.0
+        p = new
+        if delta < tol:
+            break
+    return np.log(p), iterations
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def fisher_information(
+    theta: np.ndarray, winners: np.ndarray, losers: np.ndarray, prior: float = 1.0
+) -> np.ndarray:
+    """Per-task Fisher information of the fit; 1/info approximates each score's variance."""
+    n = len(theta)
+    p = _sigmoid(theta[winners] - theta[losers])
+    v = p * (1.0 - p)
+    s = _sigmoid(theta)
+    return np.bincount(winners, v, n) + np.bincount(losers, v, n) + 2.0 * prior * s * (1.0 - s)
+
+
+def select_pair(
+    theta: np.ndarray,
+    variance: np.ndarray,
+    exclude: Optional[Tuple[int, int]] = None,
+    anchors: int = 64,
+    rng: Optional[np.random.Generator] = None,
+) -> Optional[Tuple[int, int]]:
+    """The comparison expected to teach us the most about the ordering.
+
+    A pair's value is its outcome uncertainty p(1-p) times the variance of
+    the score difference: close calls between poorly known tasks first,
+    foregone conclusions last. Only the `anchors` most uncertain tasks are
+    paired against everything, so the search is O(anchors x n) rather than
+    O(n^2). A little noise breaks ties so equal pairs rotate.
+    """
+    n = len(theta)
+    if n < 2:
+        return None
+    rng = rng or np.random.default_rng()
+    k = min(anchors, n)
+    top = np.argpartition(-variance, k - 1)[:k]
+    p = _sigmoid(theta[top][:, None] - theta[None, :])
+    gain = p * (1.0 - p) * (variance[top][:, None] + variance[None, :])
+    gain *= 1.0 + 0.05 * rng.random(gain.shape)
+    gain[np.arange(k), top] = -np.inf
+    if exclude is not None and n > 2:
+        for a, b in (exclude, exclude[::-1]):
+            gain[top == a, b] = -np.inf
+    row, col = np.unravel_index(int(np.argmax(gain)), gain.shape)
+    return int(top[row]), int(col)
+
+
+def dislike_ranks(theta: np.ndarray) -> np.ndarray:
+    """Scores as 1..100 dislike_rank values: the chance (in %) of being
+    dreaded more than an average task. Absolute, so one new comparison only
+    changes the ranks of the tasks whose scores actually moved."""
+    return 1 + np.rint(99.0 / (1.0 + np.exp(-theta))).astype(np.int64)
+
+
+class UserRanking:
+    """One user's comparison arrays (as task indexes) and current scores."""
+
+    def __init__(self) -> None:
+        self.ids: List[ObjectId] = []
+        self.index: Dict[ObjectId, int] = {}
+        self.winners = np.zeros(0, dtype=np.int64)
+        self.losers = np.zeros(0, dtype=np.int64)
+        self.theta = np.zeros(0)
+        self.ranks = np.zeros(0, dtype=np.int64)
+        self.info = np.zeros(0)
+        # rank last written for each task (0: never written by this worker)
+        self.written = np.zeros(0, dtype=np.int64)
+        self.newest: Optional[ObjectId] = None
+        # comparisons inside the overlap window, which the next read returns again
+        self.recent: Set[ObjectId] = set()
+
+    def _idx(self, task_id: ObjectId) -> int:
+        i = self.index.get(task_id)
+        if i is None:
+            i = self.index[task_id] = len(self.ids)
+            self.ids.append(task_id)
+        return i
+
+    def cursor(self) -> Optional[ObjectId]:
+        """Where the next read starts: the overlap window before the newest comparison."""
+        if self.newest is None:
+            return None
+        return ObjectId.from_datetime(self.newest.generation_time - timedelta(seconds=_CURSOR_OVERLAP_SECONDS))
+
+    def extend(self, docs: List[Dict[str, Any]]) -> int:
+        """Append the comparisons not seen yet; returns how many were new."""
+        docs = [d for d in docs if d["_id"] not in self.recent]
+        if not docs:
+            return 0
+        w = np.fromiter((self._idx(d["winner_id"]) for d in docs), dtype=np.int64, count=len(docs))
+        l = np.fromiter((self._idx(d["loser_id"]) for d in docs), dtype=np.int64, count=len(docs))
+        self.winners = np.concatenate([self.winners, w])
+        self.losers = np.concatenate([self.losers, l])
+        grow = len(self.ids) - len(self.theta)
+        if grow:
+            # new tasks start as average
+            self.theta = np.concatenate([self.theta, np.zeros(grow)])
+            self.ranks = np.concatenate([self.ranks, np.zeros(grow, dtype=np.int64)])
+            self.written = np.concatenate([self.written, np.zeros(grow, dtype=np.int64)])
+        newest = max(d["_id"] for d in docs)
+        if self.newest is None or newest > self.newest:
+            self.newest = newest
+        cutoff = self.newest.generation_time - timedelta(seconds=_CURSOR_OVERLAP_SECONDS)
+        self.recent.update(d["_id"] for d in docs)
+        self.recent = {i for i in self.recent if i.generation_time >= cutoff}
+        return len(docs)
+
+    def refit(self) -> int:
+        self.theta, iterations = fit_bradley_terry(self.winners, self.losers, len(self.ids), theta0=self.theta)
+        self.ranks = dislike_ranks(self.theta)
+        self.info = fisher_information(self.theta, self.winners, self.losers)
+        return iterations
+
+    def candidates(self, task_ids: List[ObjectId]) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores and variances for `task_ids`; never-compared tasks are average and
+        maximally uncertain (only the prior informs them)."""
+        theta = np.zeros(len(task_ids))
+        info = np.full(len(task_ids), 0.5)  # prior alone at theta = 0
+        for j, tid in enumerate(task_ids):
+            i = self.index.get(tid)
+            if i is not None and i < len(self.info):
+                theta[j] = self.theta[i]
+                info[j] = self.info[i]
+        return theta, 1.0 / info
+
+    @property
+    def comparisons(self) -> int:
+        return int(len(self.winners))
+
+
+class RankingEngine:
+    def __init__(self, max_users: Optional[int] = None):
+        self.max_users = max_users if max_users is not None else _env_int("RANKING_MAX_USERS", 1000)
+        self._users: "OrderedDict[str, UserRanking]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def get(self, user_id: str) -> Optional[UserRanking]:
+        """In-memory state for a user, if this worker has it."""
+        return self._users.get(user_id)
+
+    def _state(self, user_id: str) -> UserRanking:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = UserRanking()
+            while len(self._users) > self.max_users:
+                old, _ = self._users.popitem(last=False)
+                lock = self._locks.get(old)
+                if lock is not None and not lock.locked():
+                    del self._locks[old]
+        else:
+            self._users.move_to_end(user_id)
+        return state
+
+    async def refresh(self, db, user_id: str, write: bool = True) -> Tuple[UserRanking, int, Dict[str, int]]:
+        """Catch up with the user's comparison log, refit, and persist changed ranks.
+
+        Returns `(state, iterations, updated)` where `updated` maps task id
+        to its new dislike_rank; nothing is refitted if there is nothing new.
+        Readers pass `write=False`; the next write catches up.
+        """
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            state = self._state(user_id)
+            new = await ComparisonModel(db).since(user_id, state.cursor())
+            if not state.extend(new):
+                return state, 0, {}
+            if state.comparisons >= _THREAD_MIN_COMPARISONS:
+                iterations = await anyio.to_thread.run_sync(state.refit)
+            else:
+                iterations = state.refit()
+            updated = await self._write_ranks(db, user_id, state) if write else {}
+            return state, iterations, updated
+
+    async def _write_ranks(self, db, user_id: str, state: UserRanking) -> Dict[str, int]:
+        changed = np.nonzero(state.ranks != state.written)[0]
+        if len(changed) == 0:
+            return {}
+        uid = ObjectId(user_id)
+        manual = {
+            doc["_id"]
+            async for doc in db["tasks"].find(
+                {"_id": {"$in": [state.ids[i] for i in changed]}, "user_id": uid, "dislike_rank_manual": True},
+                {"_id": 1},
+            )
+        }
+        # manual ranks are left unwritten, so they are written once comparing unpins them
+        changed = [i for i in changed if state.ids[i] not in manual]
+        if not changed:
+            return {}
+        ops = [
+            UpdateOne(
+                {"_id": state.ids[i], "user_id": uid, "dislike_rank_manual": {"$ne": True}},
+                {"$set": {"dislike_rank": int(state.ranks[i])}},
+            )
+            for i in changed
+        ]
+        await db["tasks"].bulk_write(ops, ordered=False)
+        state.written[changed] = state.ranks[changed]
+        return {str(state.ids[i]): int(state.ranks[i]) for i in changed}
+
+
+_engine: Optional[RankingEngine] = None
+
+
+def get_ranking_engine() -> RankingEngine:
+    global _engine
+    if _engine is None:
+        _engine = RankingEngine()
+    return _engine
+
+
+def set_ranking_engine(engine: Optional[RankingEngine]) -> None:
+    global _engine
+    _engine = engine
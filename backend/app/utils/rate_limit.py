@@ -0,0 +1,248 @@
+"""Per-client token-bucket admission control.
+
+Requests are sorted into route classes with their own budgets:
+
+- `password`: bcrypt-heavy auth calls (login/signup)
+- `scan`: endpoints that read every task of a user
+- `write`: other mutations
+- `read`: everything else (cheap point reads)
+
+Each class is a token bucket keyed by the JWT `sub` of the access-token
+cookie, otherwise by client IP. The token is not verified here (the route
+does that): verifying it per request would double the auth work, and a
+forged `sub` only changes which bucket is charged, never what is allowed. Budgets are configured as
+`RATE_LIMIT_<CLASS>=<burst>/<seconds>` (e.g. `5/60`: at most 5 in a burst,
+refilled at 5 per minute). Over-budget requests get 429 with `Retry-After`.
+
+Independently, classes listed in `LOAD_SHED_CLASSES` get 503 while the
+Mongo pool checkout wait (see `database.pool_wait_monitor`) is above
+`LOAD_SHED_POOL_WAIT_MS`, so cheap requests keep flowing while the pool is
+saturated.
+"""
+
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from app.utils.auth import get_unverified_subject
+
+
+CLASS_PASSWORD = "password"
+CLASS_SCAN = "scan"
+CLASS_WRITE = "write"
+CLASS_READ = "read"
+
+DEFAULT_BUDGETS: Dict[str, Tuple[float, float]] = {
+    # class: (burst capacity, refill window in seconds for a full bucket)
+    CLASS_PASSWORD: (10, 60),
+    CLASS_SCAN: (30, 10),
+    CLASS_WRITE: (60, 10),
+    CLASS_READ: (120, 10),
+}
+
+_PASSWORD_ROUTES = {("POST", "/auth/login"), ("POST", "/auth/signup")}
+_SCAN_ROUTES = {
+    ("GET", "/tasks"),
+    ("GET", "/tasks/summary"),
+    ("GET", "/tasks/due"),
+    ("GET", "/tasks/calendar"),
+    ("GET", "/tasks/search"),
+    ("GET", "/tasks/archive"),
+    ("GET", "/showdown/pair"),
+    ("GET", "/showdown/bootstrap"),
+    ("GET", "/showdown/stats"),
+    ("GET", "/showdown/history"),
+    ("GET", "/showdown/leaderboard"),
+    ("GET", "/showdown/rank/next"),
+}
+_EXEMPT_PATHS = {"/health", "/docs", "/openapi.json", "/redoc"}
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class for a request, or None when it is not limited."""
+    if method == "OPTIONS" or path in _EXEMPT_PATHS:
+        return None
+    key = (method, path.rstrip("/") or "/")
+    if key in _PASSWORD_ROUTES:
+        return CLASS_PASSWORD
+    if key in _SCAN_ROUTES:
+        return CLASS_SCAN
+    if method in {"GET", "HEAD"}:
+        return CLASS_READ
+    return CLASS_WRITE
+
+
+def parse_budget(raw: str) -> Tuple[float, float]:
+    """`"5/60"` -> (5.0, 60.0)."""
+    burst, _, window = raw.partition("/")
+    capacity, seconds = float(burst), float(window or 1)
+    if capacity <= 0 or seconds <= 0:
+        raise ValueError(raw)
+    return capacity, seconds
+
+
+def load_budgets() -> Dict[str, Tuple[float, float]]:
+    budgets = dict(DEFAULT_BUDGETS)
+    for name in budgets:
+        raw = os.getenv(f"RATE_LIMIT_{name.upper()}")
+        if raw:
+            try:
+                budgets[name] = parse_budget(raw)
+            except ValueError:
+                pass
+    return budgets
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process."""
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, key: str, capacity: float, refill_per_sec: float) -> Tuple[bool, float]:
+        """Consume one token; returns (allowed, seconds until a token is available)."""
+        now = self.clock()
+        tokens, last = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_per_sec)
+        if tokens >= 1:
+            if key not in self._buckets and len(self._buckets) >= self.max_keys:
+                self._buckets.pop(next(iter(self._buckets)))
+            self._buckets[key] = (tokens - 1, now)
+            return True, 0.0
+        self._buckets[key] = (tokens, now)
+        return False, (1 - tokens) / refill_per_sec
+
+
+# KEYS[1] bucket; ARGV: capacity, refill/sec, now (s). Returns {allowed, retry_after_ms}.
+_REDIS_TAKE = """
+local b = redis.call('HMGET', KEYS[1], 't', 'ts')
+local cap = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(b[1]) or cap
+local ts = tonumber(b[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(cap / rate * 1000) + 1000)
+return {allowed, retry}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by all workers, updated atomically by a Lua script."""
+
+    def __init__(self, client: Any, prefix: str = "peachy:rl"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, capacity: float, refill_per_sec: float) -> Tuple[bool, float]:
+        allowed, retry_ms = await self.client.eval(
+            _REDIS_TAKE, 1, f"{self.prefix}:{key}", capacity, refill_per_sec, time.time()
+        )
+        return bool(allowed), int(retry_ms) / 1000.0
+
+
+def build_store() -> Any:
+    if os.getenv("RATE_LIMIT_STORE", "memory").lower() == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_STORE=redis requires the 'redis' package") from exc
+        return RedisBucketStore(redis_asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    return MemoryBucketStore()
+
+
+def _client_key(scope: Dict[str, Any]) -> str:
+    batch_sub = (scope.get("state") or {}).get("auth_sub")
+    if batch_sub:
+        return f"user:{batch_sub}"
+    for name, value in scope.get("headers", []):
+        if name == b"cookie":
+            for part in value.decode("latin-1").split(";"):
+                k, _, v = part.strip().partition("=")
+                if k == "access_token" and v:
+                    sub = get_unverified_subject(v)
+                    if sub:
+                        return f"user:{sub}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing per-class budgets and pool-pressure shedding."""
+
+    def __init__(
+        self,
+        app: Any,
+        store: Any = None,
+        budgets: Optional[Dict[str, Tuple[float, float]]] = None,
+        enabled: Optional[bool] = None,
+        shed_classes: Optional[set] = None,
+        shed_wait_ms: Optional[float] = None,
+        pool_wait_ms: Optional[Callable[[], float]] = None,
+    ):
+        self.app = app
+        self.enabled = enabled if enabled is not None else os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+        self.store = store if store is not None else build_store()
+        self.budgets = budgets if budgets is not None else load_budgets()
+        if shed_classes is None:
+            shed_classes = {c.strip() for c in os.getenv("LOAD_SHED_CLASSES", CLASS_SCAN).split(",") if c.strip()}
+        self.shed_classes = shed_classes
+        if shed_wait_ms is None:
+            try:
+                shed_wait_ms = float(os.getenv("LOAD_SHED_POOL_WAIT_MS", "250"))
+            except ValueError:
+                shed_wait_ms = 250.0
+        self.shed_wait_ms = shed_wait_ms
+        if pool_wait_ms is None:
+            from app.utils.database import pool_wait_monitor
+
+            pool_wait_ms = pool_wait_monitor.wait_ms
+        self.pool_wait_ms = pool_wait_ms
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        if route_class in self.shed_classes and self.shed_wait_ms > 0 and self.pool_wait_ms() > self.shed_wait_ms:
+            await _reject(send, 503, "Server busy, retry shortly", 1)
+            return
+        capacity, window = self.budgets.get(route_class, DEFAULT_BUDGETS[CLASS_READ])
+        allowed, retry_after = await self.store.take(
+            f"{route_class}:{_client_key(scope)}", capacity, capacity / window
+        )
+        if not allowed:
+            await _reject(send, 429, "Too many requests", retry_after)
+            return
+        await self.app(scope, receive, send)
+
+
+async def _reject(send: Any, status_code: int, detail: str, retry_after: float) -> None:
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
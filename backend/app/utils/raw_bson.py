@@ -0,0 +1,123 @@
+"""Lean BSON -> JSON conversion for read-only endpoints.
+
+Documents read through a `RawBSONDocument` collection are kept as the BSON
+bytes the server sent. `raw_to_json` walks those bytes once and writes JSON
+directly, so no intermediate Python dicts are built. Output matches what
+`MongoJSONResponse` produces for the equivalent decoded documents:
+ObjectId -> 24-char hex string, datetime -> naive ISO-8601 (Motor's default
+`tz_aware=False`).
+"""
+
+from datetime import datetime, timedelta
+import os
+import re
+from struct import Struct
+from typing import Iterable, List
+
+import orjson
+from bson import decode as bson_decode
+from bson.codec_options import CodecOptions, DatetimeConversion
+from bson.raw_bson import RawBSONDocument
+
+from app.utils.serialization import dumps
+
+
+_INT32 = Struct("<i")
+_INT64 = Struct("<q")
+_DOUBLE = Struct("<d")
+_EPOCH = datetime(1970, 1, 1)
+# bytes that must be escaped inside a JSON string; anything else is copied as-is
+_NEEDS_ESCAPE = re.compile(rb'["\\\x00-\x1f]')
+
+# out-of-range datetimes decode to DatetimeMS instead of raising
+_FALLBACK_OPTIONS = CodecOptions(datetime_conversion=DatetimeConversion.DATETIME_AUTO)
+
+
+def raw_reads_enabled() -> bool:
+    """Whether list endpoints should use the RawBSONDocument read path."""
+    return os.getenv("RAW_BSON_READS", "0").lower() in {"1", "true", "yes"}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _json_string(raw: bytes) -> bytes:
+    if _NEEDS_ESCAPE.search(raw) is None:
+        return b'"' + raw + b'"'
+    return orjson.dumps(raw.decode("utf-8"))
+
+
+def _datetime(ms: int) -> bytes:
+    try:
+        dt = _EPOCH + timedelta(milliseconds=ms)
+    except (OverflowError, ValueError):
+        # outside datetime's range: let the decoder fallback handle it
+        raise _Unsupported()
+    return b'"' + dt.isoformat().encode() + b'"'
+
+
+def _write_elements(data: bytes, pos: int, end: int, out: List[bytes], as_array: bool) -> None:
+    """Append JSON for the BSON elements in data[pos:end] (excluding trailing NUL)."""
+    first = True
+    while pos < end:
+        etype = data[pos]
+        key_end = data.index(b"\x00", pos + 1)
+        key = data[pos + 1:key_end]
+        pos = key_end + 1
+        if not first:
+            out.append(b",")
+        first = False
+        if not as_array:
+            out.append(_json_string(key))
+            out.append(b":")
+        if etype == 0x02:  # string
+            size = _INT32.unpack_from(data, pos)[0]
+            out.append(_json_string(data[pos + 4:pos + 3 + size]))
+            pos += 4 + size
+        elif etype == 0x07:  # ObjectId
+            out.append(b'"' + data[pos:pos + 12].hex().encode() + b'"')
+            pos += 12
+        elif etype == 0x09:  # UTC datetime
+            out.append(_datetime(_INT64.unpack_from(data, pos)[0]))
+            pos += 8
+        elif etype == 0x08:  # bool
+            out.append(b"true" if data[pos] else b"false")
+            pos += 1
+        elif etype == 0x0A:  # null
+            out.append(b"null")
+        elif etype == 0x10:  # int32
+            out.append(str(_INT32.unpack_from(data, pos)[0]).encode())
+            pos += 4
+        elif etype == 0x12:  # int64
+            out.append(str(_INT64.unpack_from(data, pos)[0]).encode())
+            pos += 8
+        elif etype == 0x01:  # double
+            out.append(orjson.dumps(_DOUBLE.unpack_from(data, pos)[0]))
+            pos += 8
+        elif etype == 0x03 or etype == 0x04:  # embedded document / array
+            size = _INT32.unpack_from(data, pos)[0]
+            out.append(b"[" if etype == 0x04 else b"{")
+            _write_elements(data, pos + 4, pos + size - 1, out, etype == 0x04)
+            out.append(b"]" if etype == 0x04 else b"}")
+            pos += size
+        else:
+            # Types we never store (binary, regex, decimal...). Fall back to the
+            # regular decoder for just this element.
+            raise _Unsupported()
+
+
+def raw_document_to_json(doc: RawBSONDocument) -> bytes:
+    data = doc.raw
+    out: List[bytes] = [b"{"]
+    try:
+        _write_elements(data, 4, len(data) - 1, out, as_array=False)
+    except _Unsupported:
+        return dumps(bson_decode(data, _FALLBACK_OPTIONS))
+    out.append(b"}")
+    return b"".join(out)
+
+
+def raw_to_json(docs: Iterable[RawBSONDocument]) -> bytes:
+    """Encode a sequence of raw documents as a JSON array."""
+    return b"[" + b",".join(raw_document_to_json(doc) for doc in docs) + b"]"
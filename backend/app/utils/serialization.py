@@ -0,0 +1,50 @@
+from datetime import date, datetime
+from typing import Any, Dict
+
+import orjson
+from bson import Decimal128, ObjectId
+from bson.datetime_ms import DatetimeMS
+from fastapi.responses import ORJSONResponse
+
+
+def json_default(obj: Any) -> Any:
+    """orjson fallback for the BSON types Mongo hands back to us."""
+    if isinstance(obj, (ObjectId, Decimal128)):
+        return str(obj)
+    # orjson encodes datetime natively; this only catches subclasses it rejects
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    # a BSON datetime outside datetime's range: milliseconds since the epoch
+    if isinstance(obj, DatetimeMS):
+        return int(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=json_default)
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """ORJSONResponse that encodes ObjectId without a jsonable_encoder pass.
+
+    Returning this directly from a route skips FastAPI's response encoding, so
+    raw Mongo documents (ObjectId `_id`, `user_id`, `label_ids`) can be handed
+    straight to orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def serialize_task(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Stringify ObjectId fields of a task document in place and return it."""
+    oid = doc.get("_id")
+    if isinstance(oid, ObjectId):
+        doc["_id"] = str(oid)
+    uid = doc.get("user_id")
+    if isinstance(uid, ObjectId):
+        doc["user_id"] = str(uid)
+    label_ids = doc.get("label_ids")
+    if isinstance(label_ids, list):
+        doc["label_ids"] = [str(x) for x in label_ids]
+    return doc
@@ -0,0 +1,4 @@
+"""Micro-benchmarks for PeachyTask backend hot paths.
+
+Run from the `backend` directory, e.g. `python -m benchmarks.bench_serialization`.
+"""
@@ -0,0 +1,48 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+
+PRIORITIES = ["high", "medium", "low"]
+
+
+def make_tasks(n: int, seed: int = 42, labels_per_user: int = 8) -> List[Dict[str, Any]]:
+    """Build `n` task documents shaped like what Motor returns for one user."""
+    rng = random.Random(seed)
+    user_id = ObjectId()
+    label_ids = [ObjectId() for _ in range(labels_per_user)]
+    base = datetime(2025, 1, 1)
+    docs: List[Dict[str, Any]] = []
+    for i in range(n):
+        created = base + timedelta(minutes=i)
+        completed = rng.random() < 0.3
+        docs.append({
+            "_id": ObjectId(),
+            "title": f"Task {i} {rng.choice(['email', 'report', 'laundry', 'taxes', 'call mom'])}",
+            "description": rng.choice([None, "", "Short note", "Some longer description " * 4]),
+            "priority": rng.choice(PRIORITIES),
+            "deadline": base + timedelta(days=rng.randint(-30, 60)),
+            "completed": completed,
+            "label_ids": rng.sample(label_ids, rng.randint(0, 3)),
+            "dislike_rank": rng.randint(0, 100),
+            "showdown_timer_seconds": rng.randint(0, 3600) if completed else None,
+            "completed_via_showdown": completed and rng.random() < 0.5,
+            "user_id": user_id,
+            "created_at": created,
+            "updated_at": created + timedelta(seconds=rng.randint(0, 86400), microseconds=rng.randint(0, 999) * 1000),
+        })
+    return docs
+
+
+def timeit(fn, repeat: int = 5) -> float:
+    """Best-of-`repeat` wall time in milliseconds."""
+    import time
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
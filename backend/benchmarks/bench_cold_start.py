@@ -0,0 +1,82 @@
+"""Cold start: `python -m app.serve` spawn -> first 200 from the API.
+
+Starts a fresh server process per run and polls until `/health` answers,
+then times the first `/openapi.json` (prebuilt during startup). Requires the
+same environment as the app itself (MONGO_URI etc.), because startup
+connects to Mongo and prewarms the pool before accepting traffic.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import List
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str) -> int:
+    with urllib.request.urlopen(url, timeout=2) as resp:
+        resp.read()
+        return resp.status
+
+
+def wait_until_ready(proc: subprocess.Popen, port: int, start: float, timeout: float = 60.0) -> None:
+    while True:
+        if proc.poll() is not None:
+            err = proc.stderr.read().decode(errors="replace") if proc.stderr else ""
+            raise RuntimeError(f"server exited early:\n{err[-2000:]}")
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("server did not become ready in time")
+        try:
+            if _get(f"http://127.0.0.1:{port}/health") == 200:
+                return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.005)
+
+
+def measure_once(command: List[str], port: int, timeout: float = 60.0):
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        wait_until_ready(proc, port, start, timeout)
+        first_200 = time.perf_counter() - start
+        t0 = time.perf_counter()
+        _get(f"http://127.0.0.1:{port}/openapi.json")
+        openapi = time.perf_counter() - t0
+        return first_200, openapi
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def server_command(port: int, workers: int = 1) -> List[str]:
+    return [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    os.environ.setdefault("APP_ENV", "test")
+
+    results = []
+    for _ in range(args.runs):
+        port = free_port()
+        results.append(measure_once(server_command(port), port))
+    firsts = sorted(r[0] for r in results)
+    openapis = sorted(r[1] for r in results)
+    print(f"runs={args.runs}")
+    print(f"  spawn -> first 200 /health: median {firsts[len(firsts) // 2] * 1000:8.1f} ms  min {firsts[0] * 1000:8.1f} ms")
+    print(f"  first /openapi.json:        median {openapis[len(openapis) // 2] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Bytes on the wire vs CPU for compressing `/tasks` payloads.
+
+Encodes seeded task lists the way `GET /tasks` does (`MongoJSONResponse`),
+then compresses them with gzip and brotli (if installed) at several levels.
+Reports size, ratio and best-of-N compress time, which is what the
+`COMPRESSION_*` settings trade off.
+"""
+import argparse
+import gzip
+
+from app.utils.serialization import MongoJSONResponse
+from benchmarks._data import make_tasks, timeit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def codecs():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, nargs="+", default=[50, 500, 5000], help="tasks per payload")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("(brotli not installed: gzip only)")
+    for n in args.n:
+        body = MongoJSONResponse(make_tasks(n)).body
+        encode_ms = timeit(lambda: MongoJSONResponse(make_tasks(n)).body, repeat=3)
+        print(f"tasks={n}  json={len(body) / 1024:8.1f} KiB  (build+encode {encode_ms:.2f} ms)")
+        for name, compress in codecs():
+            out = compress(body)
+            ms = timeit(lambda: compress(body))
+            print(f"  {name:8s} {len(out) / 1024:8.1f} KiB  ratio {len(body) / len(out):5.1f}x  {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
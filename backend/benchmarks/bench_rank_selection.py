@@ -0,0 +1,91 @@
+"""Comparisons needed to reach a stable ordering: random vs informative pairs.
+
+Simulates users with `--tasks` tasks whose true dread scores are known and
+answers comparisons with Bradley-Terry noise. Each strategy asks one
+question at a time and refits after each answer, as the rank screen does.
+After every answer the fitted order is scored against the true order
+(Spearman rho). Curves are averaged over `--trials` users; reported are
+the mean rho after n, 2n and 4n comparisons, and the number of
+comparisons after which the mean rho first reaches `--target`.
+
+- random: the old client-side `pickPair` (a never-compared task against a
+  compared one while any remain, then uniformly random pairs)
+- info: `select_pair` (GET /showdown/rank/next)
+"""
+import argparse
+from typing import Optional
+
+import numpy as np
+
+from app.utils.ranking import fisher_information, fit_bradley_terry, select_pair
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.corrcoef(np.argsort(np.argsort(a)), np.argsort(np.argsort(b)))[0, 1])
+
+
+def random_pair(n, seen, rng, **_):
+    unseen = np.flatnonzero(~seen)
+    if len(unseen):
+        a = int(rng.choice(unseen))
+        pool = np.flatnonzero(seen) if seen.any() else np.delete(np.arange(n), a)
+        return a, int(rng.choice(pool[pool != a]))
+    a, b = rng.choice(n, 2, replace=False)
+    return int(a), int(b)
+
+
+def info_pair(n, seen, rng, theta, variance, last):
+    return select_pair(theta, variance, exclude=last, rng=rng)
+
+
+def curve(strategy, n: int, budget: int, seed: int) -> np.ndarray:
+    """rho after each of `budget` comparisons for one simulated user."""
+    rng = np.random.default_rng(seed)
+    true = rng.normal(0, 1.5, n)
+    winners, losers = [], []
+    theta = np.zeros(n)
+    variance = np.full(n, 2.0)
+    seen = np.zeros(n, dtype=bool)
+    last = None
+    out = np.zeros(budget)
+    for k in range(budget):
+        a, b = strategy(n, seen, rng, theta=theta, variance=variance, last=last)
+        a_wins = rng.random() < 1 / (1 + np.exp(true[b] - true[a]))
+        winners.append(a if a_wins else b)
+        losers.append(b if a_wins else a)
+        seen[[a, b]] = True
+        last = (a, b)
+        w, l = np.array(winners), np.array(losers)
+        theta, _ = fit_bradley_terry(w, l, n, theta0=theta)
+        variance = 1.0 / fisher_information(theta, w, l)
+        out[k] = spearman(theta, true)
+    return out
+
+
+def first_at_least(mean: np.ndarray, target: float) -> Optional[int]:
+    hits = np.flatnonzero(mean >= target)
+    return int(hits[0]) + 1 if len(hits) else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--target", type=float, default=0.85)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--budget", type=float, default=6.0, help="comparisons per task to simulate")
+    args = parser.parse_args()
+
+    for n in args.tasks:
+        budget = int(args.budget * n)
+        print(f"tasks={n}")
+        for name, strategy in (("random", random_pair), ("info", info_pair)):
+            mean = np.mean([curve(strategy, n, budget, seed) for seed in range(args.trials)], axis=0)
+            reached = first_at_least(mean, args.target)
+            print(
+                f"  {name:6s} rho@n {mean[n - 1]:.3f}  @2n {mean[2 * n - 1]:.3f}  @4n {mean[4 * n - 1]:.3f}"
+                f"  rho>={args.target} after {reached if reached else f'>{budget}'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
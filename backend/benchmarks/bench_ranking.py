@@ -0,0 +1,47 @@
+"""Bradley-Terry fit cost for large comparison logs.
+
+Simulates a user with `--tasks` tasks and `--comparisons` answers drawn from
+known dread scores, then times a cold fit (first request on a worker) and
+a warm refit after a batch of new comparisons (every later request), which
+is what `POST /showdown/compare` pays.
+"""
+import argparse
+
+import numpy as np
+
+from app.utils.ranking import fit_bradley_terry
+from benchmarks._data import timeit
+
+
+def simulate(n: int, m: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    true = rng.normal(0, 1.5, n)
+    a = rng.integers(0, n, m)
+    b = (a + rng.integers(1, n, m)) % n
+    a_wins = rng.random(m) < 1 / (1 + np.exp(true[b] - true[a]))
+    return true, np.where(a_wins, a, b), np.where(a_wins, b, a)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--comparisons", type=int, default=30000)
+    parser.add_argument("--batch", type=int, default=8, help="new comparisons per refit")
+    args = parser.parse_args()
+
+    m = args.comparisons
+    for n in args.tasks:
+        true, w, l = simulate(n, m)
+        base, cold_iters = fit_bradley_terry(w[: m - args.batch], l[: m - args.batch], n)
+        cold_ms = timeit(lambda: fit_bradley_terry(w, l, n), repeat=3)
+        theta, warm_iters = fit_bradley_terry(w, l, n, theta0=base)
+        warm_ms = timeit(lambda: fit_bradley_terry(w, l, n, theta0=base))
+        rho = np.corrcoef(np.argsort(np.argsort(theta)), np.argsort(np.argsort(true)))[0, 1]
+        print(
+            f"tasks={n:5d} comparisons={m}  cold {cold_ms:8.2f} ms ({cold_iters} it)"
+            f"  warm +{args.batch} {warm_ms:7.2f} ms ({warm_iters} it)  rank corr {rho:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Raw BSON pass-through vs the decoded-dict path for large task lists.
+
+Both paths start from the BSON bytes the server returns for one batch:
+- dict: decode every document (what Motor does by default), then orjson.
+- raw: wrap bytes in RawBSONDocument and walk them with raw_to_json.
+"""
+import argparse
+import json
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from app.utils import raw_bson
+from app.utils.serialization import dumps
+from benchmarks._data import make_tasks, timeit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=5000, help="number of tasks")
+    args = parser.parse_args()
+
+    raws = [bson.encode(d) for d in make_tasks(args.n)]
+
+    def dict_path() -> bytes:
+        return dumps([bson.decode(r) for r in raws])
+
+    def raw_path() -> bytes:
+        return raw_bson.raw_to_json([RawBSONDocument(r) for r in raws])
+
+    assert json.loads(dict_path()) == json.loads(raw_path())
+
+    dict_ms = timeit(dict_path)
+    raw_ms = timeit(raw_path)
+
+    print(f"tasks={args.n}")
+    print(f"  dict path (decode + orjson): {dict_ms:8.2f} ms")
+    print(f"  raw path (raw_to_json):      {raw_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Throughput scaling of `python -m app.serve` from 1 to N worker processes.
+
+For each worker count the server is started fresh and driven by a fixed
+number of concurrent keep-alive clients for a fixed duration. The default
+target is `/health` (pure framework + server overhead); pass `--path` and
+`--cookie` to load an authenticated endpoint such as `/tasks`. Needs the
+app's normal environment (MONGO_URI etc.) because each worker connects at
+startup.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import time
+from typing import List, Optional
+
+import httpx
+
+from benchmarks.bench_cold_start import free_port, server_command, wait_until_ready
+
+
+async def _drive(base_url: str, path: str, concurrency: int, duration: float, cookie: Optional[str]) -> int:
+    cookies = {"access_token": cookie} if cookie else None
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    done = 0
+    stop_at = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, cookies=cookies, limits=limits, timeout=10) as client:
+        async def worker() -> None:
+            nonlocal done
+            while time.perf_counter() < stop_at:
+                resp = await client.get(path)
+                if resp.status_code == 200:
+                    done += 1
+
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return done
+
+
+def run_level(workers: int, path: str, concurrency: int, duration: float, cookie: Optional[str]) -> float:
+    port = free_port()
+    proc = subprocess.Popen(server_command(port, workers), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        wait_until_ready(proc, port, time.perf_counter())
+        # give every worker a chance to finish its own lifespan startup
+        time.sleep(0.5)
+        done = asyncio.run(_drive(f"http://127.0.0.1:{port}", path, concurrency, duration, cookie))
+        return done / duration
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--cookie", default=None, help="access_token cookie for authenticated paths")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    os.environ.setdefault("APP_ENV", "test")
+
+    levels: List[int] = sorted({1, *[w for w in (2, 4, 8, 16, 32) if w < args.max_workers], args.max_workers})
+    base: Optional[float] = None
+    print(f"path={args.path} concurrency={args.concurrency} duration={args.duration}s")
+    for workers in levels:
+        rps = run_level(workers, args.path, args.concurrency, args.duration, args.cookie)
+        base = base or rps
+        print(f"  workers={workers:3d}  {rps:10.0f} req/s  x{rps / base:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
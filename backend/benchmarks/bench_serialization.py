@@ -0,0 +1,55 @@
+"""Encode time for a list of task documents: legacy path vs shared orjson path.
+
+Legacy: per-doc dict copy in `_serialize_task`, then `jsonable_encoder`, then
+stdlib `json.dumps` (what Starlette's JSONResponse does).
+Current: `MongoJSONResponse.render` straight from the Motor documents.
+"""
+import argparse
+import json
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.serialization import MongoJSONResponse
+from benchmarks._data import make_tasks, timeit
+
+
+def _legacy_serialize_task(doc):
+    out = {**doc}
+    if isinstance(out.get("_id"), ObjectId):
+        out["_id"] = str(out["_id"])
+    if isinstance(out.get("user_id"), ObjectId):
+        out["user_id"] = str(out["user_id"])
+    if isinstance(out.get("label_ids"), list):
+        out["label_ids"] = [str(x) for x in out["label_ids"]]
+    return out
+
+
+def legacy_encode(docs) -> bytes:
+    content = jsonable_encoder([_legacy_serialize_task(d) for d in docs])
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_encode(docs) -> bytes:
+    return MongoJSONResponse(docs).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=5000, help="number of tasks")
+    args = parser.parse_args()
+
+    docs = make_tasks(args.n)
+    assert json.loads(legacy_encode(docs)) == json.loads(orjson_encode(docs))
+
+    legacy_ms = timeit(lambda: legacy_encode(docs))
+    fast_ms = timeit(lambda: orjson_encode(docs))
+
+    print(f"tasks={args.n}")
+    print(f"  legacy (copy + jsonable_encoder + json): {legacy_ms:8.2f} ms")
+    print(f"  MongoJSONResponse (orjson, no copies):   {fast_ms:8.2f} ms")
+    print(f"  speedup: {legacy_ms / fast_ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 
+# Integration tests log in far more often than the per-client auth budget
+# allows; the limiter has its own tests (test_rate_limit.py).
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
 from app.main import app
 
 
@@ -0,0 +1,14 @@
+from app.main import app, _warm_validators
+
+
+def test_routes_registered_at_import_time():
+    # no TestClient / lifespan: the route table must already be complete
+    paths = {route.path for route in app.routes}
+    assert {"/auth/login", "/tasks", "/tasks/{task_id}", "/labels", "/showdown/pair"} <= paths
+
+
+def test_openapi_and_validators_build_without_database():
+    _warm_validators()
+    schema = app.openapi()
+    assert "/tasks/summary" in schema["paths"]
+    assert app.openapi() is schema
@@ -0,0 +1,24 @@
+from app.utils.background import run_with_retries
+
+
+async def test_retries_until_success():
+    calls = []
+
+    async def flaky(x):
+        calls.append(x)
+        if len(calls) < 3:
+            raise RuntimeError("transient")
+
+    await run_with_retries(flaky, "u1", attempts=3, base_delay=0)
+    assert calls == ["u1", "u1", "u1"]
+
+
+async def test_gives_up_without_raising():
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise RuntimeError("down")
+
+    await run_with_retries(broken, attempts=2, base_delay=0)
+    assert len(calls) == 2
@@ -0,0 +1,143 @@
+import asyncio
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+import pytest
+
+from app.routes import batch as batch_routes
+from app.utils.auth import create_access_token
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    app = FastAPI()
+    app.include_router(batch_routes.router)
+    app.state.items = []
+    app.state.gate = None
+
+    def user(request: Request) -> str:
+        sub = request.scope.get("state", {}).get("auth_sub")
+        if not sub:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        return sub
+
+    @app.get("/items")
+    async def list_items(request: Request):
+        return {"user": user(request), "items": list(app.state.items)}
+
+    @app.post("/items")
+    async def add_item(payload: dict):
+        app.state.items.append(payload["name"])
+        return {"count": len(app.state.items)}
+
+    @app.get("/slow/{name}")
+    async def slow(name: str):
+        # both reads must be in flight at once to get past the barrier
+        await asyncio.wait_for(app.state.gate.wait(), 1)
+        return name
+
+    @app.get("/big")
+    async def big():
+        return "x" * 1000
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def _client(app) -> TestClient:
+    client = TestClient(app)
+    client.cookies.set("access_token", create_access_token("user-1"))
+    return client
+
+
+def test_results_in_order_with_statuses_and_shared_auth(app):
+    resp = _client(app).post("/batch", json={"requests": [
+        {"method": "get", "path": "/items"},
+        {"method": "GET", "path": "/missing"},
+    ]})
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {"status": 200, "body": {"user": "user-1", "items": []}},
+        {"status": 404, "body": {"detail": "nope"}},
+    ]
+
+
+def test_writes_keep_order_and_later_reads_see_them(app):
+    body = _client(app).post("/batch", json={"requests": [
+        {"method": "POST", "path": "/items", "body": {"name": "a"}},
+        {"method": "POST", "path": "/items", "body": {"name": "b"}},
+        {"method": "GET", "path": "/items"},
+    ]}).json()
+    assert [r["body"] for r in body[:2]] == [{"count": 1}, {"count": 2}]
+    assert body[2]["body"]["items"] == ["a", "b"]
+
+
+def test_a_failing_sub_request_does_not_fail_the_batch(app):
+    body = _client(app).post("/batch", json={"requests": [
+        {"method": "POST", "path": "/items", "body": {"name": "a"}},
+        {"method": "GET", "path": "/boom"},
+        {"method": "GET", "path": "/items"},
+    ]}).json()
+    assert [r["status"] for r in body] == [200, 500, 200]
+    assert body[1]["body"] == {"detail": "Internal Server Error"}
+    assert body[2]["body"]["items"] == ["a"]
+
+
+def test_consecutive_reads_run_concurrently(app):
+    class Barrier:
+        def __init__(self):
+            self.waiting = 0
+            self.event = None
+
+        async def wait(self):
+            self.event = self.event or asyncio.Event()
+            self.waiting += 1
+            if self.waiting == 2:
+                self.event.set()
+            await self.event.wait()
+
+    app.state.gate = Barrier()
+    body = _client(app).post("/batch", json={"requests": [
+        {"method": "GET", "path": "/slow/a"},
+        {"method": "GET", "path": "/slow/b"},
+    ]}).json()
+    assert [r["status"] for r in body] == [200, 200]
+
+
+def test_requires_auth(app):
+    resp = TestClient(app).post("/batch", json={"requests": [{"method": "GET", "path": "/items"}]})
+    assert resp.status_code == 401
+
+
+def test_size_limits(app, monkeypatch):
+    client = _client(app)
+    monkeypatch.setenv("BATCH_MAX_REQUESTS", "2")
+    resp = client.post("/batch", json={"requests": [{"method": "GET", "path": "/items"}] * 3})
+    assert resp.status_code == 413
+
+    monkeypatch.setenv("BATCH_MAX_REQUESTS", "20")
+    monkeypatch.setenv("BATCH_MAX_RESPONSE_BYTES", "1500")
+    body = client.post("/batch", json={"requests": [
+        {"method": "GET", "path": "/big"},
+        {"method": "GET", "path": "/big"},
+        {"method": "POST", "path": "/items", "body": {"name": "never"}},
+    ]}).json()
+    assert body[0]["status"] == 200
+    # ran alongside the first read, but its body did not fit
+    assert body[1] == {"status": 200, "body": None, "truncated": True}
+    assert body[2]["status"] == 413
+    assert app.state.items == []
+
+
+@pytest.mark.parametrize("path", ["/batch", "/events", "/auth/login"])
+def test_unbatchable_paths(app, path):
+    resp = _client(app).post("/batch", json={"requests": [{"method": "GET", "path": path}]})
+    assert resp.status_code == 400
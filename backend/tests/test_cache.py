@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.cache import Cache, MemoryBackend, NS_LABELS, NS_TASKS, RedisBackend
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio the backend uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        exp = self.expires.get(key)
+        if exp is not None and exp <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    async def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    async def set(self, key, value, px=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        if px is not None:
+            self.expires[key] = time.monotonic() + px / 1000
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+        self.expires.pop(key, None)
+
+    async def incr(self, key):
+        value = int(self.data[key]) + 1 if self._alive(key) else 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def pexpire(self, key, ms):
+        self.expires[key] = time.monotonic() + ms / 1000
+
+    async def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix) and self._alive(key):
+                yield key
+
+    async def unlink(self, *keys):
+        for key in keys:
+            await self.delete(key)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        return Cache(MemoryBackend())
+    return Cache(RedisBackend(FakeRedis()))
+
+
+async def test_redis_clear_only_drops_own_prefix():
+    fake = FakeRedis()
+    backend = RedisBackend(fake)
+    await backend.set("peachy:u:1:tasks:ver", 3, ttl=60)
+    await fake.set("other-app:key", b"1")
+    await backend.clear()
+    assert await backend.get("peachy:u:1:tasks:ver") is None
+    assert await fake.get("other-app:key") == b"1"
+
+
+async def test_memory_backend_ttl_and_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    backend = MemoryBackend(max_entries=2)
+    await backend.set("a", 1, ttl=5)
+    await backend.set("b", 2, ttl=5)
+    assert await backend.get("a") == 1  # touch: "b" is now least recently used
+    await backend.set("c", 3, ttl=5)
+    assert await backend.get("b") is None
+    now[0] += 5
+    assert await backend.get("a") is None
+
+
+async def test_invalidate_bumps_only_that_users_namespace(cache):
+    await cache.set("u1", NS_TASKS, "summary", {"total": 1}, ttl=60)
+    await cache.set("u1", NS_LABELS, "list", ["l"], ttl=60)
+    await cache.set("u2", NS_TASKS, "summary", {"total": 2}, ttl=60)
+
+    await cache.invalidate("u1", NS_TASKS)
+
+    assert await cache.get("u1", NS_TASKS, "summary") is None
+    assert await cache.get("u1", NS_LABELS, "list") == ["l"]
+    assert await cache.get("u2", NS_TASKS, "summary") == {"total": 2}
+
+
+async def test_get_or_compute_is_single_flight(cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"total": 5}
+
+    results = await asyncio.gather(*[
+        cache.get_or_compute("u1", NS_TASKS, "summary", compute, ttl=60) for _ in range(10)
+    ])
+    assert results == [{"total": 5}] * 10
+    assert calls == 1
+    assert await cache.get_or_compute("u1", NS_TASKS, "summary", compute, ttl=60) == {"total": 5}
+    assert calls == 1
+
+
+async def test_shared_backend_spans_workers():
+    shared = FakeRedis()
+    worker_a = Cache(RedisBackend(shared))
+    worker_b = Cache(RedisBackend(shared))
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [calls]
+
+    # both workers miss at once; only one computes, the other waits for its result
+    a, b = await asyncio.gather(
+        worker_a.get_or_compute("u1", NS_LABELS, "list", compute, ttl=60),
+        worker_b.get_or_compute("u1", NS_LABELS, "list", compute, ttl=60),
+    )
+    assert a == b == [1]
+    assert calls == 1
+
+    # invalidation from one worker is seen by the other
+    await worker_a.invalidate("u1", NS_LABELS)
+    assert await worker_b.get("u1", NS_LABELS, "list") is None
+
+
+async def test_failed_compute_is_not_cached(cache):
+    async def boom():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("u1", NS_TASKS, "summary", boom, ttl=60)
+
+    async def ok():
+        return {"total": 0}
+
+    assert await cache.get_or_compute("u1", NS_TASKS, "summary", ok, ttl=60) == {"total": 0}
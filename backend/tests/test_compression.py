@@ -0,0 +1,126 @@
+import asyncio
+import gzip
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+import pytest
+
+from app.utils import compression
+from app.utils.compression import CompressionMiddleware, choose_encoding, parse_accept_encoding
+
+
+BIG = [{"title": f"Task {i}", "priority": "medium", "completed": False} for i in range(200)]
+
+
+def _app(**kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **{"min_size": 500, **kwargs})
+
+    @app.get("/big")
+    def big():
+        return BIG
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return BIG
+
+    @app.get("/png")
+    def png():
+        return PlainTextResponse("x" * 5000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        def gen():
+            for i in range(3):
+                yield f"data: {i}\n\n".encode()
+        return StreamingResponse(gen(), media_type="text/event-stream")
+
+    return app
+
+
+def test_parse_and_choose():
+    assert parse_accept_encoding("gzip, br;q=0.8, *;q=0") == {"gzip": 1.0, "br": 0.8, "*": 0.0}
+    assert choose_encoding("gzip, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, br", brotli_available=False) == "gzip"
+    assert choose_encoding("gzip;q=1, br;q=0.5", brotli_available=True) == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+
+
+def test_large_json_is_gzipped(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    client = TestClient(_app())
+    # httpx would transparently decode; ask for the raw bytes
+    resp = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert resp.json() == BIG
+    assert int(resp.headers["content-length"]) < len(resp.content)
+
+
+def test_small_excluded_and_binary_responses_pass_through():
+    client = TestClient(_app())
+    for path in ("/small", "/health", "/png"):
+        resp = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in resp.headers, path
+
+
+def test_no_accept_encoding_passes_through():
+    client = TestClient(_app())
+    resp = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in resp.headers
+    assert resp.json() == BIG
+
+
+def test_streaming_is_compressed_and_flushed_per_chunk(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    app = _app()
+    sent = []
+
+    async def run():
+        scope = {
+            "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "query_string": b"",
+            "headers": [(b"accept-encoding", b"gzip")], "http_version": "1.1", "scheme": "http",
+            "server": ("test", 80), "client": ("test", 1), "root_path": "",
+        }
+
+        requested = []
+
+        async def receive():
+            if not requested:
+                requested.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # client stays connected until the response is done
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    start = sent[0]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    bodies = [m for m in sent[1:] if m["type"] == "http.response.body"]
+    # every streamed chunk decodes on its own, without waiting for the end
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(bodies[0]["body"]) == b"data: 0\n\n"
+    rest = b"".join(decoder.decompress(m["body"]) for m in bodies[1:])
+    assert rest == b"data: 1\n\ndata: 2\n\n"
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == b"data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_brotli_preferred_when_available():
+    client = TestClient(_app())
+    resp = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["content-encoding"] == "br"
@@ -0,0 +1,140 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.routes.events import event_stream
+from app.utils.events import (
+    EVENT_TASK_UPDATED,
+    EventBus,
+    EventHub,
+    TooManyStreams,
+    encode_frame,
+    set_event_hub,
+)
+
+
+def _id(frame: bytes) -> str:
+    return next(line[4:] for line in frame.decode().split("\n") if line.startswith("id: "))
+
+
+def _parse(frame: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return {"event": fields["event"], "data": orjson.loads(fields["data"])}
+
+
+@pytest.fixture
+def hub():
+    hub = EventHub(EventBus(max_streams_per_user=2, max_events=3, max_bytes=10_000))
+    set_event_hub(hub)
+    yield hub
+    set_event_hub(None)
+
+
+def test_frame_format():
+    frame = encode_frame({"type": EVENT_TASK_UPDATED, "task": {"_id": "t1"}})
+    assert frame.startswith(b"id: ")
+    assert frame.endswith(b"\n\n")
+    assert _parse(frame) == {"event": "task.updated", "data": {"type": "task.updated", "task": {"_id": "t1"}}}
+
+
+async def test_publish_reaches_only_that_users_streams(hub):
+    mine = hub.bus.subscribe("u1")
+    theirs = hub.bus.subscribe("u2")
+    hub.publish("u1", {"type": EVENT_TASK_UPDATED, "task": {"_id": "t1"}})
+
+    frame = await mine.next(timeout=1)
+    assert _parse(frame)["data"]["task"] == {"_id": "t1"}
+    assert await theirs.next(timeout=0.01) is None
+
+
+async def test_slow_consumer_gets_one_resync_instead_of_unbounded_backlog(hub):
+    sub = hub.bus.subscribe("u1")
+    for i in range(10):
+        hub.publish("u1", {"type": EVENT_TASK_UPDATED, "task": {"_id": str(i)}})
+
+    assert _parse(await sub.next(timeout=1))["event"] == "resync"
+    assert await sub.next(timeout=0.01) is None
+    # back to normal delivery afterwards
+    hub.publish("u1", {"type": EVENT_TASK_UPDATED, "task": {"_id": "next"}})
+    assert _parse(await sub.next(timeout=1))["data"]["task"] == {"_id": "next"}
+
+
+async def test_byte_cap_also_triggers_resync():
+    bus = EventBus(max_events=100, max_bytes=200)
+    sub = bus.subscribe("u1")
+    bus.deliver("u1", {"type": EVENT_TASK_UPDATED, "task": {"description": "x" * 500}})
+    assert _parse(await sub.next(timeout=1))["event"] == "resync"
+
+
+async def test_stream_cap_per_user(hub):
+    a = hub.bus.subscribe("u1")
+    hub.bus.subscribe("u1")
+    with pytest.raises(TooManyStreams):
+        hub.bus.subscribe("u1")
+    hub.bus.unsubscribe(a)
+    hub.bus.subscribe("u1")
+
+
+async def test_event_stream_heartbeats_delivers_and_cleans_up(hub):
+    sub = hub.bus.subscribe("u1")
+    body = event_stream(sub, heartbeat=0.02, max_seconds=0.5)
+
+    assert (await body.__anext__()).startswith(b"retry:")
+    assert (await body.__anext__()).startswith(b": ping\nid: ")
+
+    hub.publish("u1", {"type": EVENT_TASK_UPDATED, "task": {"_id": "t1"}})
+    assert _parse(await body.__anext__())["event"] == "task.updated"
+
+    await body.aclose()
+    assert hub.bus.stream_count() == 0
+
+
+async def test_event_stream_ends_after_max_seconds(hub):
+    sub = hub.bus.subscribe("u1")
+    frames = [f async for f in event_stream(sub, heartbeat=1, max_seconds=0.05)]
+    assert frames[0].startswith(b"retry:")
+    # the last frame carries the id the reconnect resumes from
+    assert frames[-1].startswith(b": ping\nid: ")
+    assert hub.bus.stream_count() == 0
+
+
+async def test_reconnect_replays_missed_events_without_resync(hub):
+    sub = hub.bus.subscribe("u1")
+    hub.publish("u1", {"type": EVENT_TASK_UPDATED, "task": {"_id": "seen"}})
+    last_id = _id(await sub.next(timeout=1))
+    hub.bus.unsubscribe(sub)
+    hub.publish("u1", {"type": EVENT_TASK_UPDATED, "task": {"_id": "missed"}})
+    hub.publish("u2", {"type": EVENT_TASK_UPDATED, "task": {"_id": "other"}})
+
+    again = hub.bus.subscribe("u1", last_id)
+    assert _parse(await again.next(timeout=1))["data"]["task"] == {"_id": "missed"}
+    assert await again.next(timeout=0.01) is None
+
+
+async def test_reconnect_after_idle_stream_end_needs_no_resync(hub):
+    sub = hub.bus.subscribe("u1")
+    frames = [f async for f in event_stream(sub, heartbeat=1, max_seconds=0.05)]
+    again = hub.bus.subscribe("u1", _id(frames[-1]))
+    assert await again.next(timeout=0.01) is None
+
+
+async def test_reconnect_resyncs_when_id_is_unknown_or_evicted():
+    bus = EventBus(replay_max=2)
+    assert _parse(await bus.subscribe("u1", "elsewhere-5").next(timeout=1))["event"] == "resync"
+
+    sub = bus.subscribe("u2")
+    bus.deliver("u2", {"type": EVENT_TASK_UPDATED, "task": {"_id": "0"}})
+    first_id = _id(await sub.next(timeout=1))
+    for i in range(1, 4):
+        bus.deliver("u2", {"type": EVENT_TASK_UPDATED, "task": {"_id": str(i)}})
+    assert _parse(await bus.subscribe("u2", first_id).next(timeout=1))["event"] == "resync"
+
+
+async def test_stop_closes_open_streams(hub):
+    sub = hub.bus.subscribe("u1")
+    waiter = asyncio.ensure_future(sub.next(timeout=5))
+    await asyncio.sleep(0)
+    await hub.stop()
+    assert await waiter is None
+    assert sub.closed
@@ -0,0 +1,75 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from pymongo import MongoClient
+
+from app.utils.leaderboard import Leaderboard, Snapshot
+
+
+def test_rank_of_bisects_and_shares_ties():
+    snap = Snapshot(np.array([1, 3, 3, 7, 10], dtype=np.int64), time.monotonic())
+    assert snap.rank_of(10) == 1
+    assert snap.rank_of(11) == 1
+    assert snap.rank_of(7) == 2
+    assert snap.rank_of(3) == 3
+    assert snap.rank_of(2) == 5
+    assert snap.rank_of(1) == 5
+    assert len(snap) == 5
+
+
+async def test_snapshot_refreshes_only_when_older_than_bound(monkeypatch):
+    board = Leaderboard(refresh_seconds=30, max_age_seconds=60)
+    calls = []
+
+    async def fake_refresh(db):
+        calls.append(db)
+        board._snapshot = Snapshot(np.array([5], dtype=np.int64), time.monotonic())
+        return board._snapshot
+
+    monkeypatch.setattr(board, "refresh", fake_refresh)
+    await board.snapshot("db")
+    await board.snapshot("db")
+    assert len(calls) == 1
+
+    board._snapshot.taken_at -= 61
+    snap = await board.snapshot("db")
+    assert len(calls) == 2 and snap.age < 60
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping leaderboard tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def test_leaderboard_top_and_own_rank(client):
+    from app.utils.auth import hash_password
+    from app.utils.leaderboard import get_leaderboard
+
+    db, mc = _db()
+    try:
+        db["users"].delete_many({"email": {"$regex": "^lb_"}})
+        db["users"].insert_many([
+            {"email": f"lb_{i}@example.com", "password_hash": hash_password("Password123!"), "peaches_peached_total": n}
+            for i, n in enumerate([5_000_000, 4_000_000, 4_000_000, 1_000_000])
+        ])
+    finally:
+        mc.close()
+    assert client.post("/auth/login", json={"email": "lb_3@example.com", "password": "Password123!"}).status_code == 200
+    get_leaderboard()._snapshot = None
+
+    resp = client.get("/showdown/leaderboard?limit=3")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [(e["rank"], e["peaches"]) for e in body["top"][:3]] == [(1, 5_000_000), (2, 4_000_000), (2, 4_000_000)]
+    # anonymous labels: nothing from the email, and stable across calls
+    assert all(e["name"].startswith("Peach ") and "lb" not in e["name"] for e in body["top"])
+    assert [e["name"] for e in client.get("/showdown/leaderboard?limit=3").json()["top"]] == [
+        e["name"] for e in body["top"]
+    ]
+    assert body["you"] == {"rank": 4, "peaches": 1_000_000}
@@ -0,0 +1,100 @@
+import asyncio
+import os
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+import pytest
+
+from app.migrations import MIGRATIONS, MigrationRunner
+from app.migrations.v0001_task_phase2_fields import TaskPhase2Fields
+from app.migrations.v0002_task_title_normalized import TaskTitleNormalized
+from app.migrations.v0003_task_bodies import TaskBodies
+from app.models.task import TASK_SCHEMA_VERSION
+
+
+def test_registry_is_ordered_and_matches_model_version():
+    versions = [m.version for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[-1] == TASK_SCHEMA_VERSION
+
+
+def test_phase2_fields_are_filled_with_schema_types():
+    m = TaskPhase2Fields()
+    assert m.update({}) == {"dislike_rank": 0, "showdown_timer_seconds": None, "completed_via_showdown": False}
+    assert m.update({"dislike_rank": "4", "showdown_timer_seconds": "90", "completed_via_showdown": 1}) == {
+        "dislike_rank": 4, "showdown_timer_seconds": 90, "completed_via_showdown": True,
+    }
+    assert m.update({"dislike_rank": "lots", "showdown_timer_seconds": -5})["dislike_rank"] == 0
+
+
+def test_title_normalized_backfill():
+    m = TaskTitleNormalized()
+    assert m.update({"title": "  Laundry "}) == {"title_normalized": "laundry"}
+    assert m.update({}) == {}
+
+
+def test_updates_are_conditional_on_the_values_read():
+    m = TaskTitleNormalized()
+    oid = ObjectId()
+    assert m.unchanged_filter({"_id": oid, "title": "Laundry"}) == {
+        "_id": oid, **m.pending_filter(), "title": "Laundry",
+    }
+    # a field missing when read must still be missing (or null) when written
+    assert m.unchanged_filter({"_id": oid})["title"] is None
+
+
+def test_task_bodies_leaves_a_preview(monkeypatch):
+    monkeypatch.setenv("TASK_DESCRIPTION_INLINE_MAX", "10")
+    monkeypatch.setenv("TASK_DESCRIPTION_PREVIEW_CHARS", "4")
+    m = TaskBodies()
+    assert m.update({"description": "short"}) == {
+        "description": "short", "description_length": 5, "description_truncated": False,
+    }
+    assert m.update({"description": "a much longer note"}) == {
+        "description": "a mu", "description_length": 18, "description_truncated": True,
+    }
+    assert m.update({})["description_length"] == 0
+    # already split by the app: left alone
+    assert m.update({"description": "a mu", "description_truncated": True}) == {}
+
+
+def _motor_db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping migration tests")
+    client = AsyncIOMotorClient(uri)
+    return client[dbname], client
+
+
+def test_runner_resumes_from_checkpoint():
+    async def run():
+        db, client = _motor_db()
+        try:
+            for name in ("tasks", "tasks_archive", "task_bodies", "migrations", "job_leases"):
+                await db[name].delete_many({})
+            uid = ObjectId()
+            await db["tasks"].insert_many(
+                [{"user_id": uid, "title": f"Old {i}", "dislike_rank": str(i)} for i in range(7)]
+            )
+            await db["tasks_archive"].insert_one({"user_id": uid, "title": "Archived"})
+
+            runner = MigrationRunner(db, batch_size=3, max_docs_per_second=0)
+            # interrupted after two batches of migration 1
+            assert await runner.run(max_batches=2) == []
+            status = {s["version"]: s for s in await runner.status()}
+            assert status[1]["state"] == "running" and status[1]["processed"] == 6
+            assert await db["tasks"].count_documents({"schema_version": 1}) == 6
+
+            assert await runner.run() == [1, 2, 3]
+            assert await runner.pending() == []
+            for coll in ("tasks", "tasks_archive"):
+                async for doc in db[coll].find({}):
+                    assert doc["schema_version"] == 3
+                    assert isinstance(doc["dislike_rank"], int)
+                    assert doc["title_normalized"] == doc["title"].lower()
+            assert (await runner.status())[0]["processed"] == 8
+        finally:
+            client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,88 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import orjson
+import pytest
+
+from app.routes import admin as admin_routes
+from app.utils.admin import sign, verify_signed
+from app.utils.profiling import ProfileStore, ProfilingMiddleware
+
+
+def _busy(ms: float) -> int:
+    end = time.perf_counter() + ms / 1000
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    return ProfileStore(str(tmp_path), max_files=3)
+
+
+def _app(store, **kwargs) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"n": _busy(30)}
+
+    app.include_router(admin_routes.router)
+    app.add_middleware(ProfilingMiddleware, store=store, secret="admin-secret", **kwargs)
+    return app
+
+
+def test_signed_tokens_expire_and_need_the_secret():
+    token = sign(int(time.time()) + 60, "s")
+    assert verify_signed(token, "s")
+    assert not verify_signed(token, "other")
+    assert not verify_signed(sign(int(time.time()) - 1, "s"), "s")
+    assert not verify_signed("garbage", "s")
+
+
+def test_only_signed_requests_are_profiled(store):
+    client = TestClient(_app(store, sample_rate=0))
+    client.get("/work")
+    client.get("/work", headers={"X-Profile": sign(int(time.time()) - 1, "admin-secret")})
+    assert store.list() == []
+
+    client.get("/work", headers={"X-Profile": sign(int(time.time()) + 60, "admin-secret")})
+    (entry,) = store.list()
+    assert entry["method"] == "GET" and entry["path"] == "/work"
+    doc = orjson.loads(open(store.path_for(entry["name"]), "rb").read())
+    names = {f["name"] for f in doc["shared"]["frames"]}
+    assert "_busy" in names
+    assert doc["profiles"][0]["type"] == "sampled"
+
+
+def test_sampling_rate_and_ring_bound(store):
+    client = TestClient(_app(store, sample_rate=1.0, fmt="collapsed"))
+    for _ in range(5):
+        client.get("/work")
+    entries = store.list()
+    assert len(entries) == 3
+    body = open(store.path_for(entries[0]["name"])).read()
+    assert ":_busy " in body or ":_busy;" in body
+
+
+def test_admin_endpoints(store):
+    client = TestClient(_app(store, sample_rate=1.0))
+    client.get("/work")
+    assert client.get("/admin/profiles").status_code == 403
+    headers = {"X-Admin-Token": "admin-secret"}
+    (entry,) = client.get("/admin/profiles", headers=headers).json()
+    resp = client.get(f"/admin/profiles/{entry['name']}", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["exporter"] == "peachytask"
+    assert client.get("/admin/profiles/..%2F..%2Fetc%2Fpasswd", headers=headers).status_code == 404
+
+
+def test_admin_endpoints_hidden_without_token(store, monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN")
+    client = TestClient(_app(store, sample_rate=0))
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": ""}).status_code == 404
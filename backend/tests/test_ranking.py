@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from bson import ObjectId
+import numpy as np
+
+from app.utils.ranking import UserRanking, dislike_ranks, fit_bradley_terry, select_pair
+
+
+def _simulate(n: int, m: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    true = rng.normal(0, 1.5, n)
+    a = rng.integers(0, n, m)
+    b = (a + rng.integers(1, n, m)) % n
+    a_wins = rng.random(m) < 1 / (1 + np.exp(true[b] - true[a]))
+    return true, np.where(a_wins, a, b), np.where(a_wins, b, a)
+
+
+def test_fit_recovers_the_true_order():
+    true, winners, losers = _simulate(50, 5000)
+    theta, iterations = fit_bradley_terry(winners, losers, 50)
+    assert iterations < 1000
+    assert np.corrcoef(np.argsort(np.argsort(theta)), np.argsort(np.argsort(true)))[0, 1] > 0.9
+
+
+def test_warm_start_converges_faster():
+    _, winners, losers = _simulate(200, 4000)
+    theta, cold = fit_bradley_terry(winners[:-20], losers[:-20], 200)
+    _, warm = fit_bradley_terry(winners, losers, 200, theta0=theta)
+    assert warm < cold
+
+
+def test_prior_keeps_unbeaten_and_isolated_tasks_finite():
+    # 0 always beats 1; 2 and 3 only ever meet each other
+    theta, _ = fit_bradley_terry(np.array([0, 0, 2]), np.array([1, 1, 3]), 5)
+    assert np.all(np.isfinite(theta))
+    assert theta[0] > theta[1] and theta[2] > theta[3]
+    assert theta[4] == 0.0
+
+
+def test_dislike_ranks_are_bounded_and_monotone():
+    ranks = dislike_ranks(np.array([-50.0, -1.0, 0.0, 1.0, 50.0]))
+    assert ranks.tolist() == sorted(ranks.tolist())
+    assert ranks[0] == 1 and ranks[-1] == 100 and ranks[2] == 51
+
+
+def test_user_ranking_extends_incrementally():
+    a, b, c = ObjectId(), ObjectId(), ObjectId()
+    state = UserRanking()
+    state.extend([{"_id": ObjectId(), "winner_id": a, "loser_id": b}])
+    state.refit()
+    first = state.theta.copy()
+    last = ObjectId()
+    state.extend([{"_id": last, "winner_id": c, "loser_id": a}])
+    assert state.ids == [a, b, c]
+    assert state.winners.tolist() == [0, 2] and state.losers.tolist() == [1, 0]
+    assert state.theta[:2].tolist() == first.tolist() and state.theta[2] == 0.0
+    assert state.newest == last
+    state.refit()
+    assert state.ranks[2] > state.ranks[0] > state.ranks[1]
+
+
+def test_user_ranking_rereads_the_overlap_and_skips_seen_comparisons():
+    a, b = ObjectId(), ObjectId()
+    seen = {"_id": ObjectId(), "winner_id": a, "loser_id": b}
+    state = UserRanking()
+    assert state.cursor() is None
+    assert state.extend([seen]) == 1
+    # the next read starts before the newest comparison, so it returns it again
+    assert state.cursor() < seen["_id"]
+    # a comparison from another worker whose clock runs behind sorts before it
+    behind = ObjectId.from_datetime(seen["_id"].generation_time - timedelta(seconds=5))
+    skewed = {"_id": behind, "winner_id": b, "loser_id": a}
+    assert skewed["_id"] > state.cursor()
+    assert state.extend([skewed, seen]) == 1
+    assert state.comparisons == 2 and state.newest == seen["_id"]
+
+
+def test_select_pair_prefers_uncertain_close_calls():
+    theta = np.array([3.0, -3.0, 0.1, 0.0])
+    # 0 and 1 are well known and far apart; 2 and 3 are close and uncertain
+    variance = np.array([0.1, 0.1, 2.0, 2.0])
+    assert set(select_pair(theta, variance, rng=np.random.default_rng(0))) == {2, 3}
+    # ...unless that pair was just asked
+    again = select_pair(theta, variance, exclude=(3, 2), rng=np.random.default_rng(0))
+    assert set(again) != {2, 3}
+    assert select_pair(np.zeros(1), np.ones(1)) is None
+
+
+def test_never_compared_tasks_are_most_uncertain():
+    a, b, c = ObjectId(), ObjectId(), ObjectId()
+    state = UserRanking()
+    state.extend([{"_id": ObjectId(), "winner_id": a, "loser_id": b} for _ in range(5)])
+    state.refit()
+    theta, variance = state.candidates([a, b, c])
+    assert theta[2] == 0.0
+    assert variance[2] > variance[0] and variance[2] > variance[1]
@@ -0,0 +1,110 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.auth import create_access_token
+from app.utils.rate_limit import (
+    CLASS_PASSWORD,
+    CLASS_READ,
+    CLASS_SCAN,
+    CLASS_WRITE,
+    MemoryBucketStore,
+    RateLimitMiddleware,
+    classify,
+    parse_budget,
+)
+from app.utils.database import PoolWaitMonitor
+
+
+def _app(pool_wait=lambda: 0.0, **budgets):
+    app = FastAPI()
+
+    @app.get("/tasks")
+    def tasks():
+        return []
+
+    @app.post("/auth/login")
+    def login():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=MemoryBucketStore(),
+        budgets={CLASS_PASSWORD: (2, 60), CLASS_SCAN: (3, 60), CLASS_READ: (100, 1), CLASS_WRITE: (100, 1), **budgets},
+        enabled=True,
+        shed_classes={CLASS_SCAN},
+        shed_wait_ms=100,
+        pool_wait_ms=pool_wait,
+    )
+    return app
+
+
+def test_classify_routes():
+    assert classify("POST", "/auth/login") == CLASS_PASSWORD
+    assert classify("GET", "/tasks") == CLASS_SCAN
+    assert classify("GET", "/tasks/due") == CLASS_SCAN
+    assert classify("GET", "/showdown/rank/next") == CLASS_SCAN
+    assert classify("GET", "/tasks/abc") == CLASS_READ
+    assert classify("PATCH", "/tasks/abc") == CLASS_WRITE
+    assert classify("GET", "/health") is None
+    assert parse_budget("5/60") == (5.0, 60.0)
+
+
+async def test_bucket_refills_over_time():
+    now = [0.0]
+    store = MemoryBucketStore(clock=lambda: now[0])
+    assert (await store.take("k", 2, 1.0))[0]
+    assert (await store.take("k", 2, 1.0))[0]
+    allowed, retry = await store.take("k", 2, 1.0)
+    assert not allowed and retry == 1.0
+    now[0] = 1.0
+    assert (await store.take("k", 2, 1.0))[0]
+
+
+def test_password_budget_returns_429_with_retry_after():
+    client = TestClient(_app())
+    assert client.post("/auth/login").status_code == 200
+    assert client.post("/auth/login").status_code == 200
+    resp = client.post("/auth/login")
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+    # other classes and exempt paths are unaffected
+    assert client.get("/tasks").status_code == 200
+    assert client.get("/health").status_code == 200
+
+
+def test_buckets_are_keyed_by_jwt_subject(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    client = TestClient(_app())
+    for _ in range(3):
+        assert client.get("/tasks", cookies={"access_token": create_access_token("user-a")}).status_code == 200
+    assert client.get("/tasks", cookies={"access_token": create_access_token("user-a")}).status_code == 429
+    # same IP, different user: own bucket
+    assert client.get("/tasks", cookies={"access_token": create_access_token("user-b")}).status_code == 200
+    # keyed before verification: an expired token of user-a still draws on user-a's bucket
+    expired = create_access_token("user-a", expires_in_minutes=-1)
+    assert client.get("/tasks", cookies={"access_token": expired}).status_code == 429
+
+
+def test_sheds_scan_class_when_pool_wait_is_high():
+    wait = [500.0]
+    client = TestClient(_app(pool_wait=lambda: wait[0]))
+    assert client.get("/tasks").status_code == 503
+    assert client.post("/auth/login").status_code == 200
+    wait[0] = 0.0
+    assert client.get("/tasks").status_code == 200
+
+
+def test_pool_wait_monitor_decays(monkeypatch):
+    now = [10.0]
+    monkeypatch.setattr("app.utils.database.time.monotonic", lambda: now[0])
+    monitor = PoolWaitMonitor(half_life=1.0, alpha=1.0)
+    monitor.connection_check_out_started(None)
+    now[0] += 0.4
+    monitor.connection_checked_out(None)
+    assert round(monitor.wait_ms()) == 400
+    now[0] += 1.0
+    assert round(monitor.wait_ms()) == 200
@@ -0,0 +1,50 @@
+import json
+from datetime import datetime
+
+import bson
+from bson import Decimal128, ObjectId
+from bson.datetime_ms import DatetimeMS
+from bson.raw_bson import RawBSONDocument
+
+from app.utils.raw_bson import raw_document_to_json, raw_to_json
+from app.utils.serialization import dumps
+
+
+def _raw(doc):
+    return RawBSONDocument(bson.encode(doc))
+
+
+def test_raw_conversion_matches_dict_path():
+    doc = {
+        "_id": ObjectId(),
+        "title": 'Quote " and \\ and tab\t and peach \U0001f351',
+        "description": None,
+        "priority": "high",
+        "deadline": datetime(2025, 1, 2, 3, 4, 5, 678000),
+        "completed": False,
+        "label_ids": [ObjectId(), ObjectId()],
+        "dislike_rank": 7,
+        "big": 2**40,
+        "ratio": 0.25,
+        "nested": {"a": [1, {"b": True}]},
+    }
+    raw = _raw(doc)
+    expected = json.loads(dumps(bson.decode(raw.raw)))
+    assert json.loads(raw_document_to_json(raw)) == expected
+
+
+def test_unsupported_types_fall_back_to_decoder():
+    raw = _raw({"_id": ObjectId(), "amount": Decimal128("1.5")})
+    with_fallback = json.loads(raw_document_to_json(raw))
+    assert with_fallback["amount"] == "1.5"
+
+
+def test_out_of_range_datetime_falls_back_to_decoder():
+    raw = _raw({"_id": ObjectId(), "deadline": DatetimeMS(2 ** 62)})
+    assert json.loads(raw_to_json([raw]))[0]["deadline"] == 2 ** 62
+
+
+def test_raw_to_json_encodes_an_array_in_order():
+    docs = [_raw({"_id": ObjectId(), "title": f"t{i}"}) for i in range(3)]
+    assert [d["title"] for d in json.loads(raw_to_json(docs))] == ["t0", "t1", "t2"]
+    assert raw_to_json([]) == b"[]"
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from app.utils.serialization import MongoJSONResponse, serialize_task
+
+
+def _task_doc():
+    return {
+        "_id": ObjectId(),
+        "title": "Encode me",
+        "user_id": ObjectId(),
+        "label_ids": [ObjectId(), ObjectId()],
+        "deadline": datetime(2025, 3, 1, tzinfo=timezone.utc),
+        "created_at": datetime(2025, 1, 2, 3, 4, 5, 123000),
+    }
+
+
+def test_response_encodes_object_ids_and_datetimes():
+    doc = _task_doc()
+    body = json.loads(MongoJSONResponse([doc]).body)
+    assert body[0]["_id"] == str(doc["_id"])
+    assert body[0]["user_id"] == str(doc["user_id"])
+    assert body[0]["label_ids"] == [str(x) for x in doc["label_ids"]]
+    # same wire format as datetime.isoformat(), which the previous encoder used
+    assert body[0]["deadline"] == doc["deadline"].isoformat()
+    assert body[0]["created_at"] == doc["created_at"].isoformat()
+
+
+def test_serialize_task_converts_in_place():
+    doc = _task_doc()
+    oid = doc["_id"]
+    out = serialize_task(doc)
+    assert out is doc
+    assert out["_id"] == str(oid)
+    assert all(isinstance(x, str) for x in out["label_ids"])
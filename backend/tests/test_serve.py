@@ -0,0 +1,22 @@
+from app.serve import build_parser, uvicorn_options
+
+
+def test_defaults_use_cpu_count_and_fast_loop(monkeypatch):
+    monkeypatch.delenv("SERVER_WORKERS", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 6)
+    opts = uvicorn_options(build_parser().parse_args([]))
+    assert opts["workers"] == 6
+    assert opts["loop"] in {"uvloop", "asyncio"}
+    assert opts["http"] in {"httptools", "h11"}
+    assert opts["lifespan"] == "on"
+
+
+def test_env_settings_and_flag_override(monkeypatch):
+    monkeypatch.setenv("SERVER_WORKERS", "3")
+    monkeypatch.setenv("SERVER_LIMIT_CONCURRENCY", "200")
+    monkeypatch.setenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "12")
+    opts = uvicorn_options(build_parser().parse_args(["--workers", "2", "--loop", "asyncio"]))
+    assert opts["workers"] == 2
+    assert opts["loop"] == "asyncio"
+    assert opts["limit_concurrency"] == 200
+    assert opts["timeout_graceful_shutdown"] == 12
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping showdown compare tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        db["showdown_comparisons"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def test_compare_logs_and_ranks(client):
+    _prepare_user(client, "compare_user@example.com")
+    ids = [
+        client.post("/tasks", json={"title": f"T{i}", "priority": "low", "deadline": "2099-01-01"}).json()["_id"]
+        for i in range(3)
+    ]
+    resp = client.post("/showdown/compare", json={"comparisons": [
+        {"winner_id": ids[0], "loser_id": ids[1]},
+        {"winner_id": ids[1], "loser_id": ids[2]},
+        {"winner_id": ids[0], "loser_id": ids[2]},
+    ]})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["recorded"] == 3 and body["total_comparisons"] == 3
+    assert set(body["updated"]) == set(ids)
+
+    ranks = {t["_id"]: t["dislike_rank"] for t in client.get("/tasks").json()}
+    assert ranks[ids[0]] > ranks[ids[1]] > ranks[ids[2]] > 0
+
+    more = client.post("/showdown/compare", json={"comparisons": [{"winner_id": ids[0], "loser_id": ids[1]}]})
+    assert more.json()["total_comparisons"] == 4
+
+    db, mc = _db()
+    try:
+        assert db["showdown_comparisons"].count_documents({}) == 4
+    finally:
+        mc.close()
+
+
+def test_manual_rank_is_kept_until_the_task_is_compared(client):
+    _prepare_user(client, "compare_manual@example.com")
+    ids = [
+        client.post("/tasks", json={"title": f"T{i}", "priority": "low", "deadline": "2099-01-01"}).json()["_id"]
+        for i in range(3)
+    ]
+    client.post("/showdown/compare", json={"comparisons": [{"winner_id": ids[0], "loser_id": ids[1]}]})
+    assert client.patch(f"/tasks/{ids[0]}", json={"dislike_rank": 7}).status_code == 200
+
+    resp = client.post("/showdown/compare", json={"comparisons": [{"winner_id": ids[1], "loser_id": ids[2]}]})
+    assert ids[0] not in resp.json()["updated"]
+    assert client.get(f"/tasks/{ids[0]}").json()["dislike_rank"] == 7
+
+    resp = client.post("/showdown/compare", json={"comparisons": [{"winner_id": ids[0], "loser_id": ids[2]}]})
+    assert ids[0] in resp.json()["updated"]
+    assert client.get(f"/tasks/{ids[0]}").json()["dislike_rank"] != 7
+
+
+def test_compare_rejects_unknown_and_self_comparisons(client):
+    _prepare_user(client, "compare_user2@example.com")
+    tid = client.post("/tasks", json={"title": "Mine", "priority": "low", "deadline": "2099-01-01"}).json()["_id"]
+    unknown = client.post("/showdown/compare", json={"comparisons": [
+        {"winner_id": tid, "loser_id": "64b64b64b64b64b64b64b64b"},
+    ]})
+    assert unknown.status_code == 400
+    same = client.post("/showdown/compare", json={"comparisons": [{"winner_id": tid, "loser_id": tid}]})
+    assert same.status_code == 422
+
+
+def test_rank_next_returns_a_pair_and_compare_can_include_it(client):
+    _prepare_user(client, "compare_user3@example.com")
+    ids = [
+        client.post("/tasks", json={"title": f"T{i}", "priority": "low", "deadline": "2099-01-01"}).json()["_id"]
+        for i in range(4)
+    ]
+    first = client.get("/showdown/rank/next")
+    assert first.status_code == 200
+    body = first.json()
+    assert body["active_count"] == 4 and body["ranked_count"] == 0 and body["comparisons"] == 0
+    a, b = [t["_id"] for t in body["pair"]]
+    assert a != b and {a, b} <= set(ids)
+
+    resp = client.post("/showdown/compare?include=next", json={"comparisons": [{"winner_id": a, "loser_id": b}]})
+    nxt = resp.json()["next"]
+    assert nxt["ranked_count"] == 2 and nxt["comparisons"] == 1
+    # the pair just answered is not asked again straight away
+    assert {t["_id"] for t in nxt["pair"]} != {a, b}
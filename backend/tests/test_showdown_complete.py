@@ -0,0 +1,115 @@
+import os
+
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping showdown complete tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def test_complete_returns_task_and_counters(client):
+    _prepare_user(client, "complete_user@example.com")
+    task = client.post("/tasks", json={"title": "Dreaded", "priority": "high", "deadline": "2099-01-01"}).json()
+
+    first = client.post("/showdown/complete", json={"task_id": task["_id"], "timer_seconds": 42})
+    assert first.status_code == 200
+    body = first.json()
+    assert body["_id"] == task["_id"]
+    assert body["completed"] is True and body["completed_via_showdown"] is True
+    assert body["showdown_timer_seconds"] == 42
+    assert body["total_completed"] == 1
+    assert 3 <= body["peaches_increment"] <= 9
+    assert body["peaches_peached_total"] == body["peaches_increment"]
+
+    # completing again does not double count
+    again = client.post("/showdown/complete", json={"task_id": task["_id"]}).json()
+    assert again["total_completed"] == 1
+
+    # undo, then the background recount brings the counter back in line
+    client.patch(f"/tasks/{task['_id']}", json={"completed": False})
+    redo = client.post("/showdown/complete", json={"task_id": task["_id"]}).json()
+    assert redo["total_completed"] == 1
+
+
+def test_first_completion_of_a_user_without_counter_is_exact(client):
+    _prepare_user(client, "complete_legacy@example.com")
+    tasks = [
+        client.post("/tasks", json={"title": f"L{i}", "priority": "low", "deadline": "2099-01-01"}).json()
+        for i in range(3)
+    ]
+    db, mc = _db()
+    try:
+        # completed before the counter existed: only the tasks know
+        from bson import ObjectId
+
+        db["tasks"].update_many(
+            {"_id": {"$in": [ObjectId(t["_id"]) for t in tasks[:2]]}},
+            {"$set": {"completed": True, "completed_via_showdown": True}},
+        )
+    finally:
+        mc.close()
+    body = client.post("/showdown/complete", json={"task_id": tasks[2]["_id"]}).json()
+    assert body["total_completed"] == 3
+
+
+def test_complete_unknown_task_is_404(client):
+    _prepare_user(client, "complete_user2@example.com")
+    resp = client.post("/showdown/complete", json={"task_id": "64b64b64b64b64b64b64b64b"})
+    assert resp.status_code == 404
+
+
+def test_complete_with_include_stats(client):
+    _prepare_user(client, "complete_user3@example.com")
+    task = client.post("/tasks", json={"title": "Dreaded", "priority": "high", "deadline": "2099-01-01"}).json()
+
+    body = client.post("/showdown/complete?include=stats", json={"task_id": task["_id"], "timer_seconds": 30}).json()
+    assert body["stats"]["total_completed"] == 1
+    assert body["stats"]["total_time_seconds"] == 30
+    assert body["stats"]["peaches_peached_total"] == body["peaches_peached_total"]
+    # the stats endpoint serves the same numbers
+    assert client.get("/showdown/stats").json() == body["stats"]
+
+    plain = client.post("/showdown/complete", json={"task_id": task["_id"]}).json()
+    assert "stats" not in plain
+
+
+def test_bootstrap_returns_pair_counts_selected_and_labels(client):
+    _prepare_user(client, "bootstrap_user@example.com")
+    label = client.post("/labels", json={"name": "Home", "color": "#abcdef"}).json()
+    ids = []
+    for i, rank in enumerate([9, 7, 0, 0, 2]):
+        t = client.post("/tasks", json={"title": f"T{i}", "priority": "low", "deadline": "2099-01-01"}).json()
+        if rank:
+            client.patch(f"/tasks/{t['_id']}", json={"dislike_rank": rank})
+        ids.append(t["_id"])
+    client.patch(f"/tasks/{ids[4]}", json={"completed": True})
+
+    body = client.get(f"/showdown/bootstrap?selected_id={ids[1]}").json()
+    assert body["active_count"] == 4
+    assert body["ranked_count"] == 2
+    assert len(body["pair"]) == 2
+    assert {t["_id"] for t in body["pair"]} <= set(ids[:4])
+    assert body["selected"]["_id"] == ids[1]
+    assert [lbl["_id"] for lbl in body["labels"]] == [label["_id"]]
+
+    assert client.get("/showdown/bootstrap").json()["selected"] is None
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+import os
+
+import pytest
+from pymongo import MongoClient
+
+from app.models.showdown_event import day_start
+
+
+def test_day_start_is_utc_midnight():
+    at = datetime(2025, 3, 4, 23, 30, tzinfo=timezone.utc)
+    assert day_start(at) == datetime(2025, 3, 4, tzinfo=timezone.utc)
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping showdown history tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        db["showdown_events"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def test_history_survives_undo_and_rolls_up(client):
+    _prepare_user(client, "history_user@example.com")
+    ids = [
+        client.post("/tasks", json={"title": f"H{i}", "priority": "low", "deadline": "2099-01-01"}).json()["_id"]
+        for i in range(2)
+    ]
+    for task_id in ids:
+        assert client.post("/showdown/complete", json={"task_id": task_id, "timer_seconds": 30}).status_code == 200
+    # the results page's "not done yet" un-completes the task; the log keeps both events
+    assert client.patch(f"/tasks/{ids[1]}", json={"completed": False}).status_code == 200
+
+    day = client.get("/showdown/history?bucket=day").json()
+    assert day["bucket"] == "day"
+    today = day["buckets"][-1]
+    assert (today["completions"], today["undos"], today["net"]) == (2, 1, 1)
+    assert today["timer_seconds"] == 30
+    assert today["peaches"] >= 6
+    assert day["streak_days"] == 1
+
+    week = client.get("/showdown/history?bucket=week").json()
+    assert sum(b["completions"] for b in week["buckets"]) == 2
+
+    db, mc = _db()
+    try:
+        buckets = list(db["showdown_events"].find({}))
+        assert len(buckets) == 1
+        assert [e["type"] for e in buckets[0]["events"]] == ["complete", "complete", "undo"]
+        # a completion logged yesterday (its task since deleted) still extends the stats streak
+        db["showdown_events"].insert_one({
+            "user_id": buckets[0]["user_id"],
+            "day": buckets[0]["day"] - timedelta(days=1),
+            "count": 1,
+            "totals": {"completions": 1},
+        })
+    finally:
+        mc.close()
+    assert client.get("/showdown/stats").json()["streak_days"] == 2
+
+
+def test_history_rejects_inverted_range(client):
+    _prepare_user(client, "history_range@example.com")
+    resp = client.get("/showdown/history?start=2025-02-01&end=2025-01-01")
+    assert resp.status_code == 400
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import admin as admin_routes
+from app.utils.database import SlowQueryMonitor, query_shape
+
+
+def test_shape_ignores_literal_values():
+    a = query_shape("find", {"find": "tasks", "filter": {"user_id": ObjectId(), "completed": False},
+                             "sort": {"deadline": 1}, "limit": 10})
+    b = query_shape("find", {"find": "tasks", "filter": {"user_id": ObjectId(), "completed": True},
+                             "sort": {"deadline": 1}, "limit": 50})
+    assert a == b
+    assert "deadline" in a and "False" not in a
+    assert query_shape("find", {"find": "tasks", "filter": {"_id": {"$in": [ObjectId(), ObjectId()]}}}) == \
+        query_shape("find", {"find": "tasks", "filter": {"_id": {"$in": [ObjectId()]}}})
+    assert query_shape("insert", {"insert": "tasks", "documents": []}) is None
+    assert query_shape("count", {"count": "tasks", "query": {"completed_via_showdown": True}}).startswith("count tasks")
+
+
+class _FakeDb:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def command(self, cmd):
+        self.calls.append(cmd)
+        return {
+            "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "COLLSCAN"}}},
+            "executionStats": {"nReturned": 3, "totalKeysExamined": 0, "totalDocsExamined": 500,
+                               "executionTimeMillis": 140},
+        }
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def __getitem__(self, name):
+        return _FakeDb(self.calls)
+
+
+def _run(monitor, request_id, command, ms):
+    name = next(iter(command))
+    monitor.started(SimpleNamespace(command_name=name, command={**command, "lsid": {"id": 1}, "$db": "app"},
+                                    database_name="app", connection_id=("h", 1), request_id=request_id))
+    monitor.succeeded(SimpleNamespace(connection_id=("h", 1), request_id=request_id,
+                                      duration_micros=int(ms * 1000)))
+
+
+async def test_stats_and_one_rate_limited_explain_per_shape():
+    monitor = SlowQueryMonitor(threshold_ms=100, explain_interval=60)
+    client = _FakeClient()
+    monitor.start(client)
+    slow = {"find": "tasks", "filter": {"completed_via_showdown": True}}
+    other = {"count": "tasks", "query": {"user_id": ObjectId()}}
+    _run(monitor, 1, slow, 150)
+    _run(monitor, 2, slow, 5)
+    _run(monitor, 3, slow, 200)
+    _run(monitor, 4, other, 300)  # slow too, but inside the explain interval
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert len(client.calls) == 1
+    explained = client.calls[0]
+    assert explained["verbosity"] == "executionStats"
+    assert "lsid" not in explained["explain"] and "$db" not in explained["explain"]
+
+    top = monitor.top(limit=5, order_by="total")
+    assert [t["count"] for t in top] == [3, 1]
+    first = top[0]
+    assert first["slow_count"] == 2 and first["max_ms"] == 200
+    assert first["plan"]["stages"] == ["FETCH", "COLLSCAN"]
+    assert first["plan"]["docs_examined"] == 500
+    assert top[1]["plan"] is None
+
+
+def test_shape_table_is_bounded():
+    monitor = SlowQueryMonitor(max_shapes=2)
+    for i, coll in enumerate(["a", "b", "c"]):
+        _run(monitor, i, {"find": coll, "filter": {}}, 10 + i)
+    assert [t["shape"].split()[1] for t in monitor.top()] == ["c", "b"]
+
+
+def test_admin_endpoint(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    monitor = SlowQueryMonitor()
+    _run(monitor, 1, {"find": "labels", "filter": {"_id": ObjectId()}}, 3)
+    monkeypatch.setattr(admin_routes, "slow_query_monitor", monitor)
+    app = FastAPI()
+    app.include_router(admin_routes.router)
+    client = TestClient(app)
+    assert client.get("/admin/slow-queries").status_code == 403
+    body = client.get("/admin/slow-queries?limit=1", headers={"X-Admin-Token": "admin-secret"}).json()
+    assert body[0]["shape"].startswith("find labels")
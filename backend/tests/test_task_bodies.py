@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping task body tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        db["task_bodies"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def test_long_description_is_offloaded_and_lazy_loaded(client, monkeypatch):
+    monkeypatch.setenv("TASK_DESCRIPTION_INLINE_MAX", "100")
+    monkeypatch.setenv("TASK_DESCRIPTION_PREVIEW_CHARS", "20")
+    _prepare_user(client, "bodies_user@example.com")
+    notes = "Call the plumber. " * 20
+    created = client.post("/tasks", json={
+        "title": "Fix sink", "description": notes, "priority": "low", "deadline": "2099-01-01",
+    }).json()
+    assert created["description_truncated"] is True
+    assert created["description_length"] == len(notes)
+    assert created["description"] == notes[:20].rstrip()
+
+    listed = client.get("/tasks").json()
+    assert listed[0]["description"] == notes[:20].rstrip()
+    assert client.get(f"/tasks/{created['_id']}").json()["description_truncated"] is True
+    full = client.get(f"/tasks/{created['_id']}?include=body").json()
+    assert full["description"] == notes and full["description_truncated"] is False
+
+    # shortening the description brings it back inline and drops the body
+    updated = client.patch(f"/tasks/{created['_id']}", json={"description": "Done soon"}).json()
+    assert updated["description"] == "Done soon" and updated["description_truncated"] is False
+    db, mc = _db()
+    try:
+        assert db["task_bodies"].count_documents({}) == 0
+        client.patch(f"/tasks/{created['_id']}", json={"description": notes})
+        assert db["task_bodies"].count_documents({}) == 1
+        assert client.delete(f"/tasks/{created['_id']}").status_code == 204
+        assert db["task_bodies"].count_documents({}) == 0
+    finally:
+        mc.close()
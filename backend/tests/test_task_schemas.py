@@ -1,6 +1,8 @@
 import pytest
 from datetime import date
 
+from pydantic import ValidationError
+
 from app.schemas.task import TaskCreate, TaskUpdate, TaskPriority
 
 
@@ -38,3 +40,9 @@ def test_task_update_validates_optional_fields():
     assert upd.priority == TaskPriority.medium
 
 
+
+
+def test_task_update_rejects_null_dislike_rank():
+    with pytest.raises(ValidationError):
+        TaskUpdate.model_validate({"dislike_rank": None})
+    assert TaskUpdate.model_validate({"dislike_rank": 3}).dislike_rank == 3
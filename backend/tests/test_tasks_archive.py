@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping archive tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        db["tasks_archive"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def _run_archive(**kwargs) -> int:
+    from app.utils.archive import archive_completed_tasks
+
+    async def run():
+        motor = AsyncIOMotorClient(os.environ["MONGO_URI"])
+        try:
+            return await archive_completed_tasks(motor[os.environ["MONGO_DB_NAME_TEST"]], **kwargs)
+        finally:
+            motor.close()
+
+    return asyncio.run(run())
+
+
+def test_old_completed_tasks_move_to_archive(client):
+    _prepare_user(client, "archive_user@example.com")
+    old = client.post("/tasks", json={"title": "Old", "priority": "low", "deadline": "2020-01-01"}).json()
+    recent = client.post("/tasks", json={"title": "Recent", "priority": "low", "deadline": "2020-01-01"}).json()
+    still_open = client.post("/tasks", json={"title": "Open", "priority": "low", "deadline": "2020-01-01"}).json()
+    client.post("/showdown/complete", json={"task_id": old["_id"]})
+    client.patch(f"/tasks/{recent['_id']}", json={"completed": True})
+    before_stats = client.get("/showdown/stats").json()
+
+    db, mc = _db()
+    try:
+        long_ago = datetime.now(timezone.utc) - timedelta(days=90)
+        db["tasks"].update_many(
+            {"_id": {"$in": [ObjectId(old["_id"]), ObjectId(still_open["_id"])]}},
+            {"$set": {"updated_at": long_ago}},
+        )
+    finally:
+        mc.close()
+
+    assert _run_archive(older_than_days=30, batch_size=1, pause_seconds=0) == 1
+
+    hot_ids = {t["_id"] for t in client.get("/tasks").json()}
+    assert hot_ids == {recent["_id"], still_open["_id"]}
+
+    archived = client.get("/tasks/archive").json()
+    assert [t["_id"] for t in archived["items"]] == [old["_id"]]
+    assert archived["next_before"] is None
+
+    # point reads fall through to the archive
+    fetched = client.get(f"/tasks/{old['_id']}").json()
+    assert fetched["archived"] is True and fetched["title"] == "Old"
+
+    # archived showdown completions still count
+    assert client.get("/showdown/stats").json()["total_completed"] == before_stats["total_completed"]
+
+    assert client.delete(f"/tasks/{old['_id']}").status_code in (200, 204)
+    assert client.get(f"/tasks/{old['_id']}").status_code == 404
+
+
+def test_patching_an_archived_task_restores_it(client):
+    _prepare_user(client, "archive_user3@example.com")
+    task = client.post("/tasks", json={"title": "Done long ago", "priority": "low", "deadline": "2020-01-01"}).json()
+    client.patch(f"/tasks/{task['_id']}", json={"completed": True})
+    db, mc = _db()
+    try:
+        db["tasks"].update_one(
+            {"_id": ObjectId(task["_id"])}, {"$set": {"updated_at": datetime.now(timezone.utc) - timedelta(days=90)}}
+        )
+    finally:
+        mc.close()
+    assert _run_archive(older_than_days=30, pause_seconds=0) == 1
+    assert client.get(f"/tasks/{task['_id']}").json()["archived"] is True
+
+    resp = client.patch(f"/tasks/{task['_id']}", json={"completed": False})
+    assert resp.status_code == 200
+    assert resp.json()["completed"] is False and "archived" not in resp.json()
+    assert task["_id"] in {t["_id"] for t in client.get("/tasks").json()}
+    assert client.get("/tasks/archive").json()["items"] == []
+
+
+def test_archive_paging_rejects_bad_cursor(client):
+    _prepare_user(client, "archive_user2@example.com")
+    assert client.get("/tasks/archive?before=nope").status_code == 400
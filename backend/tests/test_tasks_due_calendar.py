@@ -0,0 +1,99 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping due/calendar tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def _create(client_http, title: str, deadline: date, completed: bool = False):
+    resp = client_http.post("/tasks", json={
+        "title": title,
+        "priority": "medium",
+        "deadline": deadline.isoformat(),
+        "completed": completed,
+    })
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def test_due_window_overdue_and_paging(client):
+    _prepare_user(client, "due_user@example.com")
+    today = date.today()
+    _create(client, "Overdue", today - timedelta(days=2))
+    _create(client, "Overdue but done", today - timedelta(days=1), completed=True)
+    for i in range(3):
+        _create(client, f"Soon {i}", today + timedelta(days=i + 1))
+    _create(client, "Later", today + timedelta(days=30))
+
+    overdue = client.get(f"/tasks/due?before={today.isoformat()}").json()
+    assert [t["title"] for t in overdue["items"]] == ["Overdue"]
+    assert overdue["next_cursor"] is None
+    done = client.get(f"/tasks/due?before={today.isoformat()}&completed=true").json()
+    assert [t["title"] for t in done["items"]] == ["Overdue but done"]
+    both = client.get(f"/tasks/due?before={today.isoformat()}&completed=any").json()
+    assert [t["title"] for t in both["items"]] == ["Overdue", "Overdue but done"]
+    assert client.get("/tasks/due?completed=maybe").status_code == 422
+
+    window = f"after={today.isoformat()}&before={(today + timedelta(days=7)).isoformat()}"
+    page1 = client.get(f"/tasks/due?{window}&limit=2").json()
+    assert [t["title"] for t in page1["items"]] == ["Soon 0", "Soon 1"]
+    page2 = client.get(f"/tasks/due?{window}&limit=2&cursor={page1['next_cursor']}").json()
+    assert [t["title"] for t in page2["items"]] == ["Soon 2"]
+    assert page2["next_cursor"] is None
+
+
+def test_due_skips_tasks_without_deadline(client):
+    _prepare_user(client, "due_null_user@example.com")
+    today = date.today()
+    for i in range(2):
+        task = _create(client, f"Undated {i}", today)
+        assert client.patch(f"/tasks/{task['_id']}", json={"deadline": None}).status_code == 200
+    _create(client, "Dated", today + timedelta(days=1))
+
+    page = client.get("/tasks/due?limit=1").json()
+    assert [t["title"] for t in page["items"]] == ["Dated"]
+    assert page["next_cursor"] is not None
+    rest = client.get(f"/tasks/due?limit=1&cursor={page['next_cursor']}").json()
+    assert rest["items"] == []
+
+
+def test_calendar_buckets(client):
+    _prepare_user(client, "calendar_user@example.com")
+    monday = date(2030, 1, 7)
+    _create(client, "Mon", monday)
+    _create(client, "Mon done", monday, completed=True)
+    _create(client, "Wed", monday + timedelta(days=2))
+    _create(client, "Next week", monday + timedelta(days=7))
+
+    rng = f"start={monday.isoformat()}&end={(monday + timedelta(days=14)).isoformat()}"
+    days = client.get(f"/tasks/calendar?{rng}&bucket=day").json()
+    assert [(b["total"], b["completed"]) for b in days["buckets"]] == [(2, 1), (1, 0), (1, 0)]
+
+    weeks = client.get(f"/tasks/calendar?{rng}&bucket=week").json()
+    assert [b["total"] for b in weeks["buckets"]] == [3, 1]
+
+    bad = client.get(f"/tasks/calendar?start={monday.isoformat()}&end={monday.isoformat()}")
+    assert bad.status_code == 400
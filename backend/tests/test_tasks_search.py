@@ -0,0 +1,72 @@
+import os
+from datetime import date
+
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping task search tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        db["task_bodies"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def _create(client_http, title: str, description: str = None):
+    resp = client_http.post("/tasks", json={
+        "title": title,
+        "description": description,
+        "priority": "low",
+        "deadline": date.today().isoformat(),
+    })
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def test_text_and_prefix_search(client):
+    _prepare_user(client, "search_user@example.com")
+    _create(client, "File taxes", "Gather receipts for the accountant")
+    _create(client, "Fix bike", "Flat tyre")
+    _create(client, "Call accountant")
+
+    text = client.get("/tasks/search?q=accountant").json()
+    assert {t["title"] for t in text["items"]} == {"File taxes", "Call accountant"}
+
+    prefix = client.get("/tasks/search?q=fi&mode=prefix").json()
+    assert [t["title"] for t in prefix["items"]] == ["File taxes", "Fix bike"]
+
+    paged = client.get("/tasks/search?q=FI&mode=prefix&limit=1").json()
+    assert [t["title"] for t in paged["items"]] == ["File taxes"]
+    assert paged["has_more"] is True
+
+    renamed = client.get("/tasks/search?q=call&mode=prefix").json()["items"][0]
+    client.patch(f"/tasks/{renamed['_id']}", json={"title": "Email accountant"})
+    assert client.get("/tasks/search?q=call&mode=prefix").json()["items"] == []
+
+
+def test_text_search_matches_beyond_the_description_preview(client):
+    _prepare_user(client, "search_body_user@example.com")
+    long_task = _create(client, "Write report", "intro " * 1000 + "zanzibar")
+    assert long_task["description_truncated"] is True
+    _create(client, "Plan trip", "Zanzibar in spring")
+
+    items = client.get("/tasks/search?q=zanzibar").json()["items"]
+    assert {t["title"] for t in items} == {"Write report", "Plan trip"}
+    assert "zanzibar" not in next(t for t in items if t["title"] == "Write report")["description"]
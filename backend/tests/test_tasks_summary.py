@@ -0,0 +1,49 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+from pymongo import MongoClient
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping task summary tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def _prepare_user(client_http, email: str):
+    db, mc = _db()
+    try:
+        db["users"].delete_one({"email": email})
+        db["tasks"].delete_many({})
+        db["labels"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    resp = client_http.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert resp.status_code == 200
+
+
+def test_summary_counts_and_invalidation(client):
+    _prepare_user(client, "summary_user@example.com")
+    label = client.post("/labels", json={"name": "Home"}).json()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    client.post("/tasks", json={"title": "Late", "priority": "high", "deadline": yesterday, "label_ids": [label["_id"]]})
+    client.post("/tasks", json={"title": "Soon", "priority": "low", "deadline": tomorrow})
+    done = client.post("/tasks", json={"title": "Done", "priority": "high", "deadline": yesterday, "completed": True}).json()
+
+    summary = client.get("/tasks/summary").json()
+    assert summary["total"] == 3
+    assert summary["completed"] == 1
+    assert summary["overdue"] == 1
+    assert summary["by_priority"] == {"high": 2, "low": 1}
+    assert summary["by_label"] == [{"label_id": label["_id"], "total": 1, "open": 1}]
+
+    client.delete(f"/tasks/{done['_id']}")
+    assert client.get("/tasks/summary").json()["total"] == 2
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import os
+import time
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from motor.motor_asyncio import AsyncIOMotorClient
+import pytest
+from pymongo import MongoClient
+
+from app.main import app
+from app.utils.auth import TokenRevoked, create_access_token, decode_access_token
+from app.utils.revocation import RevocationList, get_revocation_list, set_revocation_list
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", os.environ.get("JWT_SECRET", "test-secret"))
+    fresh = RevocationList()
+    set_revocation_list(fresh)
+    yield fresh
+    set_revocation_list(None)
+
+
+def test_tokens_carry_a_unique_jti(revocations):
+    a = decode_access_token(create_access_token("user-1"))
+    b = decode_access_token(create_access_token("user-1"))
+    assert a["jti"] and a["jti"] != b["jti"]
+
+
+def test_revoked_token_is_rejected(revocations):
+    token = create_access_token("user-1")
+    payload = decode_access_token(token)
+    revocations.add(payload["jti"], payload["exp"])
+    with pytest.raises(TokenRevoked):
+        decode_access_token(token)
+    # other tokens of the same user are unaffected
+    assert decode_access_token(create_access_token("user-1"))["sub"] == "user-1"
+
+
+def test_expired_entries_are_pruned(revocations):
+    revocations.add("old", time.time() - 1)
+    revocations.add("live", time.time() + 60)
+    revocations._prune()
+    assert not revocations.is_revoked("old") and revocations.is_revoked("live")
+    assert not revocations.is_revoked(None)
+
+
+def test_bad_tokens_are_401_not_500(revocations):
+    client = TestClient(app)  # no lifespan: the auth check comes before any DB access
+    token = create_access_token("user-1")
+    payload = decode_access_token(token)
+    revocations.add(payload["jti"], payload["exp"])
+    client.cookies.set("access_token", token)
+    assert client.get("/events").status_code == 401
+
+    expired = jwt.encode({"sub": "user-1", "exp": int(time.time()) - 10}, os.environ["JWT_SECRET"], algorithm="HS256")
+    client.cookies.set("access_token", expired)
+    assert client.get("/events").status_code == 401
+
+
+def _db():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping token revocation tests")
+    client = MongoClient(uri)
+    return client[dbname], client
+
+
+def test_logout_revokes_a_copied_token(client):
+    db, mc = _db()
+    try:
+        email = "revoke_user@example.com"
+        db["users"].delete_one({"email": email})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": email, "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    assert client.post("/auth/login", json={"email": email, "password": "Password123!"}).status_code == 200
+    stolen = client.cookies.get("access_token")
+    assert client.post("/auth/logout").status_code == 200
+
+    client.cookies.set("access_token", stolen)
+    assert client.get("/auth/me").status_code == 401
+
+    db, mc = _db()
+    try:
+        jti = jwt.get_unverified_claims(stolen)["jti"]
+        assert db["revoked_tokens"].count_documents({"jti": jti}) == 1
+    finally:
+        mc.close()
+    assert get_revocation_list().is_revoked(jti)
+
+
+def test_poll_follows_the_server_stamped_revoked_at():
+    _, mc = _db()
+    mc.close()
+
+    async def run():
+        motor = AsyncIOMotorClient(os.environ["MONGO_URI"])
+        db = motor[os.environ["MONGO_DB_NAME_TEST"]]
+        try:
+            await db["revoked_tokens"].delete_many({})
+            here, there = RevocationList(), RevocationList()
+            await here.ensure_indexes(db)
+            await there.revoke(db, "first", time.time() + 60, None)
+            assert await here.refresh(db) == 1 and here.is_revoked("first")
+
+            await there.revoke(db, "second", time.time() + 60, None)
+            await here.refresh(db)
+            assert here.is_revoked("second")
+
+            # committed after the last poll but stamped just before it: the overlap still reads it
+            await db["revoked_tokens"].insert_one({
+                "jti": "late",
+                "expires_at": datetime.now(timezone.utc) + timedelta(minutes=1),
+                "revoked_at": here._since - timedelta(seconds=5),
+            })
+            await here.refresh(db)
+            assert here.is_revoked("late")
+        finally:
+            motor.close()
+
+    asyncio.run(run())
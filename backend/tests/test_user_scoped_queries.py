@@ -0,0 +1,118 @@
+"""Every task/label query must carry `user_id` (the shard key prefix).
+
+A command listener records what the app sends to Mongo while a user goes
+through the task, label and showdown flows; any filter on a user-owned
+collection without `user_id` would be a scatter-gather query once sharded.
+"""
+
+import os
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient, monitoring
+
+
+USER_SCOPED = {"tasks", "tasks_archive", "task_bodies", "labels", "showdown_events"}
+
+
+class FilterRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.active = False
+        self.filters = []
+
+    def started(self, event):
+        if not self.active:
+            return
+        cmd = event.command
+        name = event.command_name
+        coll = cmd.get(name)
+        if coll not in USER_SCOPED:
+            return
+        if name in {"find", "count", "distinct"}:
+            self.filters.append((name, coll, cmd.get("filter", cmd.get("query", {}))))
+        elif name == "findAndModify":
+            self.filters.append((name, coll, cmd.get("query", {})))
+        elif name == "aggregate":
+            first = (cmd.get("pipeline") or [{}])[0]
+            self.filters.append((name, coll, first.get("$match", {})))
+        elif name in {"update", "delete"}:
+            for stmt in cmd.get(f"{name}s", []):
+                self.filters.append((name, coll, stmt.get("q", {})))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+_recorder = FilterRecorder()
+# global registration applies to clients created afterwards, i.e. the one
+# the app lifespan opens below
+monitoring.register(_recorder)
+
+
+@pytest.fixture
+def scoped_client():
+    uri = os.environ.get("MONGO_URI")
+    dbname = os.environ.get("MONGO_DB_NAME_TEST")
+    if not uri or not dbname:
+        pytest.skip("DB env not set; skipping user-scoped query test")
+    mc = MongoClient(uri)
+    try:
+        db = mc[dbname]
+        db["users"].delete_one({"email": "scoped_user@example.com"})
+        db["tasks"].delete_many({})
+        db["labels"].delete_many({})
+        from app.utils.auth import hash_password
+
+        db["users"].insert_one({"email": "scoped_user@example.com", "password_hash": hash_password("Password123!")})
+    finally:
+        mc.close()
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        resp = test_client.post("/auth/login", json={"email": "scoped_user@example.com", "password": "Password123!"})
+        assert resp.status_code == 200
+        yield test_client
+
+
+def _has_user_id(query) -> bool:
+    if "user_id" in query:
+        return True
+    return any(_has_user_id(q) for q in query.get("$and", []))
+
+
+def test_task_and_label_queries_always_filter_on_user_id(scoped_client):
+    client = scoped_client
+    _recorder.filters.clear()
+    _recorder.active = True
+    try:
+        label = client.post("/labels", json={"name": "Scoped", "color": "#abcdef"}).json()
+        client.patch(f"/labels/{label['_id']}", json={"color": "#123456"})
+        client.get("/labels")
+        a = client.post("/tasks", json={
+            "title": "A", "priority": "high", "deadline": date.today().isoformat(), "label_ids": [label["_id"]],
+        }).json()
+        b = client.post("/tasks", json={"title": "B", "priority": "low", "deadline": date.today().isoformat()}).json()
+        client.get("/tasks")
+        client.get(f"/tasks/{a['_id']}")
+        client.get("/tasks/64b64b64b64b64b64b64b64b")
+        client.patch(f"/tasks/{a['_id']}", json={"title": "A2", "label_ids": [label["_id"]]})
+        client.get("/tasks/summary")
+        client.get("/tasks/search?q=a&mode=prefix")
+        client.get("/tasks/archive")
+        client.get("/showdown/pair")
+        client.post("/showdown/complete", json={"task_id": b["_id"], "timer_seconds": 5})
+        client.get("/showdown/stats")
+        client.patch(f"/tasks/{b['_id']}", json={"completed": False})
+        client.get("/showdown/history?bucket=week")
+        client.delete(f"/tasks/{a['_id']}")
+        client.delete(f"/labels/{label['_id']}")
+    finally:
+        _recorder.active = False
+
+    assert _recorder.filters, "listener saw no task/label queries"
+    unscoped = [(name, coll, q) for name, coll, q in _recorder.filters if not _has_user_id(q)]
+    assert unscoped == []
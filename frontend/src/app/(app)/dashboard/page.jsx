@@ -1,7 +1,7 @@
 'use client';
 
 import { useEffect, useMemo, useState } from 'react';
-import { getJson, postJson } from '@/lib/api';
+import { batchJson, getJson, postJson, subscribeEvents } from '@/lib/api';
 import { Calendar, Check, Flag, Plus, Tag, X, Trash2, Edit2 } from 'lucide-react';
 import Link from 'next/link';
 
@@ -24,6 +24,17 @@ function EditTaskForm({ task, labels, onCancel, onSaved }) {
 	const [submitting, setSubmitting] = useState(false);
 	const [error, setError] = useState('');
 	const [fieldErrors, setFieldErrors] = useState({});
+	// long descriptions arrive as a preview; load the full text before it can be edited
+	const [bodyLoading, setBodyLoading] = useState(!!task.description_truncated);
+
+	useEffect(() => {
+		if (!task.description_truncated) return;
+		let cancelled = false;
+		getJson(`/tasks/${task._id}?include=body`)
+			.then((full) => { if (!cancelled) { setDescription(full.description || ''); setBodyLoading(false); } })
+			.catch(() => { if (!cancelled) setError('Failed to load the full description'); });
+		return () => { cancelled = true; };
+	}, [task._id, task.description_truncated]);
 
 	const toggleLabel = (labelId) => {
 		setSelectedLabelIds((prev) => (prev.includes(labelId) ? prev.filter((id) => id !== labelId) : [...prev, labelId]));
@@ -51,11 +62,12 @@ function EditTaskForm({ task, labels, onCancel, onSaved }) {
 		try {
 			const payload = {
 				title,
-				description: description || undefined,
 				priority,
 				deadline,
 				label_ids: selectedLabelIds,
 			};
+			// never send a preview back as the description
+			if (!bodyLoading) payload.description = description || undefined;
 			const { patchJson } = await import('@/lib/api');
 			const updated = await patchJson(`/tasks/${task._id}`, payload);
 			onSaved(updated);
@@ -84,7 +96,7 @@ function EditTaskForm({ task, labels, onCancel, onSaved }) {
 			</div>
 			<div>
 				<label className="block text-sm font-medium mb-1 dark:text-amber-100">Description</label>
-				<textarea value={description} onChange={(e)=>setDescription(e.target.value)} rows={3} className="w-full px-4 py-2 rounded-lg border bg-white dark:bg-stone-900/60 dark:text-amber-100 border-orange-200 dark:border-amber-900/40 focus:ring-2 focus:ring-orange-500 focus:border-transparent"/>
+				<textarea value={description} onChange={(e)=>setDescription(e.target.value)} disabled={bodyLoading} rows={3} className="w-full px-4 py-2 rounded-lg border bg-white dark:bg-stone-900/60 dark:text-amber-100 border-orange-200 dark:border-amber-900/40 focus:ring-2 focus:ring-orange-500 focus:border-transparent"/>
 			</div>
 			<div className="grid grid-cols-2 gap-4">
 				<div>
@@ -314,20 +326,47 @@ export default function DashboardPage() {
 
 	useEffect(() => {
 		setLoading(true);
-		Promise.all([
-			getJson('/tasks').then(setTasks).catch((e)=>{
-				if (e && e.status === 401) {
-					setAuthExpired(true);
-					throw e;
-				}
-				throw e;
-			}),
-			getJson('/labels').then(setLabels).catch(() => {}),
+		// tasks + labels in one round trip
+		batchJson([
+			{ method: 'GET', path: '/tasks' },
+			{ method: 'GET', path: '/labels' },
 		])
-			.catch((e) => setError(e.message || 'Failed to load tasks'))
+			.then(async ([tasksRes, labelsRes]) => {
+				if (tasksRes.status !== 200) {
+					const err = new Error(tasksRes.body?.detail || 'Failed to load tasks');
+					err.status = tasksRes.status;
+					throw err;
+				}
+				// a body over the batch response budget comes back truncated; fetch it directly
+				setTasks(tasksRes.truncated ? await getJson('/tasks') : tasksRes.body);
+				if (labelsRes.status === 200 && !labelsRes.truncated) setLabels(labelsRes.body);
+				else getJson('/labels').then(setLabels).catch(() => {});
+			})
+			.catch((e) => {
+				if (e && e.status === 401) setAuthExpired(true);
+				setError(e.message || 'Failed to load tasks');
+			})
 			.finally(() => setLoading(false));
 	}, []);
 
+	// Apply changes made in other tabs/devices instead of refetching the list
+	useEffect(() => {
+		return subscribeEvents((ev) => {
+			if (ev.type === 'task.created' || ev.type === 'task.updated' || ev.type === 'showdown.completed') {
+				setTasks((prev) => (prev.some((t) => t._id === ev.task._id)
+					? prev.map((t) => (t._id === ev.task._id ? { ...t, ...ev.task } : t))
+					: [ev.task, ...prev]));
+			} else if (ev.type === 'task.deleted') {
+				setTasks((prev) => prev.filter((t) => t._id !== ev.id));
+			} else if (ev.type === 'label.changed') {
+				getJson('/labels').then(setLabels).catch(() => {});
+			} else if (ev.type === 'resync') {
+				getJson('/tasks').then(setTasks).catch(() => {});
+				getJson('/labels').then(setLabels).catch(() => {});
+			}
+		});
+	}, []);
+
 	const filteredTasks = useMemo(() => {
 		let out = tasks;
 		if (filter === 'active') out = out.filter((t) => !t.completed);
@@ -1,101 +1,69 @@
 'use client';
 
-import { useCallback, useEffect, useMemo, useState } from 'react';
+import { useCallback, useEffect, useState } from 'react';
 import Link from 'next/link';
 import { Swords, ThumbsDown, Trophy, Zap, Play, BarChart3, Home } from 'lucide-react';
-import { getJson, patchJson } from '@/lib/api';
+import { getJson, postJson } from '@/lib/api';
 import { useTheme } from '@/components/ThemeContext';
 
 export default function ShowdownRankPage() {
   const { theme } = useTheme();
   const darkMode = theme === 'dark';
 
-  const [tasks, setTasks] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [comparison, setComparison] = useState(1);
   const totalComparisons = 8;
   const [pair, setPair] = useState([]);
   const [selectedId, setSelectedId] = useState(null);
-  const [deltas, setDeltas] = useState({}); // { taskId: +n }
+  const [rankedCount, setRankedCount] = useState(0);
   const [showCompletionModal, setShowCompletionModal] = useState(false);
   const [saving, setSaving] = useState(false);
   const [showStartGuard, setShowStartGuard] = useState(false);
 
-  // Load incomplete tasks
+  // The server picks the most informative pair from its current rank estimates
   useEffect(() => {
     setLoading(true);
-    getJson('/tasks')
-      .then((all) => setTasks(all.filter((t) => !t.completed)))
+    getJson('/showdown/rank/next')
+      .then((next) => {
+        setPair(next.pair || []);
+        setRankedCount(next.ranked_count || 0);
+      })
       .catch((e) => setError(e.message || 'Failed to load tasks'))
       .finally(() => setLoading(false));
   }, []);
 
-  const pickPair = useCallback(() => {
-    const pool = tasks.slice();
-    if (pool.length < 2) return [];
-    // Compute effective rank = persisted + in-session delta
-    const eff = (t) => (Number(t.dislike_rank || 0) + Number(deltas[t._id] || 0));
-    const unranked = pool.filter((t) => eff(t) <= 0);
-    const ranked = pool.filter((t) => eff(t) > 0);
-
-    // Prefer pairing: one unranked with one ranked (to quickly place new tasks)
-    if (unranked.length > 0) {
-      const a = unranked[Math.floor(Math.random() * unranked.length)];
-      const bPool = ranked.length > 0 ? ranked : unranked.filter((t) => t._id !== a._id);
-      if (bPool.length === 0) return [a, pool.find((t) => t._id !== a._id)];
-      const b = bPool[Math.floor(Math.random() * bPool.length)];
-      return [a, b];
+  const startShowdown = useCallback(() => {
+    if (rankedCount < 4) {
+      setShowStartGuard(true);
+      return;
     }
+    if (typeof window !== 'undefined') window.location.href = '/showdown/vs';
+  }, [rankedCount]);
 
-    // All ranked: allow cyclic refinement on already-ranked tasks
-    const i = Math.floor(Math.random() * pool.length);
-    let j = Math.floor(Math.random() * pool.length);
-    if (j === i) j = (j + 1) % pool.length;
-    return [pool[i], pool[j]];
-  }, [tasks, deltas]);
-
-  const eff = useCallback((t) => (Number(t.dislike_rank || 0) + Number(deltas[t._id] || 0)), [deltas]);
-  const rankedCount = useMemo(() => tasks.filter((t) => eff(t) > 0).length, [tasks, eff]);
-
-  const flushUpdates = useCallback(async () => {
-    if (!tasks.length || !Object.keys(deltas).length) return;
+  const onChoose = async (winnerId) => {
+    const loser = pair.find((t) => t._id !== winnerId);
+    if (!loser || saving) return;
+    setSelectedId(winnerId);
     setSaving(true);
+    setError('');
     try {
-      for (const t of tasks) {
-        const d = deltas[t._id] || 0;
-        if (!d) continue;
-        const next = (t.dislike_rank || 0) + d;
-        await patchJson(`/tasks/${t._id}`, { dislike_rank: next });
-      }
+      // saves the answer, reranks, and returns the next pair in the same round trip
+      const res = await postJson('/showdown/compare?include=next', {
+        comparisons: [{ winner_id: winnerId, loser_id: loser._id }],
+      });
+      setPair(res.next?.pair || []);
+      setRankedCount(res.next?.ranked_count || 0);
+    } catch (e) {
+      setError(e.message || 'Failed to save comparison');
+      return;
     } finally {
       setSaving(false);
+      setSelectedId(null);
     }
-  }, [tasks, deltas]);
-
-  const startShowdown = useCallback(async () => {
-    if (rankedCount < 4) {
-      setShowStartGuard(true);
-      return;
-    }
-    try {
-      await flushUpdates();
-    } catch {}
-    if (typeof window !== 'undefined') window.location.href = '/showdown/vs';
-  }, [rankedCount, flushUpdates]);
-
-  useEffect(() => {
-    if (!loading) setPair(pickPair());
-  }, [loading, pickPair]);
-
-  const onChoose = (winnerId) => {
-    // Simple scoring: increment dislike_rank delta for the chosen task
-    setDeltas((prev) => ({ ...prev, [winnerId]: (prev[winnerId] || 0) + 1 }));
 
     if (comparison < totalComparisons) {
       setComparison((c) => c + 1);
-      setSelectedId(null);
-      setPair(pickPair());
     } else {
       setShowCompletionModal(true);
     }
@@ -173,6 +141,8 @@ export default function ShowdownRankPage() {
             </div>
           </div>
 
+          {error && !showCompletionModal && <p className="mb-4 text-center text-sm text-red-600">{error}</p>}
+
           {/* Actions below ranking */}
           <div className="flex justify-center gap-3 mt-4 flex-wrap">
             <button onClick={startShowdown} className={`${darkMode ? 'border-amber-700 text-amber-300 hover:bg-amber-900/30' : 'border-orange-300 text-orange-700 hover:bg-orange-50'} inline-flex items-center gap-2 px-4 py-2 rounded-lg border-2 text-sm font-medium`}>
@@ -204,26 +174,19 @@ export default function ShowdownRankPage() {
                 <div className="space-y-3">
                   <button
                     disabled={saving}
-                    onClick={async () => {
-                      setError('');
-                      try {
-                        await flushUpdates();
-                      } catch (e) {
-                        setError(e.message || 'Failed to save rankings');
-                      }
+                    onClick={() => {
                       if (typeof window !== 'undefined') window.location.href = '/showdown/vs';
                     }}
                     className={`${darkMode ? 'bg-gradient-to-r from-amber-700 to-orange-800 hover:from-amber-600 hover:to-orange-700 text-amber-50' : 'bg-gradient-to-r from-orange-500 to-amber-500 hover:from-orange-600 hover:to-amber-600 text-white'} w-full py-3 rounded-xl font-semibold transition shadow-md hover:shadow-lg flex items-center justify-center gap-2`}
                   >
                     <Trophy className="w-5 h-5" />
-                    {saving ? 'Saving…' : 'Start Showdown'}
+                    Start Showdown
                   </button>
                   <button
                     disabled={saving}
                     onClick={() => {
                       setComparison(1);
                       setSelectedId(null);
-                      setPair(pickPair());
                       setShowCompletionModal(false);
                     }}
                     className={`${darkMode ? 'border-amber-700 text-amber-300 hover:bg-amber-900/30' : 'border-orange-300 text-orange-700 hover:bg-orange-50'} w-full py-3 rounded-xl font-medium transition border-2 flex items-center justify-center gap-2`}
@@ -36,11 +36,19 @@ export default function ShowdownResultsPage() {
   const [peachesInc, setPeachesInc] = useState(null);
   const [completedTotal, setCompletedTotal] = useState(null);
 
-  // Fetch the completed task title for display
+  // Completed task title: from the completion response when we have it, else fetch
   useEffect(() => {
     let active = true;
     async function load() {
       if (!taskId) return;
+      try {
+        const raw = typeof window !== 'undefined' ? window.sessionStorage.getItem('showdown_complete_meta') : null;
+        const meta = raw ? JSON.parse(raw) : null;
+        if (meta && meta.taskId === taskId && meta.title) {
+          setTitle(meta.title);
+          return;
+        }
+      } catch {}
       try {
         const t = await getJson(`/tasks/${taskId}`);
         if (active) setTitle(t?.title || '');
@@ -82,7 +90,7 @@ export default function ShowdownResultsPage() {
         }
       }
     } catch {}
-    // fallback to stats
+    // no completion meta (reload or direct link): fall back to stats
     getJson('/showdown/stats').then((s) => {
       setCompletedTotal(Number(s?.total_completed || 0));
     }).catch(() => {});
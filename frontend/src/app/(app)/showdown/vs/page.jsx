@@ -17,7 +17,8 @@ function formatTimer(seconds) {
 export default function ShowdownVSPage() {
   const { theme } = useTheme();
   const darkMode = theme === 'dark';
-  const [tasks, setTasks] = useState([]);
+  const [activeCount, setActiveCount] = useState(0);
+  const [rankedCount, setRankedCount] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [selectedId, setSelectedId] = useState(null);
@@ -31,24 +32,6 @@ export default function ShowdownVSPage() {
   const [showSwitchModal, setShowSwitchModal] = useState(false);
   const [pendingSelectId, setPendingSelectId] = useState(null);
   const [showRankGuard, setShowRankGuard] = useState(false);
-  const rankedCountDisplay = useMemo(() => {
-    try {
-      return tasks.filter((t) => !t.completed && Number(t.dislike_rank || 0) > 0).length;
-    } catch {
-      return 0;
-    }
-  }, [tasks]);
-
-  // Load tasks
-  useEffect(() => {
-    setLoading(true);
-    getJson('/tasks')
-      .then((all) => setTasks(all.filter((t) => !t.completed)))
-      .catch((e) => setError(e.message || 'Failed to load tasks'))
-      .finally(() => setLoading(false));
-    // load labels (non-fatal)
-    getJson('/labels').then(setLabels).catch(() => {});
-  }, []);
 
   // Simple local timer
   useEffect(() => {
@@ -57,34 +40,46 @@ export default function ShowdownVSPage() {
     return () => clearInterval(id);
   }, [timerRunning]);
 
+  // Query string telling the backend which pair (and dreaded task) to avoid repeating
+  const lastPairQuery = (avoidId) => {
+    const q = new URLSearchParams();
+    try {
+      if (typeof window !== 'undefined') {
+        const storedPair = window.sessionStorage.getItem('showdown_pair');
+        if (storedPair) {
+          const parsed = JSON.parse(storedPair);
+          if (Array.isArray(parsed) && parsed.length >= 2) {
+            const a = parsed[0]?._id; const b = parsed[1]?._id;
+            if (a && b) {
+              q.set('last_a', a);
+              q.set('last_b', b);
+              q.set('avoid_high', avoidId || a); // nudge backend to rotate dreaded task too
+            }
+          }
+        }
+      }
+    } catch {}
+    return q;
+  };
+
+  const storePair = (nextPair) => {
+    try {
+      if (typeof window !== 'undefined' && nextPair.length >= 2) {
+        window.sessionStorage.setItem('showdown_pair', JSON.stringify(nextPair));
+      }
+    } catch {}
+  };
+
   // Fetch a showdown pair from backend
   const fetchPair = async () => {
     setPairLoading(true);
     setSelectedId(null);
     try {
-      // Pass last pair to avoid immediate repeats
-      let url = '/showdown/pair';
-      try {
-        if (typeof window !== 'undefined') {
-          const storedPair = window.sessionStorage.getItem('showdown_pair');
-          if (storedPair) {
-            const parsed = JSON.parse(storedPair);
-            if (Array.isArray(parsed) && parsed.length >= 2) {
-              const a = parsed[0]?._id; const b = parsed[1]?._id;
-              const avoidHigh = selectedId || a; // nudge backend to rotate dreaded task too
-              if (a && b) url = `/showdown/pair?last_a=${encodeURIComponent(a)}&last_b=${encodeURIComponent(b)}&avoid_high=${encodeURIComponent(avoidHigh)}`;
-            }
-          }
-        }
-      } catch {}
-      const p = await getJson(url);
+      const q = lastPairQuery(selectedId);
+      const p = await getJson(q.toString() ? `/showdown/pair?${q.toString()}` : '/showdown/pair');
       const nextPair = Array.isArray(p) ? p : [];
       setPair(nextPair);
-      try {
-        if (typeof window !== 'undefined' && nextPair.length >= 2) {
-          window.sessionStorage.setItem('showdown_pair', JSON.stringify(nextPair));
-        }
-      } catch {}
+      storePair(nextPair);
     } catch (e) {
       setError(e.message || 'Failed to fetch showdown pair');
       setPair([]);
@@ -93,53 +88,68 @@ export default function ShowdownVSPage() {
     }
   };
 
+  // Initial load: counts, labels, a fresh pair and any resumed selection in one request
   useEffect(() => {
-    if (loading) return;
-    // Guard: require at least 4 ranked (dislike_rank > 0) among active tasks
+    let resume = false;
+    let storedSelected = null;
     try {
-      const rankedCount = tasks.filter((t) => !t.completed && Number(t.dislike_rank || 0) > 0).length;
-      const activeCount = tasks.filter((t) => !t.completed).length;
-      if (activeCount >= 4 && rankedCount < 4) {
-        setShowRankGuard(true);
-        return;
-      }
+      resume = typeof window !== 'undefined' && window.sessionStorage.getItem('showdown_resume') === '1';
+      if (resume) storedSelected = window.sessionStorage.getItem('showdown_selected_id');
     } catch {}
-    // Resume from session storage if flagged
-    try {
-      const resume = typeof window !== 'undefined' ? window.sessionStorage.getItem('showdown_resume') === '1' : false;
-      if (resume) {
-        const storedPair = window.sessionStorage.getItem('showdown_pair');
-        const storedSelected = window.sessionStorage.getItem('showdown_selected_id');
-        if (storedPair) {
+    const q = lastPairQuery(null);
+    if (storedSelected) q.set('selected_id', storedSelected);
+    setLoading(true);
+    getJson(`/showdown/bootstrap?${q.toString()}`)
+      .then((boot) => {
+        setActiveCount(Number(boot?.active_count || 0));
+        setRankedCount(Number(boot?.ranked_count || 0));
+        setLabels(Array.isArray(boot?.labels) ? boot.labels : []);
+        // Guard: require at least 4 ranked (dislike_rank > 0) among active tasks
+        if (boot.active_count >= 4 && boot.ranked_count < 4) {
+          setShowRankGuard(true);
+          return;
+        }
+        if (resume) {
           try {
-            const parsed = JSON.parse(storedPair);
+            const parsed = JSON.parse(window.sessionStorage.getItem('showdown_pair') || '[]');
             if (Array.isArray(parsed) && parsed.length >= 2) {
               setPair(parsed);
             }
           } catch {}
-        }
-        if (storedSelected) {
-          setSelectedId(storedSelected);
-          // fetch saved time and continue
-          getJson(`/tasks/${storedSelected}`).then((t) => {
-            const secs = Number(t?.showdown_timer_seconds || 0);
+          if (storedSelected) {
+            setSelectedId(storedSelected);
+            // continue from the saved time
+            const secs = Number(boot?.selected?.showdown_timer_seconds || 0);
             if (secs > 0) {
               setTimerSeconds(secs);
               setTimerRunning(true);
             }
-          }).catch(() => {});
+          }
+          // clear resume flag so normal flow resumes next time
+          window.sessionStorage.removeItem('showdown_resume');
+          return;
         }
-        // clear resume flag so normal flow resumes next time
-        window.sessionStorage.removeItem('showdown_resume');
-        return;
-      }
-    } catch {}
-    fetchPair();
+        const nextPair = Array.isArray(boot?.pair) ? boot.pair : [];
+        setPair(nextPair);
+        storePair(nextPair);
+      })
+      .catch((e) => setError(e.message || 'Failed to load showdown'))
+      .finally(() => setLoading(false));
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [loading]);
+  }, []);
 
   const currentTask = useMemo(() => pair.find((t) => t._id === selectedId) || null, [pair, selectedId]);
 
+  // the pair carries description previews; the details modal loads long ones in full
+  const [fullDescriptions, setFullDescriptions] = useState({});
+  useEffect(() => {
+    if (!showTaskModal || !currentTask?.description_truncated || fullDescriptions[currentTask._id]) return;
+    const id = currentTask._id;
+    getJson(`/tasks/${id}?include=body`)
+      .then((full) => setFullDescriptions((prev) => ({ ...prev, [id]: full.description })))
+      .catch(() => {});
+  }, [showTaskModal, currentTask, fullDescriptions]);
+
   const handleComplete = async () => {
     if (!currentTask) return;
     try {
@@ -160,6 +170,7 @@ export default function ShowdownVSPage() {
         if (typeof window !== 'undefined') {
           const meta = {
             taskId: updated?._id || currentTask._id,
+            title: updated?.title || currentTask.title,
             peaches_increment: typeof updated?.peaches_increment === 'number' ? updated.peaches_increment : null,
             peaches_peached_total: typeof updated?.peaches_peached_total === 'number' ? updated.peaches_peached_total : null,
             total_completed: typeof updated?.total_completed === 'number' ? updated.total_completed : null,
@@ -200,7 +211,7 @@ export default function ShowdownVSPage() {
       <div className={`min-h-screen transition-colors overflow-x-hidden ${darkMode ? 'bg-gradient-to-br from-stone-900 via-amber-950 to-stone-900' : 'bg-gradient-to-br from-orange-50 via-amber-50 to-peach-50'}`}>
         <div className="max-w-6xl mx-auto px-4 py-4">
           {/* Instructions or CTA when insufficient tasks */}
-          {tasks.length < 4 ? (
+          {activeCount < 4 ? (
             <div className={`mb-3 p-3 rounded-xl border text-center ${darkMode ? 'bg-amber-900/20 border-amber-700/50' : 'bg-orange-50 border-orange-200'}`}>
               <h3 className={`font-bold text-lg mb-2 ${darkMode ? 'text-amber-200' : 'text-gray-900'}`}>You need at least 4 active tasks</h3>
               <p className={`${darkMode ? 'text-amber-300/70' : 'text-gray-600'} text-sm mb-3`}>Add more tasks on the dashboard to start a showdown.</p>
@@ -365,7 +376,7 @@ export default function ShowdownVSPage() {
               <div className="space-y-4">
                 <div>
                   <h3 className={`${darkMode ? 'text-amber-100' : 'text-gray-900'} text-2xl font-bold mb-2`}>{currentTask.title}</h3>
-                  {currentTask.description && <p className={`${darkMode ? 'text-amber-300/70' : 'text-gray-600'} text-base`}>{currentTask.description}</p>}
+                  {currentTask.description && <p className={`${darkMode ? 'text-amber-300/70' : 'text-gray-600'} text-base whitespace-pre-wrap`}>{fullDescriptions[currentTask._id] || currentTask.description}</p>}
                 </div>
                 <div className="flex items-center gap-3 pt-3 border-t border-gray-200 dark:border-amber-900/30">
                   <span className={`${darkMode ? 'bg-red-900/50 text-red-300 border-red-800' : 'bg-red-100 text-red-800 border-red-200'} inline-flex items-center gap-1 px-3 py-1.5 rounded-lg text-sm font-medium border`}>{String(currentTask.priority).charAt(0).toUpperCase() + String(currentTask.priority).slice(1)} Priority</span>
@@ -421,7 +432,7 @@ export default function ShowdownVSPage() {
           <div className="fixed inset-0 bg-black/60 backdrop-blur-sm flex items-center justify-center z-50 p-4">
             <div className={`${darkMode ? 'bg-stone-900/95 border-amber-600' : 'bg-white border-orange-400'} max-w-md w-full rounded-2xl shadow-2xl border-2 p-6`}>
               <h2 className={`${darkMode ? 'text-amber-100' : 'text-gray-900'} text-xl font-bold mb-2`}>Rank a few tasks first</h2>
-              <p className={`${darkMode ? 'text-amber-300/80' : 'text-gray-700'} text-sm mb-4`}>You need to rank at least 4 tasks that haven't been marked as complete to start a showdown. Current ranked: {rankedCountDisplay}. Visit the ranking page to get set up.</p>
+              <p className={`${darkMode ? 'text-amber-300/80' : 'text-gray-700'} text-sm mb-4`}>You need to rank at least 4 tasks that haven't been marked as complete to start a showdown. Current ranked: {rankedCount}. Visit the ranking page to get set up.</p>
               <div className="flex justify-end gap-2">
                 <Link href="/showdown/rank" className={`${darkMode ? 'bg-gradient-to-r from-amber-700 to-orange-800 hover:from-amber-600 hover:to-orange-700 text-amber-50' : 'bg-gradient-to-r from-orange-500 to-amber-500 hover:from-orange-600 hover:to-amber-600 text-white'} px-4 py-2 rounded-lg font-semibold`}>Go to Ranking</Link>
                 <Link href="/showdown/landing" className={`${darkMode ? 'border-amber-700 text-amber-300 hover:bg-amber-900/30' : 'border-orange-300 text-orange-700 hover:bg-orange-50'} px-4 py-2 rounded-lg border-2 text-sm font-medium`}>Return to Showdown Landing</Link>
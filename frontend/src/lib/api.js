@@ -93,3 +93,31 @@ export async function deleteJson(path) {
 }
 
 
+
+// Live change feed (GET /events). Calls onEvent({ type, ... }) for every
+// server event; EventSource reconnects on its own after errors or when the
+// server closes a long-lived stream. Returns an unsubscribe function.
+export function subscribeEvents(onEvent) {
+  if (typeof window === 'undefined' || typeof EventSource === 'undefined') {
+    return () => {};
+  }
+  const source = new EventSource(`${API_BASE_URL}/events`, { withCredentials: true });
+  const types = ['task.created', 'task.updated', 'task.deleted', 'label.changed', 'showdown.completed', 'resync'];
+  const handler = (e) => {
+    try {
+      onEvent(JSON.parse(e.data));
+    } catch {
+      // ignore malformed frames
+    }
+  };
+  types.forEach((t) => source.addEventListener(t, handler));
+  return () => source.close();
+}
+
+// Several calls in one round trip (POST /batch). `requests` is a list of
+// { method, path, body? }; resolves to [{ status, body }] in the same order.
+// Past the server's response budget, sub-requests that ran come back with
+// body null and truncated: true; ones that did not run get status 413.
+export async function batchJson(requests) {
+  return postJson('/batch', { requests });
+}